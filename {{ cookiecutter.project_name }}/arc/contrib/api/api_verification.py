@@ -7,9 +7,7 @@ import logging
 import os
 from copy import deepcopy
 
-import jsonschema
-
-from arc.contrib.tools import files
+from arc.contrib.api import schema_registry
 from arc.core.test_method.exceptions import VerificationException
 
 logger = logging.getLogger(__name__)
@@ -161,6 +159,7 @@ class ApiVerification:
     def validate_json_schema(self, expected_schema, json_response, input_type):
         """
         Validate json schema with json response.
+        The validators of the schemas are compiled once and reused by the next validations.
         :param expected_schema:
         :param json_response:
         :param input_type:
@@ -170,15 +169,13 @@ class ApiVerification:
         try:
 
             if input_type.lower() == "json" and json_response:
-                jsonschema.validate(instance=json_response, schema=expected_schema)
+                schema_registry.validate(expected_schema, json_response)
             elif (input_type.lower() == "str" or input_type.lower() == "dict") and json_response:
-                json_schema = json.loads(expected_schema)
-                json_response_v = json.loads(json_response)
-                jsonschema.validate(instance=json_response_v, schema=json_schema)
+                json_response_v = json.loads(json_response) if isinstance(json_response, str) else json_response
+                schema_registry.validate(expected_schema, json_response_v)
             elif input_type.lower() == "json_file" and json_response:
-                json_schema = files.json_to_dict(expected_schema)
-                json_response_v = files.json_to_dict(json_response)
-                jsonschema.validate(instance=json_response_v, schema=json_schema)
+                json_response_v = schema_registry.load_json_file(json_response)
+                schema_registry.get_file_validator(expected_schema).validate(json_response_v)
             else:
                 verification = False
 
@@ -199,6 +196,37 @@ class ApiVerification:
             error_msg='The given scheme does not correspond to response.'
         )
 
+    def validate_json_schema_many(self, expected_schema, json_responses):
+        """
+        Validate many json responses with the same json schema, compiled once.
+        The check fails if any response does not correspond to the schema and the errors of every invalid response
+        are shown.
+        :param expected_schema: dict or json text
+        :param json_responses: list of json responses
+        :return:
+        """
+        try:
+            errors = schema_registry.validate_many(expected_schema, json_responses)
+            invalid = {index: error.message for index, error in enumerate(errors) if error is not None}
+            verification = not invalid
+            error_msg = f"The given scheme does not correspond to {len(invalid)} of {len(errors)} responses: {invalid}"
+        except (Exception,) as ex:
+            verification = False
+            error_msg = f"The given scheme could not be validated: {ex}"
+
+        logger.debug(f'Checking schema of {len(json_responses)} responses: {verification}')
+
+        self.context.func.evidences.add_json('Expected Schema', expected_schema)
+
+        self.evidence_or_raise(
+            verification=verification,
+            func_name=self.validate_json_schema_many.__name__,
+            key='Json Schema',
+            expected_value=expected_schema,
+            current_value=f"{len(json_responses)} responses",
+            error_msg=error_msg
+        )
+
     def verify_response_headers_contains_value(self, expected_value, response):
         """
         Verify if response headers contains the expected value.
@@ -622,6 +622,15 @@ class ApiObject:
 
         self.verification.validate_json_schema(expected_schema, json_response, input_type)
 
+    def validate_json_schema_many(self, expected_schema, json_responses):
+        """
+        Validate many json responses with the same expected schema, compiled once.
+        :param expected_schema:
+        :param json_responses:
+        :return:
+        """
+        self.verification.validate_json_schema_many(expected_schema, json_responses)
+
     def verify_status_code(self, expected_status, response=None):
         """
         Verify status code from response.
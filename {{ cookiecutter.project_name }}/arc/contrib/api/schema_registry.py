@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of compiled json schema validators.
+The schemas are checked and their validators are created once per schema content, or once per file path and
+modification time for the schema files. Every validator keeps its own reference resolver, so the resolved $refs are
+cached between validations.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from collections import OrderedDict
+
+from jsonschema import RefResolver
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_SIZE = 256
+JSON_FILES_CACHE_SIZE = 256
+
+# Validators by schema key and json files data by path, in least recently used order
+SCHEMA_VALIDATORS = OrderedDict()
+JSON_FILES = OrderedDict()
+
+
+def _cache_get(cache, key):
+    """
+    Return a cached value and mark it as recently used, or None.
+    :param cache:
+    :param key:
+    :return:
+    """
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_set(cache, key, value, size):
+    """
+    Save a value in a cache removing the least recently used values over the size.
+    :param cache:
+    :param key:
+    :param value:
+    :param size:
+    :return:
+    """
+    cache[key] = value
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+def _get_file_key(file_path):
+    """
+    Return the key of the current version of a file: path, modification time and size.
+    :param file_path:
+    :return:
+    """
+    file_path = os.path.abspath(file_path)
+    file_stat = os.stat(file_path)
+    return file_path, file_stat.st_mtime_ns, file_stat.st_size
+
+
+def get_schema_key(schema):
+    """
+    Return the key of a schema from its content. The json texts are hashed without parsing them.
+    :param schema: dict or json text
+    :return:
+    """
+    text = schema if isinstance(schema, str) else json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _create_validator(schema, base_uri=''):
+    """
+    Check the schema and return a validator of its json schema version.
+    :param schema:
+    :param base_uri: uri used to resolve the relative $refs
+    :return:
+    """
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, resolver=RefResolver(base_uri, schema))
+
+
+def get_validator(schema):
+    """
+    Return the validator of a schema, created once per schema content.
+    :param schema: dict or json text
+    :return:
+    """
+    key = get_schema_key(schema)
+    validator = _cache_get(SCHEMA_VALIDATORS, key)
+    if validator is None:
+        logger.debug(f"Compiling json schema validator: {key}")
+        validator = _create_validator(json.loads(schema) if isinstance(schema, str) else schema)
+        _cache_set(SCHEMA_VALIDATORS, key, validator, SCHEMA_CACHE_SIZE)
+    return validator
+
+
+def get_file_validator(file_path):
+    """
+    Return the validator of a schema file, created again only when the file changes.
+    The relative $refs of the schema are resolved from the folder of the file.
+    :param file_path:
+    :return:
+    """
+    key = _get_file_key(file_path)
+    validator = _cache_get(SCHEMA_VALIDATORS, key)
+    if validator is None:
+        logger.debug(f"Compiling json schema validator of file: {file_path}")
+        validator = _create_validator(load_json_file(file_path), pathlib.Path(key[0]).as_uri())
+        _cache_set(SCHEMA_VALIDATORS, key, validator, SCHEMA_CACHE_SIZE)
+    return validator
+
+
+def load_json_file(file_path):
+    """
+    Return the data of a json file, read again only when the file changes.
+    :param file_path:
+    :return:
+    """
+    key = _get_file_key(file_path)
+    data = _cache_get(JSON_FILES, key)
+    if data is None:
+        with open(file_path, encoding='utf8') as json_file:
+            data = json.load(json_file)
+        _cache_set(JSON_FILES, key, data, JSON_FILES_CACHE_SIZE)
+    return data
+
+
+def validate(schema, instance):
+    """
+    Validate an instance with a schema, raising jsonschema.ValidationError if it is not valid.
+    :param schema: dict or json text
+    :param instance:
+    :return:
+    """
+    get_validator(schema).validate(instance)
+
+
+def validate_many(schema, instances):
+    """
+    Validate many instances with the same schema.
+    :param schema: dict or json text
+    :param instances:
+    :return: list with None for every valid instance and the most relevant error for every invalid one
+    """
+    validator = get_validator(schema)
+    return [best_match(validator.iter_errors(instance)) for instance in instances]
+
+
+def clear_schema_cache():
+    """
+    Remove the cached validators and json files.
+    :return:
+    """
+    SCHEMA_VALIDATORS.clear()
+    JSON_FILES.clear()
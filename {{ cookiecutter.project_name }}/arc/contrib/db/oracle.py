@@ -7,6 +7,10 @@ import os
 from pathlib import Path
 import json
 
+from arc.contrib.db.utils import (
+    get_pooled_connection, release_connection, get_fetch_size, get_headers, iter_dicts, fetch_dicts, fetch_columns,
+    fetch_dataframe, execute_many, parse_datetime_to_string
+)
 from arc.core.test_method.exceptions import TalosNotThirdPartyAppInstalled, TalosTestError
 
 logger = logging.getLogger(__name__)
@@ -39,7 +43,8 @@ class OracleWrapper:
 
     def set_connect(self, user, key, host, port: int, service_name: str):
         """
-        This method enable to connect with DB Oracle
+        This method enable to connect with DB Oracle.
+        The connection is reused by the next scenarios that connect with the same user and dsn.
         :param user: user to connect with DB Oracle
         :param key: key to connect with DB Oracle
         :param host: ip to connect with DB Oracle
@@ -47,12 +52,10 @@ class OracleWrapper:
         :param service_name: service_name to connect with DB Oracle
         """
         dsn = cx_Oracle.makedsn(host, port, service_name=service_name)
-        self.connection = cx_Oracle.connect(
-            user=user,
-            password=key,
-            dsn=dsn,
-            encoding=self.encoding,
-            nencoding=self.encoding
+        self.connection = get_pooled_connection(
+            ('oracle', user, key, dsn, self.encoding),
+            lambda: cx_Oracle.connect(user=user, password=key, dsn=dsn, encoding=self.encoding,
+                                      nencoding=self.encoding)
         )
 
         logger.info('Successful connection to Oracle DataBase:')
@@ -63,7 +66,14 @@ class OracleWrapper:
         logger.info(f"service name: {service_name}")
         logger.info(f"dsn: {dsn}")
 
+        self._set_cursor()
+
+    def _set_cursor(self):
+        """
+        This method open the cursor of the connection, fetching the rows in batches of the fetch size
+        """
         self.cursor = self.connection.cursor()
+        self.cursor.arraysize = get_fetch_size()
 
     @classmethod
     def _set_platform(cls, path_client_absolut):
@@ -82,8 +92,11 @@ class OracleWrapper:
         :param connection_data: connection_data
         :returns: jira test
         """
-        self.connection = cx_Oracle.connect(connection_data, encoding=self.encoding, nencoding=self.encoding)
-        self.cursor = self.connection.cursor()
+        self.connection = get_pooled_connection(
+            ('oracle', connection_data, self.encoding),
+            lambda: cx_Oracle.connect(connection_data, encoding=self.encoding, nencoding=self.encoding)
+        )
+        self._set_cursor()
         logger.info('Successful profile connection to Oracle DataBase')
 
     def get_cursor(self):
@@ -100,8 +113,14 @@ class OracleWrapper:
 
     def close_connection(self):
         """
-        This method close connect with DB Oracle
+        This method close connect with DB Oracle.
+        The connections of the pool are kept open until the end of the execution, the cursor is closed and the
+        uncommitted work is rolled back.
         """
+        self.close_cursor()
+        if release_connection(self.connection):
+            logger.info('Keeping the Oracle Database connection open for the next scenarios')
+            return
         logger.info('Closing Oracle Database connection')
         self.connection.close()
 
@@ -152,14 +171,8 @@ class OracleWrapper:
         This method parse the result into a list
         """
         try:
-            list_result = []
-            self.headers: list = [row[0] for row in self.cursor.description]
-            data_fetched = self.cursor.fetchall()
-            for j in range(len(data_fetched)):
-                name_columns_value: dict = {}
-                for x in range(len(self.headers)):
-                    name_columns_value[self.headers[x]] = data_fetched[j][x]
-                list_result.append(name_columns_value)
+            self.headers: list = get_headers(self.cursor)
+            list_result = fetch_dicts(self.cursor)
             self.results = list_result
             self.context.oracleDdQueryData = list_result
             return list_result
@@ -168,6 +181,56 @@ class OracleWrapper:
             logger.error(message)
             raise TalosTestError(message)
 
+    def launch_query_rows(self, query, fetch_size=None):
+        """
+        This method launch a select query and return an iterator of the rows as dicts, fetched in batches of rows,
+        so the rows are not kept in memory
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: iterator of the rows
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return iter_dicts(self.cursor, fetch_size)
+
+    def launch_query_columns(self, query, fetch_size=None) -> dict:
+        """
+        This method launch a select query and return the list of values of every column
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: dict of the values by column
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return fetch_columns(self.cursor, fetch_size)
+
+    def launch_query_dataframe(self, query, fetch_size=None):
+        """
+        This method launch a select query and return the results in a pandas DataFrame
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: DataFrame of the results
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return fetch_dataframe(self.cursor, fetch_size)
+
+    def launch_many(self, query, rows, batch_size=None):
+        """
+        This method launch an insert, update or delete query for every row with executemany and commit the changes
+        :param query: query with bind variables, like insert into users values (:name, :age)
+        :param rows: list of tuples or dicts with the values of the bind variables
+        :param batch_size: rows sent in every round trip
+        :returns: rows affected
+        """
+        logger.info(f'Performing the query to the database for every row: {query}')
+        rowcount = execute_many(self.cursor, query, rows, batch_size)
+        self.connection.commit()
+        return rowcount
+
     def get_results_on_list(self) -> list:
         """
         This method return result into list
@@ -208,10 +271,4 @@ class OracleWrapper:
         This method parse the datetime on string
         :returns: datetime on string
         """
-        aux_results = self.results
-        for h in range(len(aux_results)):
-            for x, y in aux_results[h].items():
-                if str(type(aux_results[h][x])).find("datetime") > -1:
-                    a = str(aux_results[h][x])
-                    aux_results[h][x] = a
-        return aux_results
+        return parse_datetime_to_string(self.results)
@@ -6,6 +6,10 @@ import logging
 import re
 import json
 
+from arc.contrib.db.utils import (
+    get_pooled_connection, release_connection, get_fetch_size, get_headers, iter_dicts, fetch_dicts, fetch_columns,
+    fetch_dataframe, execute_many, parse_datetime_to_string
+)
 from arc.core.test_method.exceptions import TalosNotThirdPartyAppInstalled, TalosTestError
 
 logger = logging.getLogger(__name__)
@@ -36,7 +40,9 @@ class SnowflakeWrapper:
 
     def set_connect(self, user, password, account, warehouse, database, schema):
         """
-        This method enable to connect with DB Snowflake
+        This method enable to connect with DB Snowflake.
+        The connection is reused by the next scenarios that connect with the same user, account, warehouse, database
+        and schema.
         :param user: user to connect with DB Snowflake
         :param password: password to connect with DB Snowflake
         :param account: account to connect with DB Snowflake
@@ -44,14 +50,16 @@ class SnowflakeWrapper:
         :param database: database to connect with DB Snowflake
         :param schema: schema to connect with DB Snowflake
         """
-        self.connection = snowflake.connector.connect(  # noqa
-            user=user,
-            password=password,
-            account=account,
-            warehouse=warehouse,
-            database=database,
-            schema=schema
-
+        self.connection = get_pooled_connection(
+            ('snowflake', user, password, account, warehouse, database, schema),
+            lambda: snowflake.connector.connect(  # noqa
+                user=user,
+                password=password,
+                account=account,
+                warehouse=warehouse,
+                database=database,
+                schema=schema
+            )
         )
         logger.info('Successful connection to Snowflake DataBase:')
         logger.info(f"user: {user}")
@@ -62,6 +70,7 @@ class SnowflakeWrapper:
         logger.info(f"encoding: {self.encoding}")
 
         self.cursor = self.connection.cursor()
+        self.cursor.arraysize = get_fetch_size()
 
     def get_cursor(self):
         """
@@ -77,8 +86,14 @@ class SnowflakeWrapper:
 
     def close_connection(self):
         """
-        This method close connection with DB Snowflake
+        This method close connection with DB Snowflake.
+        The connections of the pool are kept open until the end of the execution, the cursor is closed and the
+        uncommitted work is rolled back.
         """
+        self.close_cursor()
+        if release_connection(self.connection):
+            logger.info('Keeping the Snowflake Database connection open for the next scenarios')
+            return
         logger.info('Closing Snowflake Database connection')
         self.connection.close()
 
@@ -130,14 +145,8 @@ class SnowflakeWrapper:
         This method parse the result into a list
         """
         try:
-            list_result = []
-            self.headers: list = [row[0] for row in self.cursor.description]
-            data_fetched = self.cursor.fetchall()
-            for j in range(len(data_fetched)):
-                name_columns_value: dict = {}
-                for x in range(len(self.headers)):
-                    name_columns_value[self.headers[x]] = data_fetched[j][x]
-                list_result.append(name_columns_value)
+            self.headers: list = get_headers(self.cursor)
+            list_result = fetch_dicts(self.cursor)
             self.results = list_result
             return list_result
         except(Exception,) as ex:
@@ -145,6 +154,57 @@ class SnowflakeWrapper:
             logger.error(message)
             raise TalosTestError(message)
 
+    def launch_query_rows(self, query, fetch_size=None):
+        """
+        This method launch a select query and return an iterator of the rows as dicts, fetched in batches of rows,
+        so the rows are not kept in memory
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: iterator of the rows
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return iter_dicts(self.cursor, fetch_size)
+
+    def launch_query_columns(self, query, fetch_size=None) -> dict:
+        """
+        This method launch a select query and return the list of values of every column
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: dict of the values by column
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return fetch_columns(self.cursor, fetch_size)
+
+    def launch_query_dataframe(self, query, fetch_size=None):
+        """
+        This method launch a select query and return the results in a pandas DataFrame, built from the arrow
+        batches of the query when the pandas extra of the Snowflake connector is installed
+        :param query: select query
+        :param fetch_size: rows fetched in every round trip
+        :returns: DataFrame of the results
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        self.cursor.execute(query)
+        self.headers: list = get_headers(self.cursor)
+        return fetch_dataframe(self.cursor, fetch_size)
+
+    def launch_many(self, query, rows, batch_size=None):
+        """
+        This method launch an insert, update or delete query for every row with executemany and commit the changes
+        :param query: query with bind variables, like insert into users values (%s, %s)
+        :param rows: list of tuples or dicts with the values of the bind variables
+        :param batch_size: rows sent in every round trip
+        :returns: rows affected
+        """
+        logger.info(f'Performing the query to the database for every row: {query}')
+        rowcount = execute_many(self.cursor, query, rows, batch_size)
+        self.connection.commit()
+        return rowcount
+
     def get_results_on_list(self) -> list:
         """
         This method return result into list
@@ -178,10 +238,4 @@ class SnowflakeWrapper:
         This method parse the datetime on string
         :returns: datetime on string
         """
-        aux_results = self.results
-        for h in range(len(aux_results)):
-            for x, y in aux_results[h].items():
-                if str(type(aux_results[h][x])).find("datetime") > -1:
-                    a = str(aux_results[h][x])
-                    aux_results[h][x] = a
-        return aux_results
+        return parse_datetime_to_string(self.results)
@@ -6,6 +6,10 @@ import logging
 
 from colorama import Fore
 
+from arc.contrib.db.utils import (
+    get_pooled_connection, release_connection, rollback_connection, iter_dicts, fetch_columns, fetch_dataframe,
+    execute_many
+)
 from arc.core.test_method.exceptions import TalosNotThirdPartyAppInstalled, TalosTestError
 
 logger = logging.getLogger(__name__)
@@ -77,25 +81,27 @@ class SQLWrapper:
 
     def connect(self):
         """
-        Establish connection to database
+        Establish connection to database.
+        The connection is reused by the next scenarios that connect to the same database with the same user.
         :return self.session:
         """
+        key = (self.db_sql_type, self.host, self.port, self.db_name, self.user, self.password)
         if self.db_sql_type == MYSQL:
             try:
-                self.connection = mysql.connector.connect(
+                self.connection = get_pooled_connection(key, lambda: mysql.connector.connect(
                     database=self.db_name,
                     host=self.host,
                     user=self.user,
                     password=self.password,
                     port=self.port
-                )
+                ))
                 self.session = self.connection.cursor(buffered=True)  # noqa
             except mysql.connector.Error as ex:
                 logger.error(format(ex))
                 raise TalosTestError(format(ex))
         elif self.db_sql_type == SQLITE:
             try:
-                self.connection = sqlite3.connect(self.db_name)
+                self.connection = get_pooled_connection(key, lambda: sqlite3.connect(self.db_name))
                 self.session = self.connection.cursor()
             except sqlite3.Error as ex:
                 logger.error(format(ex))
@@ -103,12 +109,12 @@ class SQLWrapper:
 
         elif self.db_sql_type == POSTGRESQL:
             try:
-                self.connection = psycopg2.connect(
+                self.connection = get_pooled_connection(key, lambda: psycopg2.connect(
                     host=self.host,
                     database=self.db_name,
                     user=self.user,
                     password=self.password,
-                )
+                ))
                 self.session = self.connection.cursor()
             except psycopg2.Error as ex:
                 logger.error(format(ex))
@@ -158,6 +164,8 @@ class SQLWrapper:
                 return query_result
             except sqlite3.Error as ex:
                 logger.error(format(ex))
+                # End the failed transaction, so the next queries of the connection can run
+                rollback_connection(self.connection)
                 raise TalosTestError(format(ex))
 
         elif self.db_sql_type == POSTGRESQL:
@@ -167,6 +175,8 @@ class SQLWrapper:
                 return query_result
             except psycopg2.Error as ex:
                 logger.error(format(ex))
+                # End the failed transaction, so the next queries of the connection can run
+                rollback_connection(self.connection)
                 raise TalosTestError(format(ex))
         else:
             logger.error('Database is not implemented')
@@ -174,12 +184,80 @@ class SQLWrapper:
 
         return None
 
+    def launch_query_rows(self, query, fetch_size=None):
+        """
+        Make a select query and return an iterator of the rows as dicts, fetched in batches of rows.
+        The cursor of MySQL is buffered, the rows are read from the memory of the cursor.
+        :param query:
+        :param fetch_size: rows fetched in every round trip
+        :return:
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        try:
+            self.session.execute(query)
+        except (Exception,) as ex:
+            logger.error(format(ex))
+            raise TalosTestError(format(ex))
+        return iter_dicts(self.session, fetch_size)
+
+    def launch_query_columns(self, query, fetch_size=None):
+        """
+        Make a select query and return a dict with the list of values of every column
+        :param query:
+        :param fetch_size: rows fetched in every round trip
+        :return:
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        try:
+            self.session.execute(query)
+            return fetch_columns(self.session, fetch_size)
+        except (Exception,) as ex:
+            logger.error(format(ex))
+            raise TalosTestError(format(ex))
+
+    def launch_query_dataframe(self, query, fetch_size=None):
+        """
+        Make a select query and return the results in a pandas DataFrame
+        :param query:
+        :param fetch_size: rows fetched in every round trip
+        :return:
+        """
+        logger.info(f'Performing the query to the database: {query}')
+        try:
+            self.session.execute(query)
+            return fetch_dataframe(self.session, fetch_size)
+        except (Exception,) as ex:
+            logger.error(format(ex))
+            raise TalosTestError(format(ex))
+
+    def launch_many(self, query, rows, batch_size=None):
+        """
+        Make an insert, update or delete query for every row with executemany and commit the changes
+        :param query: query with the placeholders of the database, ? for SQLite and %s for MySQL and PostgreSQL
+        :param rows: list of tuples or dicts with the values of every row
+        :param batch_size: rows sent in every round trip
+        :return: rows affected
+        """
+        logger.info(f'Performing the query to the database for every row: {query}')
+        try:
+            rowcount = execute_many(self.session, query, rows, batch_size)
+            self.connection.commit()
+            return rowcount
+        except (Exception,) as ex:
+            logger.error(format(ex))
+            raise TalosTestError(format(ex))
+
     def disconnect(self):
         """
-        Disconnect from database
+        Disconnect from database.
+        The connections of the pool are kept open until the end of the execution, the cursor is closed and the
+        uncommitted work is rolled back.
         :param:
         :return self.connection:
         """
-        logger.info('Closing Database connection')
         self.session.close()
+        if release_connection(self.connection):
+            logger.info('Keeping the Database connection open for the next scenarios')
+            return
+        logger.info('Closing Database connection')
         self.connection.close()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Module with the utilities shared by the database control classes.
+The connections are kept open in a pool of the process by database and user, so every scenario of the execution
+reuses the connection opened by the first one, and the results can be read in batches of rows instead of all at once.
+"""
+import atexit
+import datetime
+import logging
+import os
+import threading
+from itertools import islice
+
+from arc.settings.settings_manager import Settings
+
+logger = logging.getLogger(__name__)
+
+# Values converted to string in the json and dict results
+DATETIME_TYPES = (datetime.date, datetime.time, datetime.timedelta)
+
+# Open connections of the process by key of the database and the user
+DB_CONNECTIONS = {'connections': {}, 'pid': None}
+DB_CONNECTIONS_LOCK = threading.Lock()
+
+
+def is_pool_enabled():
+    """
+    Return True if the connections are reused in the whole execution.
+    :return:
+    """
+    return Settings.DATABASES.get('pool_connections', default=True)
+
+
+def get_fetch_size(fetch_size=None):
+    """
+    Return the rows fetched from the database in every round trip.
+    :param fetch_size:
+    :return:
+    """
+    return fetch_size or Settings.DATABASES.get('fetch_size', default=1000)
+
+
+def get_batch_size(batch_size=None):
+    """
+    Return the rows sent to the database in every executemany.
+    :param batch_size:
+    :return:
+    """
+    return batch_size or Settings.DATABASES.get('batch_size', default=1000)
+
+
+def is_connection_open(connection):
+    """
+    Return True if the connection can still be used. The drivers without a way to check it are supposed to be open.
+    :param connection:
+    :return:
+    """
+    try:
+        if hasattr(connection, 'is_closed'):
+            # Snowflake
+            return not connection.is_closed()
+        if hasattr(connection, 'is_connected'):
+            # MySQL
+            return connection.is_connected()
+        if hasattr(connection, 'ping'):
+            # Oracle, the ping raises an error if the connection is lost
+            connection.ping()
+            return True
+        # PostgreSQL closed is an int, sqlite has no closed attribute
+        return not getattr(connection, 'closed', False)
+    except (Exception,) as ex:
+        logger.debug(f"The database connection is not open: {ex}")
+        return False
+
+
+def rollback_connection(connection):
+    """
+    Discard the uncommitted work of a connection, ending the failed transactions too.
+    :param connection:
+    :return: False if the connection could not be rolled back
+    """
+    try:
+        connection.rollback()
+        return True
+    except (Exception,) as ex:
+        logger.debug(f"The database connection could not be rolled back: {ex}")
+        return False
+
+
+def discard_connection(key):
+    """
+    Remove a connection from the pool of the process and close it.
+    :param key:
+    :return:
+    """
+    connection = DB_CONNECTIONS['connections'].pop(key, None)
+    if connection is not None:
+        try:
+            connection.close()
+        except (Exception,) as ex:
+            logger.debug(f"The database connection could not be closed: {ex}")
+
+
+def get_pooled_connection(key, connect):
+    """
+    Return the open connection of the process for the key, calling connect only if there is none.
+    The connections are not shared with the child processes, every process opens its own connections.
+    The reused connections are rolled back, so a scenario does not see the uncommitted work or the failed
+    transaction of the previous one, and a new connection is opened if the rollback fails.
+    :param key: tuple with the database and the user of the connection
+    :param connect: function that opens a new connection
+    :return:
+    """
+    if not is_pool_enabled():
+        return connect()
+    with DB_CONNECTIONS_LOCK:
+        if DB_CONNECTIONS['pid'] != os.getpid():
+            DB_CONNECTIONS.update(connections={}, pid=os.getpid())
+        connection = DB_CONNECTIONS['connections'].get(key)
+        if connection is not None and is_connection_open(connection) and rollback_connection(connection):
+            logger.info('Reusing the open database connection')
+            return connection
+        discard_connection(key)
+        connection = connect()
+        DB_CONNECTIONS['connections'][key] = connection
+        return connection
+
+
+def get_pooled_key(connection):
+    """
+    Return the key of a connection kept open in the pool of the process, or None if it is not in the pool.
+    :param connection:
+    :return:
+    """
+    if DB_CONNECTIONS['pid'] != os.getpid():
+        return None
+    return next((key for key, pooled in DB_CONNECTIONS['connections'].items() if connection is pooled), None)
+
+
+def release_connection(connection):
+    """
+    Give back a connection to the pool of the process, discarding its uncommitted work as closing it did.
+    The connection is removed from the pool and closed if it can not be rolled back.
+    :param connection:
+    :return: False if the connection is not in the pool and must be closed by the caller
+    """
+    with DB_CONNECTIONS_LOCK:
+        key = get_pooled_key(connection)
+        if key is None:
+            return False
+        if not rollback_connection(connection):
+            discard_connection(key)
+        return True
+
+
+def close_pooled_connections():
+    """
+    Close the connections of the pool of the process. It is called at the end of the process.
+    :return:
+    """
+    with DB_CONNECTIONS_LOCK:
+        if DB_CONNECTIONS['pid'] != os.getpid():
+            return
+        for connection in DB_CONNECTIONS['connections'].values():
+            try:
+                connection.close()
+            except (Exception,) as ex:
+                logger.debug(f"The database connection could not be closed: {ex}")
+        DB_CONNECTIONS['connections'] = {}
+
+
+atexit.register(close_pooled_connections)
+
+
+def get_headers(cursor):
+    """
+    Return the names of the columns of the last query of a cursor.
+    :param cursor:
+    :return:
+    """
+    return [column[0] for column in cursor.description]
+
+
+def iter_batches(cursor, fetch_size=None):
+    """
+    Return an iterator of the batches of rows of the last query of a cursor, fetched with fetchmany.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    fetch_size = get_fetch_size(fetch_size)
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def iter_rows(cursor, fetch_size=None):
+    """
+    Return an iterator of the rows of the last query of a cursor, fetched with fetchmany in batches of fetch_size rows.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    for rows in iter_batches(cursor, fetch_size):
+        yield from rows
+
+
+def iter_dicts(cursor, fetch_size=None):
+    """
+    Return an iterator of the rows of the last query of a cursor as dicts by column name.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    headers = get_headers(cursor)
+    for row in iter_rows(cursor, fetch_size):
+        yield dict(zip(headers, row))
+
+
+def fetch_dicts(cursor, fetch_size=None):
+    """
+    Return the rows of the last query of a cursor as a list of dicts by column name.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    headers = get_headers(cursor)
+    results = []
+    for rows in iter_batches(cursor, fetch_size):
+        results += [dict(zip(headers, row)) for row in rows]
+    return results
+
+
+def fetch_columns(cursor, fetch_size=None):
+    """
+    Return the rows of the last query of a cursor as a dict with the list of values of every column.
+    The values of every column are kept in one list instead of one dict per row.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    headers = get_headers(cursor)
+    columns = [[] for _ in headers]
+    for rows in iter_batches(cursor, fetch_size):
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    return dict(zip(headers, columns))
+
+
+def fetch_dataframe(cursor, fetch_size=None):
+    """
+    Return the rows of the last query of a cursor as a pandas DataFrame, with the values of every column in a numpy
+    array. The cursors of Snowflake return the DataFrame built from the arrow batches of the query.
+    :param cursor:
+    :param fetch_size:
+    :return:
+    """
+    import pandas as pd
+
+    if hasattr(cursor, 'fetch_pandas_all'):
+        try:
+            return cursor.fetch_pandas_all()
+        except (Exception,) as ex:
+            # Results not in arrow format or pandas extra of the connector not installed
+            logger.debug(f"The results could not be read as arrow batches: {ex}")
+    headers = get_headers(cursor)
+    frames = []
+    rows = iter_rows(cursor, fetch_size)
+    while True:
+        batch = list(islice(rows, get_fetch_size(fetch_size) * 100))
+        if not batch:
+            break
+        frames.append(pd.DataFrame.from_records(batch, columns=headers))
+    if not frames:
+        return pd.DataFrame(columns=headers)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def execute_many(cursor, query, rows, batch_size=None):
+    """
+    Run a query once for every row with executemany, sending the rows to the database in batches of batch_size rows.
+    :param cursor:
+    :param query: query with the bind parameters of the driver
+    :param rows: iterable of sequences or dicts with the values of every row
+    :param batch_size:
+    :return: number of rows affected
+    """
+    batch_size = get_batch_size(batch_size)
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.executemany(query, batch)
+        total += cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+    return total
+
+
+def parse_datetime_to_string(results):
+    """
+    Convert to string the date and time values of a list of dicts.
+    :param results:
+    :return:
+    """
+    for row in results:
+        for key, value in row.items():
+            if isinstance(value, DATETIME_TYPES):
+                row[key] = str(value)
+    return results
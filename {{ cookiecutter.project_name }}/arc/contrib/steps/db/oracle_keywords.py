@@ -124,6 +124,26 @@ def oracle_last_query_compare(context, tag, value, status):
         assert count > 0
 
 
+@step(u'the Oracle query is sent for every row of the data table: "(?P<query>.+)"')
+def the_oracle_query_is_sent_for_every_row(context, query: str):
+    """
+    This step the Oracle DB launches the query once for every row of the data table, sending the rows in batches.
+    The headings of the table are the names of the bind variables of the query.
+    :example
+        When the Oracle query is sent for every row of the data table: "insert into users values (:name, :age)"
+            | name  | age |
+            | user1 | 30  |
+            | user2 | 40  |
+    :
+    :tag Oracle DB insert data:
+    :param context:
+    :param query:
+    """
+    rows = [row.as_dict() for row in context.table]
+    rowcount = context.oracle_db.launch_many(query, rows)
+    context.func.evidences.add_text(text=f"Query: \n{query}\nRows sent: {len(rows)}\nRows affected: {rowcount}")
+
+
 @step(u"close Oracle connection")
 def close_oracle_connection(context):
     """
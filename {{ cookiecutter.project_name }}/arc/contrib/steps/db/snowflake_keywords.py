@@ -123,6 +123,26 @@ def snowflake_last_query_compare(context, tag, value, status):
         assert count > 0
 
 
+@step(u'the Snowflake query is sent for every row of the data table: "(?P<query>.+)"')
+def the_snowflake_query_is_sent_for_every_row(context, query: str):
+    """
+    This step the Snowflake DB launches the query once for every row of the data table, sending the rows in batches.
+    The headings of the table are the names of the bind variables of the query.
+    :example
+        When the Snowflake query is sent for every row of the data table: "insert into users values (%(name)s, %(age)s)"
+            | name  | age |
+            | user1 | 30  |
+            | user2 | 40  |
+    :
+    :tag Snowflake DB insert data:
+    :param context:
+    :param query:
+    """
+    rows = [row.as_dict() for row in context.table]
+    rowcount = context.snowflake_db.launch_many(query, rows)
+    context.func.evidences.add_text(text=f"Query: \n{query}\nRows sent: {len(rows)}\nRows affected: {rowcount}")
+
+
 @step(u"close Snowflake connection")
 def close_snowflake_connection(context):
     """
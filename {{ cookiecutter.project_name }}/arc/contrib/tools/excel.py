@@ -2,11 +2,14 @@
 """
 Excel file management module.
 """
+import datetime
 import logging
+import math
 import os
 import re
 import pandas as pd
 import json
+from pandas.io.parsers import TextParser
 
 from arc.core.test_method.exceptions import TalosTestError
 
@@ -17,6 +20,73 @@ dirname = os.path.dirname
 ROOT_PATH = dirname(dirname(dirname(__file__)))
 
 
+def to_json_value(value):
+    """
+    Return a cell value as it is after a json round trip of its DataFrame: the missing values are None, the
+    dates are epoch milliseconds and the numpy values are python values.
+    :param value:
+    :return:
+    """
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is bool:
+        return value
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, datetime.datetime):
+        return int(pd.Timestamp(value).value // 1000000)
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        return json.loads(pd.Series([value]).to_json(orient='values'))[0]
+    if hasattr(value, 'item'):
+        return to_json_value(value.item())
+    return value
+
+
+def _get_json_column_values(sheet, position):
+    """
+    Return the values of a column of a DataFrame converted as a json round trip does.
+    :param sheet:
+    :param position:
+    :return:
+    """
+    values = sheet.iloc[:, position]
+    if values.dtype.kind in 'iub':
+        return values.tolist()
+    return [to_json_value(value) for value in values.tolist()]
+
+
+def _get_json_keys(index):
+    """
+    Return the keys of the labels of an index as a json round trip does.
+    :param index:
+    :return:
+    """
+    return [str(to_json_value(label)) for label in index.tolist()]
+
+
+def sheet_to_dict(sheet):
+    """
+    Return a dict with the values of every column by index of a DataFrame, the same as loading its to_json().
+    :param sheet:
+    :return:
+    """
+    index_keys = _get_json_keys(sheet.index)
+    return {column_key: dict(zip(index_keys, _get_json_column_values(sheet, position)))
+            for position, column_key in enumerate(_get_json_keys(sheet.columns))}
+
+
+def sheet_to_records(sheet):
+    """
+    Return a list with a dict for every row of a DataFrame, the same as loading its to_json(orient='records').
+    :param sheet:
+    :return:
+    """
+    column_keys = _get_json_keys(sheet.columns)
+    columns = [_get_json_column_values(sheet, position) for position in range(len(sheet.columns))]
+    return [dict(zip(column_keys, row)) for row in zip(*columns)]
+
+
 class ExcelWrapper:
     """
     Class for reading, writing, deleting and updating data from Excel files.
@@ -31,17 +101,71 @@ class ExcelWrapper:
             self.route = os.path.join(ROOT_PATH, splitter[0] + '/') if len(splitter) > 1 else ROOT_PATH + '/'
             self.filename = splitter[1] if len(splitter) > 1 else splitter[0]
             self.file = self._read_file()
-            self.current_sheet = self.file.sheet_names[0]
+            self.current_sheet = list(self.file)[0]
             self.sheets = self._get_sheets()
             self.headers = self._get_headers()
 
     def _read_file(self):
         """
-        Return a Excel file read instance.
+        Return the rows of every sheet of the Excel file, with the cell values converted like pandas does.
+        The workbook is read once in read-only mode, so the sheets are streamed row by row.
         :return:
         """
+        from openpyxl import load_workbook
         logger.debug(f'Reading Excel file from: {self.route + self.filename}')
-        return pd.ExcelFile(self.route + self.filename, engine=self.engine)
+        workbook = load_workbook(self.route + self.filename, read_only=True, data_only=True, keep_links=False)
+        try:
+            return {sheet.title: self._get_sheet_rows(sheet) for sheet in workbook.worksheets}
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _get_sheet_rows(sheet):
+        """
+        Return the rows of a sheet without the empty rows and columns at the end, all with the same length.
+        :param sheet:
+        :return:
+        """
+        from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+        sheet.reset_dimensions()
+        rows = []
+        last_row_with_data = -1
+        for row_number, row in enumerate(sheet.rows):
+            values = []
+            for cell in row:
+                value = cell.value
+                if value is None:
+                    value = ''
+                elif cell.data_type == TYPE_ERROR:
+                    value = math.nan
+                elif cell.data_type == TYPE_NUMERIC and int(value) == value:
+                    value = int(value)
+                values.append(value)
+            while values and values[-1] == '':
+                values.pop()
+            if values:
+                last_row_with_data = row_number
+            rows.append(values)
+        rows = rows[:last_row_with_data + 1]
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+
+    def _get_sheet(self, sheet_name, header=None, dtype=None):
+        """
+        Return the DataFrame of a sheet from its rows read from the file.
+        :param sheet_name:
+        :param header: row of the header starting in 0 or None
+        :param dtype:
+        :return:
+        """
+        rows = self.file[sheet_name]
+        if not rows:
+            return pd.DataFrame()
+        parser = TextParser([list(row) for row in rows], header=header, dtype=dtype, skip_blank_lines=False)
+        try:
+            return parser.read()
+        finally:
+            parser.close()
 
     def _get_sheets(self):
         """
@@ -49,15 +173,8 @@ class ExcelWrapper:
         :return:
         """
         sheets = {}
-        for sheet_name in self.file.sheet_names:
-            sheet = pd.read_excel(
-                self.route + self.filename,
-                sheet_name,
-                header=None,
-                engine=self.engine,
-                dtype={'name': object, 'value': object}
-            )  # noqa
-            sheets[sheet_name] = sheet
+        for sheet_name in self.file:
+            sheets[sheet_name] = self._get_sheet(sheet_name, dtype={'name': object, 'value': object})
         return sheets
 
     def _get_headers(self):
@@ -92,13 +209,7 @@ class ExcelWrapper:
         :return:
         """
         sheet_name = self.current_sheet if sheet_name is None else sheet_name
-        sheet = pd.read_excel(  # noqa
-            self.route + self.filename,
-            sheet_name,
-            header=None if header is None else header - 1,
-            engine=self.engine,
-            dtype=object
-        )
+        sheet = self._get_sheet(sheet_name, header=None if header is None else header - 1, dtype=object)
         self.sheets[sheet_name] = sheet
         self.headers[sheet_name] = sheet.head()
 
@@ -108,7 +219,7 @@ class ExcelWrapper:
         :param header:
         :return:
         """
-        for current_sheet in self.file.sheet_names:
+        for current_sheet in self.sheets:
             self.set_sheet_header(header, sheet_name=current_sheet)
 
     def current_sheet_to_json(self):
@@ -121,9 +232,7 @@ class ExcelWrapper:
         """
         Return a dict object of the current sheet  .
         """
-        str_json = self.current_sheet_to_json()
-        json_dict = json.loads(str_json)
-        return json_dict
+        return sheet_to_dict(self.sheets[self.current_sheet])
 
     def all_sheets_to_json(self):
         """
@@ -140,9 +249,7 @@ class ExcelWrapper:
         """
         sheets = {}
         for sheet_name, sheet in self.sheets.items():
-            str_json = sheet.to_json()
-            json_dict = json.loads(str_json)
-            sheets[sheet_name] = json_dict
+            sheets[sheet_name] = sheet_to_dict(sheet)
         return sheets
 
     def all_sheets_to_dict_order_by_rows(self):
@@ -151,9 +258,7 @@ class ExcelWrapper:
         """
         sheets = {}
         for sheet_name, sheet in self.sheets.items():
-            str_json = sheet.to_json(orient='records')
-            json_dict = json.loads(str_json)
-            sheets[sheet_name] = json_dict
+            sheets[sheet_name] = sheet_to_records(sheet)
         return sheets
 
     def __read_cell(self, row_from_zero, column_from_zero, sheet_name=None):
@@ -10,6 +10,7 @@ import yaml
 import warnings
 import functools
 
+from arc.core.behave.template_var import clear_template_var_cache, get_global
 from arc.settings.settings_manager import Settings
 from copy import deepcopy
 
@@ -95,6 +96,10 @@ def deprecated(reason):
 logger = logging.getLogger(__name__)
 
 PROFILE_PATH = "settings/profiles"
+PROFILE_FILE_EXTENSIONS = ('.json', '.yaml')
+
+# Editable profile files of every environment, found once per process
+PROFILE_FILES = {}
 
 
 def is_file_exist(file_path):
@@ -115,8 +120,8 @@ def yaml_to_dict(file_path):
     :return:
     """
     logger.debug(f'Converting yaml to dict: {file_path}')
-    yaml_file = open(file_path, encoding='utf8')
-    return yaml.load(yaml_file, Loader=yaml.FullLoader)
+    with open(file_path, encoding='utf8') as yaml_file:
+        return yaml.load(yaml_file, Loader=yaml.FullLoader)
 
 
 def json_to_dict(file_path):
@@ -306,6 +311,174 @@ def delete_value_yaml_path(file_path, key):
         yaml.dump(doc, f)
 
 
+def write_data_file(file_path, data):
+    """
+    Write the data in a json or yaml file by its extension. The file is replaced atomically.
+    :param file_path:
+    :param data:
+    :return:
+    """
+    logger.debug(f'Writing data file: {file_path}')
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf8') as data_file:
+            if file_path.endswith('.json'):
+                json.dump(data, data_file)
+            else:
+                yaml.dump(data, data_file)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def get_profile_files(file_name, change_all_profiles=True):
+    """
+    Return the paths of the json and yaml profile files with the file name, of all the environments or of the current
+    one. The profile folders are listed once.
+    :param file_name: name of the file without extension
+    :param change_all_profiles:
+    :return:
+    """
+    if not PROFILE_FILES:
+        for environment in sorted(os.listdir(PROFILE_PATH)):
+            environment_dir = os.path.join(PROFILE_PATH, environment)
+            if os.path.isdir(environment_dir):
+                PROFILE_FILES[environment] = [os.path.join(environment_dir, file) for file in
+                                              sorted(os.listdir(environment_dir))
+                                              if file.endswith(PROFILE_FILE_EXTENSIONS)]
+    if change_all_profiles:
+        environments = list(PROFILE_FILES)
+    else:
+        environments = [Settings.PYTALOS_PROFILES.get('environment')]
+    return [path for environment in environments for path in PROFILE_FILES.get(environment, [])
+            if os.path.splitext(os.path.basename(path))[0] == file_name]
+
+
+def get_loaded_profile_data(file_path):
+    """
+    Return the data of a profile file of the current environment loaded for the template vars, or None if the file
+    is not loaded.
+    :param file_path:
+    :return:
+    """
+    environment = Settings.PYTALOS_PROFILES.get('environment')
+    profiles = get_global().get('profiles') or {}
+    container = profiles.get('profiles_paths', {}).get(environment)
+    if not container:
+        return None
+    environment_dir = os.path.abspath(os.path.join(PROFILE_PATH, environment))
+    relative_path = os.path.relpath(os.path.abspath(file_path), environment_dir)
+    if relative_path.startswith('..'):
+        return None
+    names = relative_path.split(os.sep)
+    for folder in names[:-1]:
+        container = container.get(folder)
+        if not isinstance(container, dict):
+            return None
+    return container.get(names[-1])
+
+
+class ProfileTransaction:
+    """
+    Edits of json and yaml data files made in memory, so many keys can be changed writing every file only once.
+    The files are written atomically when the transaction is committed, at the end of the with block.
+    The profile files of the current environment are edited in the data loaded for the template vars, so the
+    template vars have the new values without loading the profiles again.
+    The keys are dot-separated paths, the list items are selected with their index.
+
+    with ProfileTransaction() as transaction:
+        transaction.set_value('settings/profiles/dev/datas.json', 'user.name', 'talos')
+        transaction.delete_value('settings/profiles/dev/datas.json', 'user.password')
+    """
+
+    def __init__(self):
+        self.files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.files.clear()
+
+    def get_data(self, file_path):
+        """
+        Return the data of a file, read once per transaction.
+        :param file_path:
+        :return:
+        """
+        if file_path not in self.files:
+            data = get_loaded_profile_data(file_path)
+            if data is None:
+                data = json_to_dict(file_path) if file_path.endswith('.json') else yaml_to_dict(file_path)
+            self.files[file_path] = data
+        return self.files[file_path]
+
+    def get_value(self, file_path, key):
+        """
+        Return the value of a key of a file.
+        :param file_path:
+        :param key:
+        :return:
+        """
+        value = self.get_data(file_path)
+        for param in key.split('.'):
+            value = value[int(param)] if type(value) is list else value[param]
+        return value
+
+    def set_value(self, file_path, key, value):
+        """
+        Set the value of a key of a file, creating the missing keys of the path.
+        :param file_path:
+        :param key:
+        :param value:
+        :return:
+        """
+        logger.debug(f'Including value {value} in key {key} in file: {file_path}')
+        keys = key.split('.')
+        update_dict_value_by_key(self.get_data(file_path), keys[-1], keys, value)
+
+    def replace_value(self, file_path, key, string_to_search, value):
+        """
+        Replace a text in the value of a key of a file.
+        :param file_path:
+        :param key:
+        :param string_to_search:
+        :param value:
+        :return:
+        """
+        logger.debug(f'Replacing value {value} in key {key} in file: {file_path}')
+        current_value = self.get_value(file_path, key)
+        if isinstance(current_value, str):
+            self.set_value(file_path, key, current_value.replace(string_to_search.replace('\\', ''), value))
+
+    def delete_value(self, file_path, key):
+        """
+        Delete a key of a file.
+        :param file_path:
+        :param key:
+        :return:
+        """
+        logger.debug(f"Deleting value with key {key} in file: {file_path}")
+        keys = key.split('.')
+        delete_key_json(self.get_data(file_path), keys[-1], keys)
+
+    def commit(self):
+        """
+        Write every edited file once.
+        :return:
+        """
+        for file_path, data in self.files.items():
+            write_data_file(file_path, data)
+            files_to_edit.pop(file_path, None)
+        if self.files:
+            clear_template_var_cache()
+        self.files.clear()
+
+
 @deprecated
 def set_profile_data_value(file_name, key, value, change_all_profiles=True):
     """
@@ -316,39 +489,10 @@ def set_profile_data_value(file_name, key, value, change_all_profiles=True):
     :param change_all_profiles:
     :return:
     """
-
-    directory_list = []
-    file_names = []
     logger.debug(f"Including value {value} in key {key} in profile file: {file_name}")
-    for root, dirs, files in os.walk(PROFILE_PATH, topdown=False):
-        for file in files:
-            if file not in file_names:
-                file_names.append(file)
-        for name in dirs:
-            directory_list.append(name)
-    if change_all_profiles:
-        for directory in directory_list:
-            for file in file_names:
-                if file.split(".")[0] == file_name:
-                    try:
-                        path = PROFILE_PATH + directory + "/" + file
-                        if file.split(".")[1] == "json":
-                            set_value_json_path(path, key, value)
-                        elif file.split(".")[1] == "yaml":
-                            set_value_yaml_path(path, key, value)
-                    except FileNotFoundError:
-                        pass
-    else:
-        for file in file_names:
-            if file.split(".")[0] == file_name:
-                try:
-                    path = PROFILE_PATH + Settings.PYTALOS_PROFILES.get('environment') + "/" + file
-                    if file.split(".")[1] == "json":
-                        set_value_json_path(path, key, value)
-                    elif file.split(".")[1] == "yaml":
-                        set_value_yaml_path(path, key, value)
-                except FileNotFoundError:
-                    pass
+    with ProfileTransaction() as transaction:
+        for path in get_profile_files(file_name, change_all_profiles):
+            transaction.set_value(path, key, value)
 
 
 @deprecated
@@ -363,38 +507,9 @@ def replace_profile_data_value(file_name, key, string_to_search, value, change_a
     :return:
     """
     logger.debug(f"Replacing value {string_to_search} in key {key} for {value} in profile file: {file_name}")
-    directory_list = []
-    file_names = []
-
-    for root, dirs, files in os.walk(PROFILE_PATH, topdown=False):
-        for file in files:
-            if file not in file_names:
-                file_names.append(file)
-        for name in dirs:
-            directory_list.append(name)
-    if change_all_profiles:
-        for directory in directory_list:
-            for file in file_names:
-                if file.split(".")[0] == file_name:
-                    try:
-                        path = PROFILE_PATH + "/" + directory + "/" + file
-                        if file.split(".")[1] == "json":
-                            replace_value_json_path(path, key, string_to_search, value)
-                        elif file.split(".")[1] == "yaml":
-                            set_value_yaml_path(path, key, value)
-                    except FileNotFoundError:
-                        pass
-    else:
-        for file in file_names:
-            if file.split(".")[0] == file_name:
-                try:
-                    path = PROFILE_PATH + "/" + Settings.PYTALOS_PROFILES.get('environment') + "/" + file
-                    if file.split(".")[1] == "json":
-                        replace_value_json_path(path, key, string_to_search, value)
-                    elif file.split(".")[1] == "yaml":
-                        set_value_yaml_path(path, key, value)
-                except FileNotFoundError:
-                    pass
+    with ProfileTransaction() as transaction:
+        for path in get_profile_files(file_name, change_all_profiles):
+            transaction.replace_value(path, key, string_to_search, value)
 
 
 @deprecated
@@ -407,38 +522,9 @@ def delete_profile_data_value(file_name, key, change_all_profiles=True):
     :return:
     """
     logger.debug(f'Deleting the key {key} in profile file: {file_name}')
-    directory_list = []
-    file_names = []
-
-    for root, dirs, files in os.walk(PROFILE_PATH, topdown=False):
-        for file in files:
-            if file not in file_names:
-                file_names.append(file)
-        for name in dirs:
-            directory_list.append(name)
-    if change_all_profiles:
-        for directory in directory_list:
-            for file in file_names:
-                if file.split(".")[0] == file_name:
-                    try:
-                        path = "settings/profiles/" + directory + "/" + file
-                        if file.split(".")[1] == "json":
-                            delete_value_json_path(path, key)
-                        elif file.split(".")[1] == "yaml":
-                            delete_value_yaml_path(path, key)
-                    except FileNotFoundError:
-                        pass
-    else:
-        for file in file_names:
-            if file.split(".")[0] == file_name:
-                try:
-                    path = "settings/profiles/" + Settings.PYTALOS_PROFILES.get('environment') + "/" + file
-                    if file.split(".")[1] == "json":
-                        delete_value_json_path(path, key)
-                    elif file.split(".")[1] == "yaml":
-                        delete_value_yaml_path(path, key)
-                except FileNotFoundError:
-                    pass
+    with ProfileTransaction() as transaction:
+        for path in get_profile_files(file_name, change_all_profiles):
+            transaction.delete_value(path, key)
 
 
 def delete_key_json(json_decoded, last_key, keys):
@@ -489,6 +575,7 @@ def delete_data_value(context, settings_type, file_name, key):
     keys = key.split('.')
     last_key = keys[-1]
     json_deleted = delete_key_json(files_dir, last_key, keys)
+    clear_template_var_cache()
 
     for current_file in path:
         if str(current_file).__contains__(file_name):
@@ -525,14 +612,26 @@ def update_data_value(context, settings_type, file_name, key, value):
     keys = key.split('.')
     last_key = keys[-1]
     json_updated = update_dict_value_by_key(files_dir, last_key, keys, value)
+    clear_template_var_cache()
 
     for current_file in path:
         if str(current_file).__contains__(file_name):
             file_path = os.path.join(file_path, current_file)
             break
 
-    files_to_edit[file_path] = deepcopy(json_updated)
+    # The loaded data is written once at the end of the execution
+    files_to_edit[file_path] = json_updated
 
 
 def get_files_to_edit():
     return files_to_edit
+
+
+def save_files_to_edit():
+    """
+    Write the profile files edited by the steps during the execution, every file once.
+    :return:
+    """
+    for file_path, data in files_to_edit.items():
+        write_data_file(file_path, data)
+    files_to_edit.clear()
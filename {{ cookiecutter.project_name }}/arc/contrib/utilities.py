@@ -31,6 +31,7 @@ from arc.page_elements.page_elements import (
     Groups, InputRadios, InputTexts,
     Links, Selects, Texts
 )
+from arc.reports.html.screenshots import compress_screenshot
 from arc.settings.settings_manager import Settings
 
 logger = logging.getLogger(__name__)
@@ -150,11 +151,17 @@ class Utils(object):
         filepath = os.path.join(DriverManager.screenshots_directory, filename)
         if not os.path.exists(DriverManager.screenshots_directory):
             os.makedirs(DriverManager.screenshots_directory)
-        if self.driver_wrapper.driver.get_screenshot_as_file(filepath):
-            logger.info('Screenshot saved in %s', filepath)
-            DriverManager.screenshots_number += 1
-            return filepath
-        return None
+        image_data = self.driver_wrapper.driver.get_screenshot_as_png()
+        try:
+            with open(filepath, 'wb') as image_file:
+                image_file.write(image_data)
+        except OSError as ex:
+            logger.warning(f"Screenshot could not be saved in {filepath}: {ex}")
+            return None
+        logger.info('Screenshot saved in %s', filepath)
+        DriverManager.screenshots_number += 1
+        compress_screenshot(filepath, image_data)
+        return filepath
 
     @staticmethod
     def get_path_capture_screenshot_autogui(name):
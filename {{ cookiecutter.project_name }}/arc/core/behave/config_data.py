@@ -2,11 +2,15 @@
 """
 Talos profile data collection file functions.
 """
+import hashlib
+import importlib.metadata
 import json
 import logging
 import os.path
+import pickle
+import platform
 
-from functools import reduce
+from functools import lru_cache, reduce
 from os import walk
 from arc.contrib.tools import files, excel, csv
 from arc.core.test_method.exceptions import TalosErrorReadFile, TalosResourceNotFound
@@ -15,6 +19,84 @@ from arc.web.app.utils import send_alert_portal
 
 logger = logging.getLogger(__name__)
 
+PROFILE_EXTENSIONS = ('.json', '.yaml', '.xlsx', '.csv')
+PROFILES_CACHE_DIR = os.path.join('.cache', 'profiles')
+# Version of the format of the cached profile data, increase it when the parsing of the profile files changes
+PROFILES_CACHE_VERSION = 1
+# Row of the headers of the excel sheets and csv profile files
+PROFILE_HEADER_ROW = 1
+# Libraries that parse every type of profile file, their versions are part of the key of the cached data
+PROFILE_PARSERS = {'.yaml': 'yaml', '.xlsx': 'openpyxl', '.csv': 'pandas'}
+
+
+class ProfileFile:
+    """
+    Profile file not loaded yet. The data is read the first time it is used.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.loaded = False
+        self.data = None
+
+    def __repr__(self):
+        return f"ProfileFile({self.file_path})"
+
+    def load(self):
+        """
+        Return the data of the file, reading it only the first time.
+        :return:
+        """
+        if not self.loaded:
+            self.data = load_profile_file(self.file_path)
+            self.loaded = True
+        return self.data
+
+
+class ProfileData(dict):
+    """
+    Dictionary of profile files and folders where the files are loaded the first time their data is accessed.
+    The names of the files are available without loading them.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, ProfileFile):
+            value = value.load()
+            super().__setitem__(key, value)
+        return value
+
+    def __iter__(self):
+        # -- Not using the dict iterator makes dict(), update() and ** read the values with __getitem__
+        return iter(list(super().keys()))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def items(self):
+        return [(key, self[key]) for key in super().keys()]
+
+    def values(self):
+        return [self[key] for key in super().keys()]
+
+    def pop(self, key, *args):
+        if key in self:
+            self[key]
+        return super().pop(key, *args)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+    def copy(self):
+        return ProfileData(dict.items(self))
+
+    def __reduce__(self):
+        return ProfileData, (self.items(),)
+
 
 def get_profile_data():
     """
@@ -30,13 +112,15 @@ def get_dict_from_files(userdata):
     """
     Reading of the profile files according to the configured environment.
     Converts the information in the files into a data dictionary.
+    If lazy_load is enabled, the files are read the first time their data is used.
     :param userdata:
     :return dict:
     """
     c_file = None
     try:
-        json_total = {}
-        dict_paths = {}
+        lazy_load = Settings.PYTALOS_PROFILES.get('lazy_load')
+        json_total = ProfileData()
+        dict_paths = ProfileData()
         env = Settings.PYTALOS_PROFILES.get('environment')
         env_dir = os.path.abspath("settings/profiles") + os.sep + env + os.sep
         logger.debug(f"Reading profile data from {env_dir}")
@@ -46,8 +130,8 @@ def get_dict_from_files(userdata):
             folders = path[start_path:].split(os.sep)
             parent = reduce(dict.get, folders[:-1], json_total)
             parent2 = reduce(dict.get, folders[:-1], dict_paths)
-            files_dict = {}
-            files_path = {}
+            files_dict = ProfileData()
+            files_path = ProfileData()
             if folders[0] != '':
                 subdir = dict.fromkeys(filenames)
                 parent[folders[-1]] = subdir
@@ -57,29 +141,14 @@ def get_dict_from_files(userdata):
                 c_file = current_file
                 list_files.append(current_file)
                 index_extension = current_file.rfind('.')
-                if os.path.isfile(os.path.join(path + os.sep + current_file)):
-                    if current_file.endswith(".json"):
-                        aux = json.load(open(path + os.sep + current_file, encoding="utf8"))
-                        files_dict[current_file[:index_extension]] = aux
-                        files_path[current_file] = aux
-                    elif current_file.endswith(".yaml"):
-                        aux = files.yaml_to_dict(path + os.sep + current_file)
-                        files_dict[current_file[:index_extension]] = aux
-                        files_path[current_file] = aux
-                    elif current_file.endswith(".xlsx"):
-                        excel_wrapper = excel.ExcelWrapper(path + os.sep + current_file)
-                        excel_wrapper.set_all_sheets_header(1)
-                        aux = excel_wrapper.all_sheets_to_dict()
-                        files_dict[current_file[:index_extension]] = aux
-                        files_path[current_file] = aux
-                    elif current_file.endswith(".csv"):
-                        csv_wrapper = csv.CSVWrapper(path + os.sep + current_file)
-                        csv_wrapper.set_sheet_header(1)
-                        aux = csv_wrapper.current_sheet_to_dict()
-                        files_dict[current_file[:index_extension]] = aux
-                        files_path[current_file] = aux
-                    else:
-                        pass
+                if os.path.isfile(os.path.join(path + os.sep + current_file)) and \
+                        current_file.endswith(PROFILE_EXTENSIONS):
+                    aux = ProfileFile(path + os.sep + current_file)
+                    if not lazy_load:
+                        aux = aux.load()
+                    # The same file object is shared by both dictionaries, so the file is loaded only once
+                    files_dict[current_file[:index_extension]] = aux
+                    files_path[current_file] = aux
 
             if folders[-1] != '':
                 parent[folders[-1]] = files_dict
@@ -99,6 +168,8 @@ def get_dict_from_files(userdata):
 
         return json_total
 
+    except TalosErrorReadFile:
+        raise
     except Exception as ex:
         msg = f"Error in {c_file}: Data could not be imported. {ex}"
         logger.exception(msg)
@@ -107,6 +178,134 @@ def get_dict_from_files(userdata):
         raise TalosErrorReadFile(msg)
 
 
+def load_profile_file(file_path):
+    """
+    Read the data of a profile file. The parsed data is saved in the profiles cache folder if files_cache is enabled,
+    so the file is parsed again only when it changes.
+    :param file_path:
+    :return:
+    """
+    use_cache = Settings.PYTALOS_PROFILES.get('files_cache')
+    try:
+        cache_key = get_profile_cache_key(file_path)
+        cache_file = get_profile_cache_file(file_path)
+        if use_cache:
+            data = _read_profile_cache(cache_file, cache_key)
+            if data is not None:
+                logger.debug(f"Profile file loaded from cache: {file_path}")
+                return data
+
+        logger.debug(f"Parsing profile file: {file_path}")
+        data = _parse_profile_file(file_path)
+        if use_cache:
+            _write_profile_cache(cache_file, cache_key, data)
+        return data
+    except Exception as ex:
+        msg = f"Error in {os.path.basename(file_path)}: Data could not be imported. {ex}"
+        logger.exception(msg)
+        if os.environ.get('EXECUTION_TYPE') == 'Portal':
+            send_alert_portal(msg)
+        raise TalosErrorReadFile(msg)
+
+
+def _parse_profile_file(file_path):
+    """
+    Convert a JSON, YAML, XLSX or CSV profile file into data.
+    :param file_path:
+    :return:
+    """
+    if file_path.endswith(".json"):
+        with open(file_path, encoding="utf8") as json_file:
+            return json.load(json_file)
+    elif file_path.endswith(".yaml"):
+        return files.yaml_to_dict(file_path)
+    elif file_path.endswith(".xlsx"):
+        excel_wrapper = excel.ExcelWrapper(file_path)
+        excel_wrapper.set_all_sheets_header(PROFILE_HEADER_ROW)
+        return excel_wrapper.all_sheets_to_dict()
+    elif file_path.endswith(".csv"):
+        csv_wrapper = csv.CSVWrapper(file_path)
+        csv_wrapper.set_sheet_header(PROFILE_HEADER_ROW)
+        return csv_wrapper.current_sheet_to_dict()
+    return None
+
+
+def get_profile_cache_key(file_path):
+    """
+    Return the key of the cached data of a profile file. The data is parsed again when the file, the cache version,
+    the header row or the version of the python or the parser library changes.
+    :param file_path:
+    :return:
+    """
+    file_stat = os.stat(file_path)
+    return (PROFILES_CACHE_VERSION, PROFILE_HEADER_ROW, platform.python_version(),
+            _get_parser_version(os.path.splitext(file_path)[1]), file_stat.st_mtime_ns, file_stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def _get_parser_version(extension):
+    """
+    Return the version of the library that parses a type of profile file, None for json or the unknown types.
+    :param extension:
+    :return:
+    """
+    library = PROFILE_PARSERS.get(extension)
+    if not library:
+        return None
+    try:
+        return importlib.metadata.version('PyYAML' if library == 'yaml' else library)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def get_profile_cache_file(file_path):
+    """
+    Return the path of the cache file of a profile file.
+    :param file_path:
+    :return:
+    """
+    name = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+    return os.path.join(Settings.BASE_PATH.get(force=True), PROFILES_CACHE_DIR, f"{name}.pickle")
+
+
+def _read_profile_cache(cache_file, cache_key):
+    """
+    Return the data saved in the cache file if it was saved for the same version of the profile file, else None.
+    :param cache_file:
+    :param cache_key: version of the cache and the parsers, and modification time and size of the profile file
+    :return:
+    """
+    try:
+        with open(cache_file, 'rb') as file:
+            cached = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError):
+        return None
+    if cached.get('key') == cache_key:
+        return cached.get('data')
+    return None
+
+
+def _write_profile_cache(cache_file, cache_key, data):
+    """
+    Save the data of a profile file in the cache. The file is replaced atomically because parallel workers can load
+    the same profile files at the same time.
+    :param cache_file:
+    :param cache_key:
+    :param data:
+    :return:
+    """
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, 'wb') as file:
+            pickle.dump({'key': cache_key, 'data': data}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except (OSError, pickle.PicklingError) as ex:
+        logger.warning(f"The profile cache file could not be saved: {cache_file}. {ex}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
 def check_exist_environment_path():
     """
     Check if the environment configured in the settings exists as a profile folder. If the folder with the name of the
@@ -4,8 +4,10 @@ Classes and functionalities of utilities used in the environment.
 """
 import copy
 import datetime
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import time
 import traceback
@@ -13,7 +15,6 @@ import warnings
 from configparser import NoSectionError, NoOptionError
 
 import requests
-import yaml
 from behave.model import Feature
 from colorama import Fore
 from pkg_resources import parse_version
@@ -23,7 +24,7 @@ from arc.contrib.accessibility.axe_wrapper import AxeWrapper
 from arc.contrib.tools.formatters import replace_chars
 from arc.contrib.tools.repository import Repository
 from arc.contrib.utilities import get_valid_filename, set_test_default_data
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 
 from arc.core.behave.template_var import replace_template_var
 from arc.core.driver.driver_install import InstallDriver
@@ -64,15 +65,27 @@ from arc.reports.doc.create_report import CreateDOC
 from arc.reports.pdf.create_report import CreatePDF
 from arc.talos_virtual.core.contrib.mountebank.mountebank import MountebankWrapper
 from arc.talos_virtual.core.context import TalosVirtual
-from arc.talos_virtual.core.env_utils import create_dict_imposter
+from arc.talos_virtual.core.env_utils import create_dict_imposter, get_unified_imposter
+from arc.talos_virtual.core.contrib.native.stub_server import (
+    is_native_engine_enabled, get_stub_server, start_stub_server, stop_stub_server
+)
 from behave.contrib.scenario_autoretry import patch_scenario_with_autoretry
-from arc.contrib.tools.files import get_files_to_edit
+from arc.contrib.tools.files import save_files_to_edit
 from arc.settings.settings_manager import Settings
 
 
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
+# Jinja environment of the HTML reports, created once per process
+HTML_ENVIRONMENT = {}
+HTML_TEMPLATES_CACHE_DIR = os.path.join('.cache', 'html_templates')
+HTML_PAGES_MANIFEST = 'pages_manifest.json'
+# Minimum number of pages to render them with a process pool
+HTML_MIN_PAGES_POOL = 10
+# Extensions of the image files referenced by the data of the pages, their changes render the pages again
+HTML_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+
 
 class DynamicEnvironment:
     """
@@ -331,8 +344,8 @@ def valid_parameter(parameter, length):
         raise TalosConfigurationError(msg_error)
 
 
-from arc.core.behave.config_data import get_profile_data
-from arc.core.behave.template_var import get_global
+from arc.core.behave.config_data import get_profile_data, ProfileFile
+from arc.core.behave.template_var import get_global, clear_template_var_cache
 
 
 def save_profile_dict(repository):
@@ -345,6 +358,7 @@ def save_profile_dict(repository):
     final_dict['repositories'] = files_repositories
     template_var = get_global()
     template_var.update(final_dict)
+    clear_template_var_cache()
 
 
 def utils_before_all(context):
@@ -897,12 +911,12 @@ def _calculate_quality_gates(json_data):
 def _generate_html_reports(json_data):
     """
     This function generates the html reports.
+    The pages are rendered with a process pool and the pages whose data has not changed are not rendered again.
     :return:
     :rtype:
     """
     env, _ = load_env_html()
-
-    global_template = env.get_template("global_template.html")
+    html_path = f"{Settings.BASE_PATH.get(force=True)}/output/reports/html"
 
     data = {
         "page_title": f"{_('Global Report')}",
@@ -913,14 +927,13 @@ def _generate_html_reports(json_data):
 
     logger.debug("Data form HTML report configured")
 
-    global_template.stream(data).dump(f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/global.html")
-    feature_template = env.get_template("feature_template.html")
-    scenario_template = env.get_template("scenario_template.html")
+    pages = [("global_template.html", data, f"{html_path}/global.html")]
     html_files = [
-        f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/global.html",
+        f"{html_path}/global.html",
     ]
 
     attach_files = {}
+    include_sub_steps_in_results = Settings.PYTALOS_REPORTS.get('include_sub_steps_in_results')
     for feature in json_data['features']:
         feature['name'] = replace_chars(feature['name'])
         feature['short_name'] = get_short_name(feature['name'])
@@ -930,9 +943,8 @@ def _generate_html_reports(json_data):
             "feature": feature,
             "global_data": json_data['global_data']
         }
-        feature_template.stream(feature_data).dump(
-            f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/feature_{feature['short_name']}.html")
-        html_files.append(f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/feature_{feature['short_name']}.html")
+        pages.append(("feature_template.html", feature_data, f"{html_path}/feature_{feature['short_name']}.html"))
+        html_files.append(f"{html_path}/feature_{feature['short_name']}.html")
         for scenario in feature['elements']:
             if scenario['type'] != "background":
                 scenario['name'] = replace_chars(scenario['name'])
@@ -944,23 +956,157 @@ def _generate_html_reports(json_data):
                     "navbar_title": f"{_('Report for scenario')} {scenario['name']}",
                     "scenario": scenario,
                     "scenario_short_name": scenario['short_name'],
-                    "include_sub_steps_in_results": Settings.PYTALOS_REPORTS.get('include_sub_steps_in_results'),
+                    "include_sub_steps_in_results": include_sub_steps_in_results,
                     "global_data": json_data['global_data']
                 }
-                scenario_template.stream(scenario_data).dump(
-                    f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/scenario_{scenario['scenario_file_name']}.html")
-                file_path = f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/scenario_{scenario['scenario_file_name']}.html"
+                file_path = f"{html_path}/scenario_{scenario['scenario_file_name']}.html"
+                pages.append(("scenario_template.html", scenario_data, file_path))
                 html_files.append(file_path)
                 attach_files[file_path] = []
                 for step in scenario['steps']:
                     if step.get('screenshots'):
                         attach_files[file_path] += [screenshot for screenshot in step['screenshots']]
 
+    render_html_pages(pages, html_path)
+
     logger.debug(f"HTML templates loaded: {html_files}")
-    logger.debug(f"HTML scenario template loaded: {scenario_template}")
     return html_files, attach_files
 
 
+def render_html_pages(pages, html_path):
+    """
+    Render the pages of the HTML report. The pages already rendered with the same template and data are skipped.
+    :param pages: list of tuples (template name, data, file path)
+    :param html_path: folder of the HTML report, where the manifest of the rendered pages is saved
+    :return:
+    """
+    manifest_path = os.path.join(html_path, HTML_PAGES_MANIFEST)
+    try:
+        with open(manifest_path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    new_manifest = {}
+    pending = []
+    render_hash = get_html_render_hash()
+    for template_name, data, file_path in pages:
+        page_hash = get_html_page_hash(template_name, data, render_hash)
+        new_manifest[file_path] = page_hash
+        if manifest.get(file_path) == page_hash and os.path.isfile(file_path):
+            logger.debug(f"HTML page not changed: {file_path}")
+        else:
+            pending.append((template_name, data, file_path))
+
+    processes = Settings.PYTALOS_REPORTS.get('html_report_processes') or os.cpu_count() or 1
+    processes = min(processes, len(pending))
+    logger.info(f"Rendering {len(pending)} of {len(pages)} HTML report pages with {processes} processes")
+    # Daemon processes, like the portal executions, can not create child processes. The pages are rendered in
+    # forked processes that inherit the template vars and the settings set at runtime, the processes started with
+    # spawn would not have them, so the pages are rendered serially where fork is not available
+    if processes > 1 and len(pending) >= HTML_MIN_PAGES_POOL and not multiprocessing.current_process().daemon \
+            and 'fork' in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            pool.map(render_html_page, pending, chunksize=max(1, len(pending) // (processes * 4)))
+    else:
+        for page in pending:
+            render_html_page(page)
+
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(new_manifest, manifest_file)
+
+
+def render_html_page(page):
+    """
+    Render a page of the HTML report with the shared Jinja environment of the process.
+    :param page: tuple (template name, data, file path)
+    :return:
+    """
+    template_name, data, file_path = page
+    env, _ = load_env_html()
+    env.get_template(template_name).stream(data).dump(file_path)
+    return file_path
+
+
+def get_html_render_hash():
+    """
+    Return a hash of the inputs of the HTML report shared by all the pages: every template of the templates folder,
+    as the pages extend and include other templates, the data of the template vars replaced by the templates and the
+    reports settings, with the language of the report.
+    :return:
+    """
+    render_hash = hashlib.sha1()
+    templates_path = os.path.join(BASE_DIR, 'arc', 'resources', 'html_templates')
+    for path_name, dir_names, file_names in os.walk(templates_path):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(path_name, file_name)
+            file_stat = os.stat(file_path)
+            render_hash.update(f"{os.path.relpath(file_path, templates_path)}:{file_stat.st_mtime_ns}:"
+                               f"{file_stat.st_size};".encode('utf-8'))
+    render_hash.update(json.dumps(_get_html_hash_data(get_global()), sort_keys=True, default=str).encode('utf-8'))
+    render_hash.update(json.dumps(Settings.PYTALOS_REPORTS.get(), sort_keys=True, default=str).encode('utf-8'))
+    return render_hash.hexdigest()
+
+
+def _get_html_hash_data(data):
+    """
+    Return the data of the template vars to calculate the hash of the HTML report. The profile files not loaded yet
+    are represented by their path, modification time and size, so they are not loaded.
+    :param data:
+    :return:
+    """
+    if isinstance(data, ProfileFile):
+        if data.loaded:
+            return _get_html_hash_data(data.data)
+        file_stat = os.stat(data.file_path)
+        return [data.file_path, file_stat.st_mtime_ns, file_stat.st_size]
+    if isinstance(data, dict):
+        # dict.items does not load the lazy profile files of the profile data
+        return {str(key): _get_html_hash_data(value) for key, value in dict.items(data)}
+    if isinstance(data, (list, tuple)):
+        return [_get_html_hash_data(value) for value in data]
+    return data
+
+
+def _get_html_image_files(data):
+    """
+    Return the paths of the image files referenced by the data of a page of the HTML report.
+    :param data:
+    :return:
+    """
+    if isinstance(data, str):
+        return [data] if data.lower().endswith(HTML_IMAGE_EXTENSIONS) else []
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return []
+    images = []
+    for value in data:
+        images += _get_html_image_files(value)
+    return images
+
+
+def get_html_page_hash(template_name, data, render_hash=None):
+    """
+    Return a hash of the template, the data and the image files of a page of the HTML report, and of the inputs
+    shared by all the pages.
+    :param template_name:
+    :param data:
+    :param render_hash: hash of the inputs shared by all the pages, calculated if it is not given
+    :return:
+    """
+    page_hash = hashlib.sha1(f"{template_name}:{render_hash or get_html_render_hash()}".encode('utf-8'))
+    page_hash.update(json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+    for image_path in _get_html_image_files(data):
+        try:
+            file_stat = os.stat(image_path)
+            page_hash.update(f"{image_path}:{file_stat.st_mtime_ns}:{file_stat.st_size};".encode('utf-8'))
+        except OSError:
+            page_hash.update(f"{image_path}:missing;".encode('utf-8'))
+    return page_hash.hexdigest()
+
+
 def post_jira(reports, json_data):
     """
     This function generates the pdf reports.
@@ -1057,14 +1203,7 @@ def validate_generate_reports():
 
 
 def update_profile_files():
-    files_to_edit = get_files_to_edit()
-    for key, value in files_to_edit.items():
-        if key.endswith(".json"):
-            with open(key, 'w', encoding='utf8') as json_file:
-                json.dump(value, json_file)
-        elif key.endswith(".yaml"):
-            with open(key, 'w', encoding='utf8') as yaml_file:
-                yaml.dump(value, yaml_file)
+    save_files_to_edit()
 
 
 def generate_screenshot(context, step):
@@ -1411,15 +1550,55 @@ def run_accessibility_test(context):
             write_results(results, file_name)
 
 
+def start_talos_virtual():
+    """
+    This function starts the native engine of talos virtual with the imposter files, once per execution.
+    The imposters stay up across the features and the parallel workers.
+    :return:
+    """
+    if is_native_engine_enabled():
+        mountebank = MountebankWrapper()
+        start_stub_server([get_unified_imposter(mountebank)], manager_port=mountebank.manager_port)
+
+
+def stop_talos_virtual():
+    """
+    This function stops the native engine of talos virtual at the end of the execution.
+    :return:
+    """
+    if is_native_engine_enabled():
+        stop_stub_server()
+
+
+def finish_self_healing():
+    """
+    This function exports the web elements saved by the self-healing in the element store to the elements csv of
+    the repositories folder, the history versioned with the project, and removes the current elements csv of every
+    process at the end of the execution.
+    :return:
+    """
+    from arc.core.brain.scraping import CURRENT_ELEMENTS, ELEMENTS_CSV, ELEMENTS_DB, DATA_FIELD
+    from arc.core.brain.utils import export_element_store, remove_process_files
+
+    export_element_store(ELEMENTS_DB, ELEMENTS_CSV, DATA_FIELD)
+    remove_process_files(CURRENT_ELEMENTS)
+
+
 def init_talos_virtual(context):
     """
     This function initialize talos virtual if it is enabled in settings.
+    With the native engine the imposters are already running, the wrapper uses its mountebank API, and the imposters
+    changed by the previous feature are restored when the features run in the process of the engine.
     :param context:
     :return:
     """
     if Settings.TALOS_VIRTUAL.get('mountebank').get("enabled"):
         context.talosvirtual = TalosVirtual(context)
         context.talosvirtual.mountebank = MountebankWrapper()
+        if is_native_engine_enabled():
+            if get_stub_server():
+                get_stub_server().reset_imposters()
+            return
         context.talosvirtual.mountebank.start_process()
         create_dict_imposter(context)
         context.talosvirtual.mountebank.create_imposter(
@@ -1512,13 +1691,30 @@ def check_features_order(features):
 
 
 def load_env_html():
+    """
+    Return the Jinja environment of the HTML reports and the translation function.
+    The environment is created once per process and the compiled templates are saved in .cache/html_templates.
+    :return:
+    """
+    if HTML_ENVIRONMENT:
+        return HTML_ENVIRONMENT['env'], HTML_ENVIRONMENT['gettext']
+
     logger.debug('Configuring Babel environment for translations of the HTML report')
     gnu_translations = load_translation('html_reports')
 
+    bytecode_cache = None
+    cache_dir = os.path.join(BASE_DIR, HTML_TEMPLATES_CACHE_DIR)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except OSError as ex:
+        logger.warning(f"The HTML templates cache folder could not be created: {ex}")
+
     env = Environment(
         extensions=['jinja2.ext.i18n'],
         loader=FileSystemLoader(f"{BASE_DIR}/arc/resources/html_templates"),
         autoescape=select_autoescape(),
+        bytecode_cache=bytecode_cache,
     )
 
     env.install_gettext_translations(gnu_translations, newstyle=True)  # noqa
@@ -1534,6 +1730,8 @@ def load_env_html():
     env.filters['transform_accessibility_image_to_webp'] = transform_accessibility_image_to_webp
     env.filters['replace_template_var'] = replace_template_var
     env.filters['get_short_name'] = get_short_name
+    HTML_ENVIRONMENT['env'] = env
+    HTML_ENVIRONMENT['gettext'] = _
     return env, _
 
 
@@ -1604,6 +1802,9 @@ def save_metrics(json_data):
     """
     engine = get_db()
     with Session(engine) as session:
+        if Settings.PYTALOS_WEB.get('bulk_save_metrics'):
+            save_metrics_bulk(session, json_data)
+            return
         # Save execution
         execution = save_execution_data(session, json_data)
         # Save features, scenarios and steps.
@@ -1616,6 +1817,59 @@ def save_metrics(json_data):
                         save_step_data(session, step, execution_scenario.id, step_position)
 
 
+def save_metrics_bulk(session, json_data):
+    """
+        Save the execution, the features, scenarios, steps and sub steps in one transaction.
+        The ids are assigned in memory from the current maximum ids, so the rows of every table are inserted
+        together with executemany and the parent ids are known without reading the inserted rows.
+    :param session:
+    :param json_data:
+    :return:
+    """
+    from sqlalchemy import func, insert, select
+
+    # Inserting the execution first locks the database, so the maximum ids can not change until the commit
+    execution = Execution(**get_execution_data(json_data))
+    session.add(execution)
+    session.flush()
+    next_ids = {model: (session.scalar(select(func.max(model.id))) or 0) + 1
+                for model in (ExecutionFeature, ExecutionScenario, ExecutionStep)}
+
+    def next_id(model):
+        next_ids[model] += 1
+        return next_ids[model] - 1
+
+    features = []
+    scenarios = []
+    steps = []
+    for feature_position, feature in enumerate(json_data['features'], 1):
+        feature_data = get_feature_data(feature, execution.id, feature_position)
+        feature_data['id'] = next_id(ExecutionFeature)
+        features.append(feature_data)
+        for scenario_position, element in enumerate(feature['elements'], 1):
+            if element["type"] != "background":
+                scenario_data = get_scenario_data(element, feature_data['id'], scenario_position)
+                scenario_data['id'] = next_id(ExecutionScenario)
+                scenarios.append(scenario_data)
+                # Stack of steps to save, every step is saved before its sub steps
+                pending_steps = [(step, step_position, None)
+                                 for step_position, step in reversed(list(enumerate(element['steps'], 1)))]
+                while pending_steps:
+                    step, step_position, parent_step_id = pending_steps.pop()
+                    step_data = get_step_data(step, scenario_data['id'], step_position, parent_step_id)
+                    step_data['id'] = next_id(ExecutionStep)
+                    steps.append(step_data)
+                    pending_steps += [(sub_step, sub_step_position, step_data['id']) for sub_step_position, sub_step
+                                      in reversed(list(enumerate(step.get('sub_steps') or [], 1)))]
+
+    for model, rows in ((ExecutionFeature, features), (ExecutionScenario, scenarios), (ExecutionStep, steps)):
+        if rows:
+            session.execute(insert(model), rows)
+    session.commit()
+    logger.debug(f"Metrics saved: {len(features)} features, {len(scenarios)} scenarios and {len(steps)} steps")
+    return execution
+
+
 def add_summary_portal(results):
     try:
         if os.environ.get('EXECUTION_TYPE') == 'Portal':
@@ -1659,6 +1913,18 @@ def save_execution_data(session, json_data):
     :param json_data:
     :return:
     """
+    execution = Execution(**get_execution_data(json_data))
+    session.add(execution)
+    session.commit()
+    return execution
+
+
+def get_execution_data(json_data):
+    """
+        Given the json data return the columns of the execution.
+    :param json_data:
+    :return:
+    """
     _results = json_data['global_data']['results']
     results = {
         "total_features": _results['total_features'],
@@ -1680,10 +1946,7 @@ def save_execution_data(session, json_data):
         "environment": json_data['global_data']['environment'],
         "version": json_data['global_data']['version'],
     }
-    execution = Execution(**results)
-    session.add(execution)
-    session.commit()
-    return execution
+    return results
 
 
 def save_feature_data(session, feature, execution_id, position):
@@ -1696,6 +1959,20 @@ def save_feature_data(session, feature, execution_id, position):
     :param position:
     :return:
     """
+    execution_feature = ExecutionFeature(**get_feature_data(feature, execution_id, position))
+    session.add(execution_feature)
+    session.commit()
+    return execution_feature
+
+
+def get_feature_data(feature, execution_id, position):
+    """
+        Given a feature dict, the execution id and the position of the feature return the columns of the feature.
+    :param feature:
+    :param execution_id:
+    :param position:
+    :return:
+    """
     feature_data = {
         "execution_id": execution_id,
         "name": feature['name'],
@@ -1715,10 +1992,7 @@ def save_feature_data(session, feature, execution_id, position):
         "os": feature['operating_system'],
         "driver": feature['driver'],
     }
-    execution_feature = ExecutionFeature(**feature_data)
-    session.add(execution_feature)
-    session.commit()
-    return execution_feature
+    return feature_data
 
 
 def save_scenario_data(session, element, feature_id, position):
@@ -1731,6 +2005,20 @@ def save_scenario_data(session, element, feature_id, position):
     :param position:
     :return:
     """
+    execution_scenario = ExecutionScenario(**get_scenario_data(element, feature_id, position))
+    session.add(execution_scenario)
+    session.commit()
+    return execution_scenario
+
+
+def get_scenario_data(element, feature_id, position):
+    """
+        Given a scenario dict, the feature id and the position of the scenario return the columns of the scenario.
+    :param element:
+    :param feature_id:
+    :param position:
+    :return:
+    """
     element_data = {
         "feature_id": feature_id,
         "name": element['name'],
@@ -1746,10 +2034,7 @@ def save_scenario_data(session, element, feature_id, position):
         "end_time": element.get('end_time', 0),
         "duration": element.get('duration', 0)
     }
-    execution_scenario = ExecutionScenario(**element_data)
-    session.add(execution_scenario)
-    session.commit()
-    return execution_scenario
+    return element_data
 
 
 def save_step_data(session, step, scenario_id, position, parent_step_id=None):
@@ -1764,6 +2049,23 @@ def save_step_data(session, step, scenario_id, position, parent_step_id=None):
     :param parent_step_id:
     :return:
     """
+    execution_step = ExecutionStep(**get_step_data(step, scenario_id, position, parent_step_id))
+    session.add(execution_step)
+    session.commit()
+    for sub_step_position, sub_step in enumerate(step.get('sub_steps') or [], 1):
+        save_step_data(session, sub_step, scenario_id, sub_step_position, execution_step.id)
+
+
+def get_step_data(step, scenario_id, position, parent_step_id=None):
+    """
+        Given a step dict, the scenario id, the position of the step and the parent step id return the columns
+        of the step.
+    :param step:
+    :param scenario_id:
+    :param position:
+    :param parent_step_id:
+    :return:
+    """
     step_data = {
         "scenario_id": scenario_id,
         "parent_step": parent_step_id,
@@ -1783,12 +2085,7 @@ def save_step_data(session, step, scenario_id, position, parent_step_id=None):
             "status": StatusType.SKIPPED,
             "duration": 0
         })
-    execution_step = ExecutionStep(**step_data)
-    session.add(execution_step)
-    session.commit()
-    if hasattr(step, 'sub_steps') and len(step.get('sub_steps')):
-        for sub_step_position, sub_step in enumerate(step.get('sub_steps'), 1):
-            save_step_data(session, sub_step, scenario_id, sub_step_position, execution_step.id)
+    return step_data
 
 
 def start_recording(context, scenario):
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental execution of the scenarios.
+Every scenario has a fingerprint calculated from its Gherkin text, the source files of its step implementations, the
+code of the framework, the helpers and hooks of the project, the repositories data and the profile data of the active
+environment. The scenarios whose fingerprint passed in a previous execution are not run
+and their previous results are added to the talos_report.json.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from copy import deepcopy
+
+from colorama import Fore
+
+from arc.core.behave.config_data import get_profile_data
+from arc.core.behave.step_matcher import find_step_definition
+from arc.reports.custom_formatters import calculate_global_results
+from arc.reports.json_join import new_feature_results, add_scenario_results, set_feature_results
+from arc.settings.settings_manager import Settings
+
+logger = logging.getLogger(__name__)
+
+RESULTS_CACHE_FILE = os.path.join('.cache', 'results', 'scenarios.json')
+CACHED_SCENARIOS_DIR = 'incremental'
+# The results not used in this number of days are removed from the cache
+RESULTS_MAX_AGE_DAYS = 30
+
+# Fingerprint of the profile data by environment, of the source files and of the code of the project, calculated once
+PROFILE_FINGERPRINTS = {}
+FILE_FINGERPRINTS = {}
+CODE_FINGERPRINT = {'fingerprint': None}
+# Files of the repositories folder written by the self-healing in every execution, not part of the fingerprint
+REPOSITORIES_EXCLUDED_FILES = ('elements.csv', 'elements.db', 'elements.db-wal', 'elements.db-shm')
+
+
+def is_incremental_enabled():
+    """
+    Return True if the incremental execution is enabled.
+    :return:
+    """
+    return bool(Settings.PYTALOS_RUN.get('incremental.enabled', default=False))
+
+
+def get_results_cache_file():
+    """
+    Return the path of the file with the results of the scenarios that passed.
+    :return:
+    """
+    return os.path.join(Settings.BASE_PATH.get(force=True), RESULTS_CACHE_FILE)
+
+
+def get_cached_scenarios_dir():
+    """
+    Return the folder where every Behave process saves the fingerprints of the scenarios it has not run.
+    :return:
+    """
+    return os.path.join(Settings.REPORTS_PATH.get(force=True), CACHED_SCENARIOS_DIR)
+
+
+def reset_incremental_run():
+    """
+    Remove the fingerprints of the scenarios not run in the previous execution.
+    :return:
+    """
+    shutil.rmtree(get_cached_scenarios_dir(), ignore_errors=True)
+
+
+def _get_plain_data(data):
+    """
+    Return the data with all its dicts and lists, loading the profile files not loaded yet.
+    :param data:
+    :return:
+    """
+    if isinstance(data, dict):
+        return {str(key): _get_plain_data(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_get_plain_data(value) for value in data]
+    return data
+
+
+def get_profile_fingerprint():
+    """
+    Return the fingerprint of the profile data of the active environment.
+    :return:
+    """
+    environment = os.environ.get('Config_environment', Settings.PYTALOS_PROFILES.get('environment'))
+    if environment not in PROFILE_FINGERPRINTS:
+        profile_data = json.dumps(_get_plain_data(get_profile_data()), sort_keys=True, default=str)
+        PROFILE_FINGERPRINTS[environment] = hashlib.sha1(profile_data.encode('utf-8')).hexdigest()
+    return PROFILE_FINGERPRINTS[environment]
+
+
+def get_file_fingerprint(file_path):
+    """
+    Return the fingerprint of the content of a file, None if it can not be read.
+    :param file_path:
+    :return:
+    """
+    if file_path not in FILE_FINGERPRINTS:
+        try:
+            with open(file_path, 'rb') as source_file:
+                FILE_FINGERPRINTS[file_path] = hashlib.sha1(source_file.read()).hexdigest()
+        except OSError:
+            FILE_FINGERPRINTS[file_path] = None
+    return FILE_FINGERPRINTS[file_path]
+
+
+def _get_folder_files(folder, extensions=None, excluded_files=()):
+    """
+    Return the paths of the files of a folder and its subfolders, sorted.
+    :param folder:
+    :param extensions: extensions of the files returned, all the files if it is None
+    :param excluded_files: names of the files not returned
+    :return:
+    """
+    folder_files = []
+    for root, dirs, file_names in os.walk(folder):
+        dirs[:] = [name for name in dirs if name != '__pycache__']
+        folder_files += [os.path.join(root, name) for name in file_names if name not in excluded_files
+                         and (extensions is None or name.endswith(extensions))]
+    return sorted(folder_files)
+
+
+def get_code_fingerprint():
+    """
+    Return the fingerprint of the code shared by all the scenarios: the python files of the framework (the
+    environment.py hooks, the contrib wrappers and the default steps) and of the helpers folder (the page objects and
+    the hooks of the project), and the files of the repositories folder (the selectors and literals).
+    :return:
+    """
+    if CODE_FINGERPRINT['fingerprint'] is None:
+        arc_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        code_files = _get_folder_files(arc_path, '.py') + _get_folder_files(Settings.HELPERS_PATH.get(), '.py')
+        code_files += _get_folder_files(Settings.REPOSITORIES.get(), excluded_files=REPOSITORIES_EXCLUDED_FILES)
+        base_path = str(Settings.BASE_PATH.get(force=True))
+        code = hashlib.sha1()
+        for file_path in code_files:
+            relative_path = os.path.relpath(file_path, base_path).replace('\\', '/')
+            code.update(f"{relative_path}:{get_file_fingerprint(file_path)};".encode('utf-8'))
+        CODE_FINGERPRINT['fingerprint'] = code.hexdigest()
+    return CODE_FINGERPRINT['fingerprint']
+
+
+def get_step_source(step_definition):
+    """
+    Return the fingerprint of the source file of the implementation of a step definition, so the changes of the
+    functions of its module called by the step are detected too.
+    :param step_definition:
+    :return:
+    """
+    if step_definition is None:
+        return None
+    func = step_definition.func
+    try:
+        source_file = inspect.getsourcefile(func)
+    except TypeError:
+        source_file = None
+    if source_file is None:
+        return f"{func.__module__}.{func.__qualname__}"
+    return f"{func.__module__}.{func.__qualname__}:{get_file_fingerprint(os.path.abspath(source_file))}"
+
+
+def get_scenario_fingerprint(scenario, step_registry, config):
+    """
+    Return the fingerprint of a scenario: its Gherkin text with the background steps, the source files of the step
+    implementations, the code of the project, the profile data and the user data of the execution.
+    :param scenario:
+    :param step_registry:
+    :param config:
+    :return:
+    """
+    steps = []
+    for step in scenario.all_steps:
+        steps.append({
+            'keyword': step.keyword,
+            'step_type': step.step_type,
+            'name': step.name,
+            'text': step.text,
+            'table': [step.table.headings] + [row.cells for row in step.table.rows] if step.table else None,
+            'source': get_step_source(find_step_definition(step_registry, step))
+        })
+    data = {
+        'feature': scenario.feature.filename,
+        'keyword': scenario.keyword,
+        'name': scenario.name,
+        'tags': sorted(scenario.effective_tags),
+        'steps': steps,
+        'code': get_code_fingerprint(),
+        'profiles': get_profile_fingerprint(),
+        'userdata': dict(config.userdata),
+        'run_type': [os.environ.get('RUN_TYPE'), os.environ.get('PARALLEL_TYPE')]
+    }
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def load_results_cache():
+    """
+    Return the results of the scenarios that passed in previous executions by fingerprint, with the data of their
+    features by feature name.
+    :return:
+    """
+    try:
+        with open(get_results_cache_file(), encoding='utf-8') as cache_file:
+            results_cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {'features': {}, 'scenarios': {}}
+    results_cache.setdefault('features', {})
+    results_cache.setdefault('scenarios', {})
+    return results_cache
+
+
+def save_results_cache(results_cache):
+    """
+    Save the results of the scenarios that passed. The file is replaced atomically.
+    :param results_cache:
+    :return:
+    """
+    cache_path = get_results_cache_file()
+    temp_file = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_file, 'w', encoding='utf-8') as cache_file:
+            json.dump(results_cache, cache_file, ensure_ascii=False)
+        os.replace(temp_file, cache_path)
+    except (OSError, TypeError, ValueError) as ex:
+        logger.warning(f"The results cache file could not be saved: {cache_path}. {ex}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def skip_unchanged_scenarios(features, step_registry, config):
+    """
+    Skip the scenarios whose fingerprint passed in a previous execution. The features with all their scenarios
+    skipped are skipped too, so their hooks are not run.
+    :param features:
+    :param step_registry:
+    :param config:
+    :return: number of scenarios skipped
+    """
+    results_cache = load_results_cache()
+    cached_fingerprints = []
+    for feature in features:
+        scenarios = [scenario for scenario in feature.walk_scenarios() if scenario.should_run(config)]
+        cached_scenarios = []
+        for scenario in scenarios:
+            scenario.talos_fingerprint = get_scenario_fingerprint(scenario, step_registry, config)
+            if scenario.talos_fingerprint in results_cache['scenarios']:
+                cached_scenarios.append(scenario)
+
+        if scenarios and len(cached_scenarios) == len(scenarios):
+            feature.skip()
+        else:
+            for scenario in cached_scenarios:
+                scenario.skip()
+        for scenario in cached_scenarios:
+            logger.info(f"Scenario not run, it passed in a previous execution without changes: {scenario.name}")
+            cached_fingerprints.append(scenario.talos_fingerprint)
+
+    if cached_fingerprints:
+        print(Fore.YELLOW + f"Incremental execution: {len(cached_fingerprints)} scenarios passed in a previous "
+                            f"execution without changes and they are not run")
+        save_cached_fingerprints(cached_fingerprints)
+    return len(cached_fingerprints)
+
+
+def save_cached_fingerprints(fingerprints):
+    """
+    Save the fingerprints of the scenarios not run by this Behave process, so the main process can add their results
+    to the json report.
+    :param fingerprints:
+    :return:
+    """
+    cached_dir = get_cached_scenarios_dir()
+    os.makedirs(cached_dir, exist_ok=True)
+    with open(os.path.join(cached_dir, f"{uuid.uuid4().hex}.json"), 'w', encoding='utf-8') as cached_file:
+        json.dump(fingerprints, cached_file)
+
+
+def load_cached_fingerprints():
+    """
+    Return the fingerprints of the scenarios not run by all the Behave processes of the execution.
+    :return:
+    """
+    cached_dir = get_cached_scenarios_dir()
+    if not os.path.isdir(cached_dir):
+        return []
+    fingerprints = []
+    for file_name in sorted(os.listdir(cached_dir)):
+        with open(os.path.join(cached_dir, file_name), encoding='utf-8') as cached_file:
+            fingerprints += json.load(cached_file)
+    return fingerprints
+
+
+def _get_location_line(element):
+    """
+    Return the line of the location of a scenario, used to keep the scenarios in the order of the feature file.
+    :param element:
+    :return:
+    """
+    line = str(element.get('location', '')).rpartition(':')[2]
+    return int(line) if line.isdigit() else 0
+
+
+def _remove_screenshots(steps):
+    """
+    Remove the screenshots of the steps saved in the cache, their files are deleted with the old reports.
+    :param steps:
+    :return:
+    """
+    for step in steps:
+        if 'screenshots' in step:
+            step['screenshots'] = []
+        _remove_screenshots(step.get('sub_steps') or [])
+
+
+def add_cached_results(report, results_cache, fingerprints):
+    """
+    Add the cached results of the scenarios not run to their features of the report and calculate again the results
+    of the features and the global results.
+    :param report:
+    :param results_cache:
+    :param fingerprints:
+    :return: number of scenarios added
+    """
+    features = {feature['name']: feature for feature in report['features']}
+    changed_features = []
+    for fingerprint in fingerprints:
+        cached = results_cache['scenarios'].get(fingerprint)
+        if cached is None:
+            logger.warning(f"The cached result of a scenario not run has not been found: {fingerprint}")
+            continue
+        feature = features.get(cached['feature'])
+        if feature is None:
+            feature = deepcopy(results_cache['features'][cached['feature']])
+            feature['elements'] = []
+            features[feature['name']] = feature
+            report['features'].append(feature)
+        element = deepcopy(cached['element'])
+        element['cached'] = True
+        feature['elements'].append(element)
+        cached['last_used'] = time.time()
+        if feature not in changed_features:
+            changed_features.append(feature)
+
+    for feature in changed_features:
+        feature['elements'].sort(key=_get_location_line)
+        results = new_feature_results()
+        for element in feature['elements']:
+            add_scenario_results(results, element)
+        set_feature_results(feature, results)
+        if feature.get('status') in (None, 'skipped', 'untested'):
+            feature['status'] = 'passed'
+
+    if changed_features:
+        global_results = report['global_data']['results']
+        start_time, end_time = global_results.get('start_time'), global_results.get('end_time')
+        global_results.update(calculate_global_results(report['features']))
+        global_results['start_time'] = start_time or global_results['start_time']
+        global_results['end_time'] = end_time or global_results['end_time']
+    return sum(1 for fingerprint in fingerprints if fingerprint in results_cache['scenarios'])
+
+
+def update_results_cache(report, results_cache):
+    """
+    Add the results of the scenarios that passed in this execution to the cache and remove the old ones.
+    :param report:
+    :param results_cache:
+    :return:
+    """
+    now = time.time()
+    for feature in report['features']:
+        for element in feature.get('elements', []):
+            fingerprint = element.get('fingerprint')
+            if not fingerprint or element.get('cached') or element.get('status') != 'passed':
+                continue
+            element = deepcopy(element)
+            _remove_screenshots(element.get('steps', []))
+            results_cache['scenarios'][fingerprint] = {'feature': feature['name'], 'element': element,
+                                                       'last_used': now}
+            results_cache['features'][feature['name']] = {key: value for key, value in feature.items()
+                                                          if key != 'elements'}
+
+    max_age = RESULTS_MAX_AGE_DAYS * 24 * 3600
+    results_cache['scenarios'] = {fingerprint: cached for fingerprint, cached in results_cache['scenarios'].items()
+                                  if now - cached.get('last_used', 0) < max_age}
+    used_features = {cached['feature'] for cached in results_cache['scenarios'].values()}
+    results_cache['features'] = {name: feature for name, feature in results_cache['features'].items()
+                                 if name in used_features}
+
+
+def apply_incremental_results(report_path):
+    """
+    Add the previous results of the scenarios not run to the json report and save the results of the scenarios that
+    passed in this execution for the next ones.
+    :param report_path:
+    :return:
+    """
+    try:
+        with open(report_path, encoding='utf-8') as json_file:
+            report = json.load(json_file)
+    except (OSError, ValueError) as ex:
+        logger.warning(f"The incremental results have not been added to the json report: {ex}")
+        return
+
+    results_cache = load_results_cache()
+    fingerprints = load_cached_fingerprints()
+    if fingerprints:
+        added = add_cached_results(report, results_cache, fingerprints)
+        temp_path = f"{report_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as json_file:
+            json.dump(report, json_file, ensure_ascii=False)
+        os.replace(temp_path, report_path)
+        logger.info(f"Results of {added} scenarios of previous executions added to the json report")
+
+    update_results_cache(report, results_cache)
+    save_results_cache(results_cache)
@@ -12,7 +12,11 @@ These args parse are:
     - parse by features
 """
 import argparse
+import json
 import logging
+import os
+import re
+import shlex
 
 from behave.model import ScenarioOutline
 from behave.runner_util import parse_features, collect_feature_locations
@@ -34,10 +38,14 @@ SCENARIOS = 'scenarios'
 FEATURES = 'features'
 ENVIRONMENTS = 'environments'
 MULTI_BROWSERS_SCENARIOS = 'multi_scenarios_browsers'
+STATIC = 'static'
+DYNAMIC = 'dynamic'
 BROWSER_HELP = 'Launch configuration driver properties file'
 __CLI_TITLE = 'CLI for TALOSBDD Automation Framework Parallel Execution'
 MSG_PROP = 'Properties to run:'
 
+SCENARIOS_DURATION = {}
+
 
 def parse_parallel_schema_args(args=None):
     """
@@ -50,6 +58,12 @@ def parse_parallel_schema_args(args=None):
         'scenarios', 'features', 'browsers', 'environments', 'multi_scenarios_browsers'
     ],
                         help='Allow parallel execution', required=False)
+    parser.add_argument('--scheduler', choices=[STATIC, DYNAMIC],
+                        help='Scheduling of the parallel scenarios. Default = PYTALOS_RUN parallel.scheduler',
+                        default=Settings.PYTALOS_RUN.get('parallel.scheduler') or STATIC)
+    parser.add_argument('--warm-workers', action='store_true', dest='warm_workers',
+                        help='Reuse the hooks and steps loaded in each worker process for all its jobs',
+                        default=bool(Settings.PYTALOS_RUN.get('parallel.warm_workers')))
 
     args = args.split(' ')
     parallel_args, unknown = parser.parse_known_args(args)
@@ -291,15 +305,114 @@ def get_scenarios_iterator(parallel_args, scenarios_args):
     return iterator
 
 
-def run_scenarios_parallel(parallel_args, run_args, pool, run_behave):
+def get_scenarios_dynamic_iterator(parallel_args, scenarios_args):
+    """
+    Generation of the iterator for dynamic parallel executions for scenarios.
+    The scenarios are sorted by the duration of the previous execution, the longest first, and each job only
+    includes the feature file of its scenario.
+    :param parallel_args:
+    :param scenarios_args:
+    :return:
+    """
+    from arc.core.behave.runner import CustomModelRunner
+    tags = parallel_args.tags.split(',')
+    scenarios = sort_scenarios_by_duration(get_scenarios_from_tag(tags, with_filename=True))
+    logger.debug(f"Running dynamic iterator for scenarios: {scenarios} and tags: {tags}")
+
+    iterator = []
+    for scenario, filename in scenarios:
+        params = add_extra_args_for_parallel(scenarios_args)
+        params += f" -n \"{scenario}\" --tags {parallel_args.tags}"
+        params += f" -i {shlex.quote(get_feature_include_pattern(filename))}"
+        config = BehaveConfiguration(command_args=params, run_settings=settings)
+        iterator.append((config, CustomModelRunner))
+
+    logger.info(MSG_PROP)
+    for scenario, _ in scenarios:
+        logger.info(f"--\t{scenario} ({SCENARIOS_DURATION.get(scenario, 'no previous duration')})")
+    logger.info('-' * 50)
+
+    return iterator
+
+
+def get_feature_include_pattern(filename):
+    """
+    Return the include pattern of Behave that only matches a feature file. The pattern matches the whole path of the
+    file from a path separator, so the files with the same name in other folders or ending with the same name are not
+    included, and the separators match both in Windows and Linux.
+    :param filename: path of the feature file, relative to the project or absolute
+    :return:
+    """
+    parts = [part for part in re.split(r'[\\/]', os.path.normpath(filename)) if part]
+    return r'(^|[\\/])' + r'[\\/]'.join(re.escape(part) for part in parts) + '$'
+
+
+def sort_scenarios_by_duration(scenarios):
+    """
+    Sort scenarios by the duration of the previous execution, the longest first.
+    Scenarios without previous duration are considered the longest ones.
+    :param scenarios: list of tuples with the scenario name and its feature file
+    :return:
+    """
+    return sorted(scenarios, key=lambda scenario: SCENARIOS_DURATION.get(scenario[0], float('inf')), reverse=True)
+
+
+def load_scenarios_duration(report_path=None):
+    """
+    Load the duration of the scenarios from the talos_report.json of the previous execution.
+    It must be called before the output folder is deleted.
+    :param report_path:
+    :return:
+    """
+    report_path = report_path or os.path.join(Settings.REPORTS_PATH.get(force=True), 'talos_report.json')
+    if not os.path.exists(report_path):
+        logger.debug(f"There is no previous json report to get the scenarios duration: {report_path}")
+        return SCENARIOS_DURATION
+
+    try:
+        with open(report_path, encoding='utf8') as json_file:
+            report = json.load(json_file)
+    except (OSError, ValueError) as ex:
+        logger.warning(f"The scenarios duration could not be loaded from the previous json report: {ex}")
+        return SCENARIOS_DURATION
+
+    for feature in report.get('features', []):
+        for scenario in feature.get('elements', []):
+            if scenario.get('keyword') != 'Background' and scenario.get('duration') is not None:
+                SCENARIOS_DURATION[scenario['name']] = scenario['duration']
+    logger.debug(f"Scenarios duration loaded from previous json report: {len(SCENARIOS_DURATION)}")
+    return SCENARIOS_DURATION
+
+
+def run_behave_job(job):
     """
-    Run iterator for parallel executions for scenarios
+    Run a single Behave job of the dynamic scheduler.
+    :param job: tuple with the run behave function, the configuration and the runner class
+    :return:
+    """
+    run_behave, config, runner_class = job
+    return run_behave(config, runner_class)
+
+
+def run_scenarios_parallel(parallel_args, run_args, pool, run_behave, scheduler=STATIC):
+    """
+    Run iterator for parallel executions for scenarios.
+    With the dynamic scheduler the workers pull the scenarios one by one from the pool queue.
     :param parallel_args:
     :param run_args:
     :param pool:
     :param run_behave:
+    :param scheduler:
     :return:
     """
+    if scheduler == DYNAMIC:
+        logger.debug("Running dynamic iterator for scenarios")
+        iterator = get_scenarios_dynamic_iterator(parallel_args, run_args)
+        jobs = [(run_behave, config, runner_class) for config, runner_class in iterator]
+        with pool as process:
+            results = list(process.imap_unordered(run_behave_job, jobs, chunksize=1))
+            return results
+
     logger.debug(f"Running iterator for scenarios")
     iterator = get_scenarios_iterator(parallel_args, run_args)
     with pool as process:
@@ -376,10 +489,11 @@ def run_features_parallel(parallel_args, run_args, pool, run_behave):
         return results
 
 
-def get_scenarios_from_tag(tags):
+def get_scenarios_from_tag(tags, with_filename=False):
     """
     Get scenarios from tags
     :param tags:
+    :param with_filename: return tuples with the scenario name and its feature file
     :return:
     """
     feature_locations = [filename for filename in collect_feature_locations([Settings.TEST_PATH.get(force=True)])]
@@ -387,27 +501,8 @@ def get_scenarios_from_tag(tags):
 
     scenarios = []
     for feature in features:
-        if any(check in feature.tags for check in tags):
-            for scenario in feature.scenarios:
-                if isinstance(scenario, ScenarioOutline):
-                    for _scenario in scenario.scenarios:
-                        scenarios.append(_scenario.name)
-                else:
-                    scenarios.append(scenario.name)
-        else:
-            for scenario in feature.scenarios:
-                if any(check in scenario.tags for check in tags):
-                    if isinstance(scenario, ScenarioOutline):
-                        for _scenario in scenario.scenarios:
-                            scenarios.append(_scenario.name)
-                    else:
-                        scenarios.append(scenario.name)
-                else:
-                    # If any tag isn't included in the main scenario, then check the children scenarios tags
-                    if isinstance(scenario, ScenarioOutline):
-                        for _scenario in scenario.scenarios:
-                            if any(check in _scenario.tags for check in tags):
-                                scenarios.append(_scenario.name)
+        for scenario_name in _get_feature_scenarios_from_tag(feature, tags):
+            scenarios.append((scenario_name, feature.filename) if with_filename else scenario_name)
     try:
         if not scenarios:
             msg = 'There is no scenario with that expression. No scenario has been run.'
@@ -419,3 +514,35 @@ def get_scenarios_from_tag(tags):
         return scenarios
     except Exception:
         pass
+
+
+def _get_feature_scenarios_from_tag(feature, tags):
+    """
+    Get the scenario names of a feature that match the tags.
+    :param feature:
+    :param tags:
+    :return:
+    """
+    scenarios = []
+    if any(check in feature.tags for check in tags):
+        for scenario in feature.scenarios:
+            if isinstance(scenario, ScenarioOutline):
+                for _scenario in scenario.scenarios:
+                    scenarios.append(_scenario.name)
+            else:
+                scenarios.append(scenario.name)
+    else:
+        for scenario in feature.scenarios:
+            if any(check in scenario.tags for check in tags):
+                if isinstance(scenario, ScenarioOutline):
+                    for _scenario in scenario.scenarios:
+                        scenarios.append(_scenario.name)
+                else:
+                    scenarios.append(scenario.name)
+            else:
+                # If any tag isn't included in the main scenario, then check the children scenarios tags
+                if isinstance(scenario, ScenarioOutline):
+                    for _scenario in scenario.scenarios:
+                        if any(check in _scenario.tags for check in tags):
+                            scenarios.append(_scenario.name)
+    return scenarios
@@ -22,12 +22,13 @@ from behave.step_registry import registry as the_step_registry  # noqa
 
 from arc.core.behave.configuration import BehaveConfiguration
 from arc.core.behave.env_utils import check_features_order
+from arc.core.behave.incremental import is_incremental_enabled, skip_unchanged_scenarios
 from arc.core.behave.parallel import (
     run_browsers_parallel, parse_parallel_schema_args,
     parse_parallel_browsers_args, run_scenarios_parallel, parse_parallel_scenarios_args, run_features_parallel,
     parse_parallel_features_args, parse_parallel_environments_args, run_environments_parallel,
     parse_parallel_scenarios_browser_args, run_scenarios_browsers_parallel, ENVIRONMENTS, BROWSERS, SCENARIOS, FEATURES,
-    MULTI_BROWSERS_SCENARIOS
+    MULTI_BROWSERS_SCENARIOS, DYNAMIC, load_scenarios_duration
 )
 from arc.core.paths.directories import get_steps_dir, import_default_steps_dir
 from arc.environment import after_execution, before_execution
@@ -45,6 +46,11 @@ logger = logging.getLogger(__name__)
 
 ERROR_HOOK_MSG = []
 SCENARIOS_RUN = []
+WARM_WORKER = {
+    'hooks': None,
+    'steps_loaded': False,
+    'feature_locations': {}
+}
 
 
 class CustomModelRunner(Runner):
@@ -141,6 +147,9 @@ class CustomModelRunner(Runner):
         failed_count = 0
         undefined_steps_initial_size = len(self.undefined_steps)
         features = check_features_order(features)
+        cached_scenarios = 0
+        if is_incremental_enabled():
+            cached_scenarios = skip_unchanged_scenarios(features, self.step_registry, self.config)
         features_run = []
         for feature in features:
             if run_feature:
@@ -172,7 +181,7 @@ class CustomModelRunner(Runner):
             for reporter in self.config.reporters:
                 reporter.feature(feature)
 
-        if len(features_run) == 0 and run_feature is not False:
+        if len(features_run) == 0 and run_feature is not False and cached_scenarios == 0:
             msg = 'There is no scenario with that expression. No scenario has been run.'
             print(msg)
             logger.warning(msg)
@@ -200,13 +209,30 @@ class CustomModelRunner(Runner):
         # XXX-MAYBE: or context.failed)
         return failed
 
-    def run_with_paths(self):
+    def load_hooks(self, filename=None):
         """
-        Run Behave model with feature paths.
+        Load the hooks of the environment file.
+        Warm workers reuse the hooks loaded by the first job of the process.
+        :param filename:
         :return:
         """
-        self.context = Context(self)
-        self.load_hooks()
+        if is_warm_worker() and WARM_WORKER['hooks'] is not None:
+            self.hooks = WARM_WORKER['hooks']
+            return
+
+        super(CustomModelRunner, self).load_hooks(filename)
+        if is_warm_worker():
+            WARM_WORKER['hooks'] = self.hooks
+
+    def load_all_step_definitions(self):
+        """
+        Load the user step definitions and the default steps.
+        Warm workers keep the steps in the step registry, so they are only loaded by the first job of the process.
+        :return:
+        """
+        if is_warm_worker() and WARM_WORKER['steps_loaded']:
+            logger.debug("Reusing the step definitions loaded in the warm worker")
+            return
 
         try:
             self.load_step_definitions(get_steps_dir(self.config.steps_dir))
@@ -215,12 +241,37 @@ class CustomModelRunner(Runner):
                 send_alert_portal('ERROR: Step has already been defined.')
                 print_portal_console('ERROR: Step has already been defined.')
         import_default_steps_dir()
+        WARM_WORKER['steps_loaded'] = True
+
+    def feature_locations(self):
+        """
+        Collect the feature file locations.
+        Warm workers only walk the feature paths once.
+        :return:
+        """
+        if not is_warm_worker():
+            return super(CustomModelRunner, self).feature_locations()
+
+        paths = tuple(self.config.paths)
+        if paths not in WARM_WORKER['feature_locations']:
+            WARM_WORKER['feature_locations'][paths] = super(CustomModelRunner, self).feature_locations()
+        return WARM_WORKER['feature_locations'][paths]
+
+    def run_with_paths(self):
+        """
+        Run Behave model with feature paths.
+        :return:
+        """
+        self.context = Context(self)
+        self.load_hooks()
+        self.load_all_step_definitions()
 
         # -- ENSURE: context.execute_steps() works in weird cases (hooks, ...)
         # self.setup_capture()
         # self.run_hook("before_all", self.context)
 
         # -- STEP: Parse all feature files (by using their file location).
+        # The features are parsed in every job, also in warm workers, because the model is modified while running.
         feature_locations = [filename for filename in self.feature_locations()
                              if not self.config.exclude(filename)]
 
@@ -240,6 +291,14 @@ class CustomModelRunner(Runner):
         return self.run_model()
 
 
+def is_warm_worker():
+    """
+    Return True if the current process is a parallel worker that reuses the hooks and steps between jobs.
+    :return:
+    """
+    return os.environ.get('PARALLEL_WARM_WORKERS') == 'True'
+
+
 def _get_final_features(features):
     final_features = []
     for current_feature in features:
@@ -266,7 +325,7 @@ def make_behave_argv(verbose: bool = False, junit: bool = False, format_pretty:
                      tags: [str, list] = None, scenario_names: str | list = None, conf_properties=None,
                      allure: bool = False, teamcity: bool = False,
                      parallel=False, processes: int = 5, includes: list = None, excludes: list = None,
-                     environment=None, **kwargs):
+                     environment=None, scheduler: str = None, warm_workers: bool = False, **kwargs):
     """
     This function converts parameters to behave arguments.
     :param verbose:
@@ -282,6 +341,8 @@ def make_behave_argv(verbose: bool = False, junit: bool = False, format_pretty:
     :param includes:
     :param excludes:
     :param environment:
+    :param scheduler:
+    :param warm_workers:
     :param kwargs:
     :return:
     """
@@ -331,6 +392,10 @@ def make_behave_argv(verbose: bool = False, junit: bool = False, format_pretty:
     if parallel:
         params = params + f" --parallel {parallel}"
         params = params + f" --processes {str(processes)}"
+        if scheduler:
+            params = params + f" --scheduler {scheduler}"
+        if warm_workers:
+            params = params + " --warm-workers"
 
         if environment:
             params = params + f" --environment {','.join(environment)}"
@@ -365,20 +430,26 @@ def run_parallel(args):
     parallel_args, run_args = parse_parallel_schema_args(args)
     parallel_schema = parallel_args.parallel
     processes = parallel_args.processes
-    pool = Pool(processes)
+    scheduler = parallel_args.scheduler
 
     logger.info("Parallel options configured:")
     logger.info(f"Parallel schema: {parallel_schema}")
     logger.info(f"Parallel processes: {processes}")
+    logger.info(f"Parallel scheduler: {scheduler}")
+    logger.info(f"Parallel warm workers: {parallel_args.warm_workers}")
 
+    # The environment must be set before the pool is created so that the worker processes inherit it
     os.environ['PARALLEL_TYPE'] = parallel_schema
+    os.environ['PARALLEL_WARM_WORKERS'] = str(parallel_args.warm_workers)
+    pool = Pool(processes)
+
     results = []
     if parallel_schema == BROWSERS:
         parallel_args, browser_args = parse_parallel_browsers_args(run_args)
         results = run_browsers_parallel(parallel_args, browser_args, pool, run_behave)
     elif parallel_schema == SCENARIOS:
         parallel_args, scenarios_args = parse_parallel_scenarios_args(run_args)
-        results = run_scenarios_parallel(parallel_args, scenarios_args, pool, run_behave)
+        results = run_scenarios_parallel(parallel_args, scenarios_args, pool, run_behave, scheduler=scheduler)
 
     elif parallel_schema == FEATURES:
         parallel_args, features_args = parse_parallel_features_args(run_args)
@@ -421,6 +492,10 @@ def main(args=None, env=None):
     logger.info('Starting TalosBDD main')
     os.environ['RUN_TYPE'] = 'parallel' if '--parallel' in args or ' -x ' in args else 'sequential'
 
+    if os.environ['RUN_TYPE'] == 'parallel' and parse_parallel_schema_args(args)[0].scheduler == DYNAMIC:
+        # The durations must be loaded before the old reports are deleted
+        load_scenarios_duration()
+
     before_execution()
     if os.environ['RUN_TYPE'] == 'parallel':
         finish_code = run_parallel(args)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Indexed lookup of step definitions for the Behave step registry.
+
+Behave looks for the step definition of every step by trying every registered pattern in order until one matches.
+The index groups the step definitions by the first word of their literal prefix and keeps the literal texts that a
+matching step text must contain, so only the definitions that can match a step text are tried.
+It also remembers the definition found for every step text.
+The order of the registered step definitions is kept, so the first matching definition is the same as in Behave.
+"""
+import logging
+import re
+
+from behave.matchers import ParseMatcher, RegexMatcher
+
+logger = logging.getLogger(__name__)
+
+REGEX_SPECIAL_CHARS = '.^$*+?{}[]\\|()'
+REGEX_QUANTIFIERS = '*+?{'
+FIRST_WORD_REGEX = re.compile(r'(\S+)\s')
+
+
+def get_literal_prefix(step_definition):
+    """
+    Return the literal text at the beginning of a step definition pattern and if that text is the complete pattern.
+    :param step_definition:
+    :return: tuple (prefix, complete)
+    """
+    pattern = step_definition.pattern
+    if isinstance(step_definition, ParseMatcher):
+        return _get_parse_literal_prefix(pattern)
+    if isinstance(step_definition, RegexMatcher):
+        return _get_regex_literal_prefix(pattern, step_definition.regex.pattern.endswith('$'))
+    return '', False
+
+
+def get_required_literal(step_definition):
+    """
+    Return the longest literal text that any step text matching the step definition must contain.
+    :param step_definition:
+    :return:
+    """
+    if isinstance(step_definition, ParseMatcher):
+        literals = _get_parse_literals(step_definition.pattern)
+    elif isinstance(step_definition, RegexMatcher):
+        literals = _get_regex_literals(step_definition.pattern)
+    else:
+        literals = []
+    return max(literals, key=len, default='')
+
+
+def _get_parse_literal_prefix(pattern):
+    """
+    Literal prefix of a parse pattern. '{{' and '}}' are escaped braces.
+    :param pattern:
+    :return:
+    """
+    prefix = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char in '{}' and pattern[index:index + 2] == char * 2:
+            prefix.append(char)
+            index += 2
+            continue
+        if char == '{':
+            return ''.join(prefix), False
+        prefix.append(char)
+        index += 1
+    return ''.join(prefix), True
+
+
+def _get_parse_literals(pattern):
+    """
+    Literal texts between the fields of a parse pattern.
+    :param pattern:
+    :return:
+    """
+    literals = ['']
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char in '{}' and pattern[index:index + 2] == char * 2:
+            literals[-1] += char
+            index += 2
+        elif char == '{':
+            end = pattern.find('}', index)
+            if end == -1:
+                return []
+            literals.append('')
+            index = end + 1
+        else:
+            literals[-1] += char
+            index += 1
+    return literals
+
+
+def _get_regex_literals(pattern):
+    """
+    Literal texts outside groups, classes and quantifiers of a regular expression pattern.
+    Patterns with alternations outside groups have no required literals.
+    :param pattern:
+    :return:
+    """
+    literals = ['']
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            literals.append('')
+            index += 2
+            continue
+        if char == '[':
+            end = pattern.find(']', index + 2)
+            index = len(pattern) if end == -1 else end + 1
+            literals.append('')
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return []
+        elif depth == 0 and char in REGEX_QUANTIFIERS:
+            # -- The previous char is optional or repeated
+            literals[-1] = literals[-1][:-1]
+            if char == '{':
+                end = pattern.find('}', index)
+                index = len(pattern) if end == -1 else end
+        elif depth == 0 and char not in REGEX_SPECIAL_CHARS:
+            literals[-1] += char
+            index += 1
+            continue
+        literals.append('')
+        index += 1
+    return literals
+
+
+def _get_regex_literal_prefix(pattern, anchored_end):
+    """
+    Literal prefix of a regular expression pattern. Alternations are not indexed.
+    :param pattern:
+    :param anchored_end:
+    :return:
+    """
+    if '|' in pattern:
+        return '', False
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    if pattern.endswith('$'):
+        pattern = pattern[:-1]
+
+    for index, char in enumerate(pattern):
+        if char in REGEX_SPECIAL_CHARS:
+            prefix = pattern[:index]
+            if char in REGEX_QUANTIFIERS:
+                # -- The previous char is optional or repeated, so it is not part of the literal prefix
+                prefix = prefix[:-1]
+            return prefix, False
+    return pattern, anchored_end
+
+
+def get_first_word(text):
+    """
+    Return the first word of a step text in lower case, the key of the index.
+    :param text:
+    :return:
+    """
+    words = text.split(None, 1)
+    return words[0].lower() if words else ''
+
+
+class StepDefinitionIndex:
+    """
+    Index of the step definitions of one step type.
+    The step definitions without a complete first word in their literal prefix are tried for every step text.
+    """
+
+    def __init__(self, step_definitions):
+        self.step_definitions = list(step_definitions)
+        self.entries = []
+        self.by_first_word = {}
+        self.not_indexed = []
+        for position, step_definition in enumerate(self.step_definitions):
+            prefix, complete = get_literal_prefix(step_definition)
+            prefix = prefix.lower()
+            self.entries.append((prefix, get_required_literal(step_definition).lower(), step_definition))
+            first_word_match = FIRST_WORD_REGEX.match(prefix)
+            if first_word_match:
+                first_word = first_word_match.group(1)
+            elif complete:
+                first_word = get_first_word(prefix)
+            else:
+                first_word = ''
+
+            if first_word:
+                self.by_first_word.setdefault(first_word, []).append(position)
+            else:
+                self.not_indexed.append(position)
+
+        # -- Entries to try for every first word, merged with the not indexed ones in registration order
+        self.entries_by_first_word = {
+            first_word: [self.entries[position] for position in sorted(positions + self.not_indexed)]
+            for first_word, positions in self.by_first_word.items()
+        }
+        self.not_indexed_entries = [self.entries[position] for position in self.not_indexed]
+        self.cache = {}
+
+    def get_candidates(self, step_name):
+        """
+        Return the step definitions that can match the step text, in registration order.
+        :param step_name:
+        :return:
+        """
+        entries = self.entries_by_first_word.get(get_first_word(step_name), self.not_indexed_entries)
+        step_name_lower = step_name.lower()
+        return [step_definition for prefix, required_literal, step_definition in entries
+                if step_name_lower.startswith(prefix) and required_literal in step_name_lower]
+
+    def find_step_definition(self, step_name):
+        """
+        Return the first step definition matching the step text, or None.
+        :param step_name:
+        :return:
+        """
+        if step_name in self.cache:
+            return self.cache[step_name]
+
+        found = None
+        for step_definition in self.get_candidates(step_name):
+            if step_definition.match(step_name):
+                found = step_definition
+                break
+        self.cache[step_name] = found
+        return found
+
+
+def get_step_definitions(registry, step_type):
+    """
+    Return the step definitions that Behave tries for a step type: those of the step type and then the generic ones.
+    :param registry:
+    :param step_type:
+    :return:
+    """
+    candidates = registry.steps[step_type]
+    more_steps = registry.steps["step"]
+    if step_type != "step" and more_steps:
+        candidates = list(candidates) + more_steps
+    return candidates
+
+
+def get_step_index(registry, step_type):
+    """
+    Return the index of a step type for the registry.
+    The indexes are rebuilt when new step definitions are registered.
+    :param registry:
+    :param step_type:
+    :return:
+    """
+    version = tuple(len(step_definitions) for step_definitions in registry.steps.values())
+    indexes = getattr(registry, '_talos_step_indexes', None)
+    if indexes is None or indexes['version'] != version:
+        logger.debug(f"Building step definitions index for registry version: {version}")
+        indexes = {'version': version}
+        setattr(registry, '_talos_step_indexes', indexes)
+    if step_type not in indexes:
+        indexes[step_type] = StepDefinitionIndex(get_step_definitions(registry, step_type))
+    return indexes[step_type]
+
+
+def find_step_definition(registry, step):
+    """
+    Return the step definition matching the step using the index of the registry.
+    :param registry:
+    :param step:
+    :return:
+    """
+    return get_step_index(registry, step.step_type).find_step_definition(step.name)
@@ -5,13 +5,23 @@ File of configuration and implementation of the template variables.
 import logging
 import re
 from copy import deepcopy
+from functools import lru_cache
 from colorama import Fore
 
+from arc.core.behave.step_matcher import find_step_definition
 from arc.settings.settings_manager import Settings
 
 global template_var_dict
 template_var_dict = {}
 
+PROFILES = '$'
+REPOSITORIES = '&'
+TEMPLATE_VAR_REGEX = re.compile(r"([$&]){{(.*?)\}\}")
+TEMPLATE_VAR_TEXTS_CACHE_SIZE = 8192
+
+# Values of the template vars found by environment, master file, kind and template var
+RESOLVED_TEMPLATE_VARS = {}
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,20 +32,14 @@ def find_match(self, step):
     :param step:
     :return:
     """
-    candidates = self.steps[step.step_type]
-    more_steps = self.steps["step"]
     if step.table:
         template_var_tables_steps(step.table)
-    if step.step_type != "step" and more_steps:
-        # -- ENSURE: self.step_type lists are not modified/extended.
-        candidates = list(candidates)
-        candidates += more_steps
-    for step_definition in candidates:
+    step_definition = find_step_definition(self, step)
+    if step_definition:
         result = step_definition.match(step.name)
-        if result:
-            for argument in result.arguments:
-                argument.value = get_template_var_value(argument.value)
-            return result
+        for argument in result.arguments:
+            argument.value = get_template_var_value(argument.value)
+        return result
     return None
 
 
@@ -45,33 +49,97 @@ def get_template_var_value(argument):
     :param argument:
     :return:
     """
+    if not isinstance(argument, str) or not has_template_vars(argument):
+        return argument
     logger.debug('Getting template var data values')
-    regex_profiles = r"\${{(.*?)\}\}"
-    matchers_profiles = re.findall(regex_profiles, argument)
-    regex_repositories = r"\&{{(.*?)\}\}"
-    matchers_repositories = re.findall(regex_repositories, argument)
-    if matchers_profiles:
-        for match in matchers_profiles:
-            value = get_value_from_profiles(match)
-            if len(argument) > len(match) + 5:
-                start = argument.find("${{" + match + "}}")
-                end = start + 3 + len(match) + 2
-                argument = argument[:start] + value + argument[end:]
-            else:
-                argument = value
-    if matchers_repositories:
-        for match in matchers_repositories:
-            value = get_value_from_repositories(match)
-            if len(argument) > len(match) + 5:
-                start = argument.find("&{{" + match + "}}")
-                end = start + 3 + len(match) + 2
-                argument = argument[:start] + value + argument[end:]
-            else:
-                argument = value
+    parts = compile_template_var_text(argument)
+    if len(parts) == 1 and not isinstance(parts[0], str):
+        # The argument is only a template var, so the value is passed with its type
+        kind, template_var, _ = parts[0]
+        argument = get_template_var(kind, template_var)
+    else:
+        argument = ''.join(part if isinstance(part, str) else str(resolve_template_var(part[0], part[1]))
+                           for part in parts)
     logger.debug(f"Passing the template var value: {argument}")
     return argument
 
 
+@lru_cache(maxsize=TEMPLATE_VAR_TEXTS_CACHE_SIZE)
+def compile_template_var_text(text):
+    """
+    Split a text in literal texts and template vars. The result is cached for every text.
+    The template vars are returned as tuples (kind, template var, complete template var text).
+    :param text:
+    :return:
+    """
+    if '{{' not in text:
+        return (text,)
+    parts = []
+    position = 0
+    for match in TEMPLATE_VAR_REGEX.finditer(text):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        parts.append((match.group(1), match.group(2), match.group(0)))
+        position = match.end()
+    if position < len(text) or not parts:
+        parts.append(text[position:])
+    return tuple(parts)
+
+
+def has_template_vars(text):
+    """
+    Return True if the text contains template vars.
+    :param text:
+    :return:
+    """
+    parts = compile_template_var_text(text)
+    return len(parts) > 1 or not isinstance(parts[0], str)
+
+
+def resolve_template_var(kind, template_var):
+    """
+    Return the value of a template var without copying it. The found values are cached for the environment
+    until the template var data is loaded again.
+    :param kind: PROFILES or REPOSITORIES
+    :param template_var:
+    :return:
+    """
+    key = (Settings.PYTALOS_PROFILES.get('environment'), Settings.PYTALOS_PROFILES.get('master_file'),
+           kind, template_var)
+    if key in RESOLVED_TEMPLATE_VARS:
+        return RESOLVED_TEMPLATE_VARS[key]
+
+    if kind == PROFILES:
+        value = _get_value_from_profiles(template_var)
+    else:
+        value = _get_value_from_repositories(template_var)
+    if value is not None:
+        # Not found values are not cached so the warnings are shown every time
+        RESOLVED_TEMPLATE_VARS[key] = value
+    return value
+
+
+def get_template_var(kind, template_var):
+    """
+    Return a copy of the value of a template var, so the steps can modify it.
+    :param kind: PROFILES or REPOSITORIES
+    :param template_var:
+    :return:
+    """
+    value = resolve_template_var(kind, template_var)
+    if isinstance(value, (dict, list)):
+        return deepcopy(value)
+    return value
+
+
+def clear_template_var_cache():
+    """
+    Remove the cached values of the template vars. It is called when the template var data is loaded.
+    :return:
+    """
+    RESOLVED_TEMPLATE_VARS.clear()
+
+
 def replace_template_var(text):
     """
     Given the current line (step or scenario name) search the number of template vars and return the name
@@ -79,24 +147,37 @@ def replace_template_var(text):
     :param text:
     :return:
     """
-    text = get_template_var_profiles(text)
-    text = get_template_var_repositories(text)
-    return text
+    return _replace_template_vars(text, (PROFILES, REPOSITORIES))
 
 
 def get_template_var_profiles(text):
     """
     Get the template var from profiles
     """
-    regex = r"\${{(.*?)\}\}"
-    matchers = re.findall(regex, text)
-    for match in matchers:
-        start = text.find("${{" + match + "}}")
-        end = start + 3 + len(match) + 2
-        template_var = text[start:end]
-        value = get_value_from_profiles(match)
-        text = format_string(value, text, template_var, start, end)
-    return text
+    return _replace_template_vars(text, (PROFILES,))
+
+
+def _replace_template_vars(text, kinds):
+    """
+    Replace the template vars of the given kinds in the text by their formatted values.
+    :param text:
+    :param kinds:
+    :return:
+    """
+    if not isinstance(text, str):
+        return text
+    if not has_template_vars(text):
+        return text
+    texts = []
+    parts = compile_template_var_text(text)
+    for part in parts:
+        if isinstance(part, str):
+            texts.append(part)
+        elif part[0] in kinds:
+            texts.append(get_formatted_value(resolve_template_var(part[0], part[1]), part[2]))
+        else:
+            texts.append(part[2])
+    return ''.join(texts)
 
 
 def get_value_from_profiles(template_var):
@@ -105,6 +186,15 @@ def get_value_from_profiles(template_var):
     :param template_var:
     :return:
     """
+    return get_template_var(PROFILES, template_var)
+
+
+def _get_value_from_profiles(template_var):
+    """
+    Walk the data of the profiles files to find the value of the template var, without copying it.
+    :param template_var:
+    :return:
+    """
     template_var = template_var.strip()
     list_files = template_var_dict.get('profiles')
     if ':' in template_var:
@@ -125,7 +215,7 @@ def get_value_from_profiles(template_var):
     else:
         dict_json = list_files.get(profile_file)
     if dict_json:
-        aux_json = deepcopy(dict_json)
+        aux_json = dict_json
         for param in params_list:
             if type(aux_json) is list:
                 try:
@@ -150,21 +240,22 @@ def get_template_var_repositories(text):
     """
     Get the template var from repositories
     """
-    regex = r"\&{{(.*?)\}\}"
-    matchers = re.findall(regex, text)
-    for match in matchers:
-        start = text.find(match) - 3
-        end = text.find(match) + len(match) + 2
-        template_var = text[start:end]
-        value = get_value_from_repositories(match)
-        text = format_string(value, text, template_var, start, end)
-    return text
+    return _replace_template_vars(text, (REPOSITORIES,))
 
 
 def get_value_from_repositories(template_var):
     """
     Given the value ${{value}} or &{{value}} return the corresponding value
     """
+    return get_template_var(REPOSITORIES, template_var)
+
+
+def _get_value_from_repositories(template_var):
+    """
+    Walk the data of the repositories files to find the value of the template var, without copying it.
+    :param template_var:
+    :return:
+    """
     template_var = template_var.strip()
     list_files = template_var_dict.get('repositories')
     if ':' in template_var:
@@ -180,7 +271,7 @@ def get_value_from_repositories(template_var):
         else:
             dict_json = list_files.get(template_file)
         if dict_json:
-            aux_json = deepcopy(dict_json)
+            aux_json = dict_json
             for param in params_list:
                 if type(aux_json) is list:
                     try:
@@ -212,17 +303,23 @@ def format_string(value, text, template_value, start, end):
     Given the value check the length of the template var and replace it with the value if it is less than 50
     characters or <type>=(template var) if it is more than 50 characters
     """
+    return f"{text[:start]}{get_formatted_value(value, template_value)}{text[end:]}"
+
+
+def get_formatted_value(value, template_value):
+    """
+    Return the text that replaces the template var in step names, scenario names and reports.
+    :param value:
+    :param template_value:
+    :return:
+    """
     if type(value) is list and len(str(value)) > 50:
-        final_value = f"list={template_value[3:-2]}"
+        return f"list={template_value[3:-2]}"
     elif type(value) is dict:
-        final_value = f"dict={template_value[3:-2]}"
+        return f"dict={template_value[3:-2]}"
     elif type(value) is tuple:
-        final_value = f"tuple={template_value[3:-2]}"
-    else:
-        final_value = str(value)
-    text = f"{text[:start]}{final_value}{text[end:]}"
-
-    return text
+        return f"tuple={template_value[3:-2]}"
+    return str(value)
 
 
 def template_var_tables_steps(table):
@@ -230,15 +327,22 @@ def template_var_tables_steps(table):
     Replace the template var of the table, can be replaced from header or row
     """
     # Check template var in headers
-    for current_header in range(0, len(table.headings)):
-        value = table.headings[current_header]
-        table.headings[current_header] = str(get_template_var_value(value))
+    _replace_template_var_cells(table.headings)
 
     # Check template var in rows
-    for current_row in range(0, len(table.rows)):
-        for current_cell in range(0, len(table.rows[current_row].cells)):
-            value = table.rows[current_row].cells[current_cell]
-            table.rows[current_row].cells[current_cell] = str(get_template_var_value(value))
+    for row in table.rows:
+        _replace_template_var_cells(row.cells)
+
+
+def _replace_template_var_cells(cells):
+    """
+    Replace the template vars of a list of cells. The cells without template vars are not changed.
+    :param cells:
+    :return:
+    """
+    for index, value in enumerate(cells):
+        if has_template_vars(value):
+            cells[index] = str(get_template_var_value(value))
 
 
 def get_global():
@@ -0,0 +1,1261 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks of the framework internals.
+They can be run with the benchmark command of tools.py and return the results as a list of rows.
+"""
+import glob
+import json
+import logging
+import os
+import re
+import time
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler
+
+from arc.settings.settings_manager import Settings, clear_settings_cache
+
+logger = logging.getLogger(__name__)
+
+
+class FakeStep:
+    """
+    Minimal step with the attributes used to match step definitions.
+    """
+
+    def __init__(self, step_type, name):
+        self.step_type = step_type
+        self.name = name
+        self.table = None
+
+
+def _measure(function, items, repeat):
+    """
+    Return the mean time in microseconds of calling the function with every item.
+    :param function:
+    :param items:
+    :param repeat:
+    :return:
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            function(item)
+    return (time.perf_counter() - start) * 1000000 / (repeat * len(items))
+
+
+def _load_default_step_definitions():
+    """
+    Load all the default step modules in the Behave step registry.
+    The modules that need optional third party libraries not installed are skipped.
+    :return:
+    """
+    from behave.runner_util import exec_file
+    from behave.step_registry import registry
+
+    steps_path = os.path.join(Settings.ARC_PATH.get(force=True), 'contrib', 'steps')
+    for file_path in sorted(glob.glob(os.path.join(steps_path, '*', '*_keywords.py'))):
+        try:
+            exec_file(file_path, {})
+        except (Exception,) as ex:
+            logger.debug(f"Step module not loaded in benchmark: {file_path}. {ex}")
+    return registry
+
+
+def _get_step_texts(registry):
+    """
+    Generate a step text for every step definition by filling its parameters.
+    :param registry:
+    :return:
+    """
+    step_texts = []
+    for step_definitions in registry.steps.values():
+        for step_definition in step_definitions:
+            text = re.sub(r"\(\?P<\w+>[^)]*\)", "value", step_definition.pattern)
+            text = re.sub(r"\{[^}]*\}", "value", text)
+            step_texts.append(text.strip('^$'))
+    return step_texts
+
+
+def benchmark_step_matching(repeat=20):
+    """
+    Per step matching latency of the linear scan of Behave and of the indexed step matcher,
+    with all the default steps registered.
+    :param repeat:
+    :return:
+    """
+    from arc.core.behave.step_matcher import get_step_definitions, get_step_index, find_step_definition
+
+    registry = _load_default_step_definitions()
+    steps = [FakeStep('given', text) for text in _get_step_texts(registry)]
+
+    def linear_scan(step):
+        for step_definition in get_step_definitions(registry, step.step_type):
+            if step_definition.match(step.name):
+                return step_definition
+        return None
+
+    def indexed_no_cache(step):
+        get_step_index(registry, step.step_type).cache.clear()
+        return find_step_definition(registry, step)
+
+    linear = _measure(linear_scan, steps, repeat)
+    indexed = _measure(indexed_no_cache, steps, repeat)
+    cached = _measure(lambda step: find_step_definition(registry, step), steps, repeat)
+
+    registered = sum(len(step_definitions) for step_definitions in registry.steps.values())
+    return [
+        [f"Linear scan ({registered} step definitions)", f"{linear:.2f} us"],
+        ["Indexed matcher, first lookup", f"{indexed:.2f} us"],
+        ["Indexed matcher, cached step text", f"{cached:.2f} us"],
+    ]
+
+
+# Settings read by the core before_step and after_step hooks for every step
+HOOK_SETTINGS = [
+    ('PYTALOS_REPORTS', 'include_sub_steps_in_results'),
+    ('PYTALOS_ALM', 'post_to_alm'),
+    ('PYTALOS_ALM', 'generate_json'),
+    ('PYTALOS_ACCESSIBILITY', 'automatic_analysis'),
+    ('PYTALOS_REPORTS', 'generate_screenshot'),
+    ('PYTALOS_REPORTS', 'generate_screenshot_if_failed'),
+    ('PYTALOS_REPORTS', 'include_sub_steps_in_results'),
+    ('PYTALOS_REPORTS', 'include_sub_steps_in_results'),
+]
+
+
+def _get_setting_with_copy(name, option):
+    """
+    Previous read path of the settings: import the settings modules and copy the whole variable for every read.
+    :param name:
+    :param option:
+    :return:
+    """
+    from arc.settings import settings as pytalos_settings
+    try:
+        from settings import settings as user_settings
+    except (ModuleNotFoundError, ImportError):
+        user_settings = pytalos_settings
+    value = deepcopy(getattr(user_settings, name, getattr(pytalos_settings, name)))
+    for op in option.split('.'):
+        value = value.get(op) if isinstance(value, dict) else None
+    return value
+
+
+def benchmark_settings_get(repeat=20):
+    """
+    Overhead per step of the settings read by the core step hooks, copying the settings variables for every read
+    and with the cached read path of the settings manager.
+    :param repeat:
+    :return:
+    """
+    repeat = repeat * 100
+
+    def hook_reads_with_copy(_):
+        for name, option in HOOK_SETTINGS:
+            _get_setting_with_copy(name, option)
+
+    def hook_reads_not_cached(_):
+        for name, option in HOOK_SETTINGS:
+            clear_settings_cache()
+            getattr(Settings, name).get(option)
+
+    def hook_reads(_):
+        for name, option in HOOK_SETTINGS:
+            getattr(Settings, name).get(option)
+
+    with_copy = _measure(hook_reads_with_copy, [None], repeat)
+    not_cached = _measure(hook_reads_not_cached, [None], repeat)
+    cached = _measure(hook_reads, [None], repeat)
+    return [
+        [f"Copy of the settings variable ({len(HOOK_SETTINGS)} reads per step)", f"{with_copy:.2f} us"],
+        ["Settings manager, value not cached", f"{not_cached:.2f} us"],
+        ["Settings manager, cached value", f"{cached:.2f} us"],
+    ]
+
+
+def _get_template_var_value_with_copy(argument, profiles):
+    """
+    Previous substitution of the template vars: a regular expression search for every kind of template var
+    and a copy of the profile file for every template var.
+    :param argument:
+    :param profiles:
+    :return:
+    """
+    for regex in (r"\${{(.*?)\}\}", r"\&{{(.*?)\}\}"):
+        for match in re.findall(regex, argument):
+            profile_file, path = match.split(':')
+            value = deepcopy(profiles[profile_file])
+            for param in path.split('.'):
+                value = value[param]
+            argument = argument.replace(f"${{{{{match}}}}}", str(value))
+    return argument
+
+
+def benchmark_template_vars(repeat=20):
+    """
+    Substitution of the template vars of a data table of 100 rows and 10 columns with a template var in every row,
+    per table.
+    :param repeat:
+    :return:
+    """
+    from arc.core.behave import template_var
+
+    profiles = {'users': {f"user_{index}": {'name': f"name {index}", 'password': f"password {index}",
+                                            'roles': [f"role {role}" for role in range(10)]} for index in range(100)}}
+    rows = [[f"${{{{users:user_{row}.name}}}}" if column == 0 else f"value {row}-{column}" for column in range(10)]
+            for row in range(100)]
+    template_var.template_var_dict['profiles'] = profiles
+
+    def with_copy(_):
+        for row in rows:
+            [_get_template_var_value_with_copy(cell, profiles) for cell in row]
+
+    def not_cached(_):
+        template_var.clear_template_var_cache()
+        template_var.compile_template_var_text.cache_clear()
+        for row in rows:
+            [template_var.get_template_var_value(cell) for cell in row]
+
+    def cached(_):
+        for row in rows:
+            [template_var.get_template_var_value(cell) for cell in row]
+
+    try:
+        results = [_measure(function, [None], repeat) for function in (with_copy, not_cached, cached)]
+    finally:
+        template_var.template_var_dict.pop('profiles', None)
+        template_var.clear_template_var_cache()
+    return [
+        ["Regular expressions and profile copy", f"{results[0]:.2f} us"],
+        ["Compiled template vars, first substitution", f"{results[1]:.2f} us"],
+        ["Compiled template vars, cached values", f"{results[2]:.2f} us"],
+    ]
+
+
+def benchmark_profiles(repeat=20):
+    """
+    Load time of the profile files of the configured environment, parsing them and from the profiles cache.
+    :param repeat:
+    :return:
+    """
+    from arc.core.behave import config_data
+
+    env_dir = os.path.join(Settings.PROFILES_PATH.get(force=True), Settings.PYTALOS_PROFILES.get('environment'))
+    rows = []
+    for file_path in sorted(glob.glob(os.path.join(env_dir, '**', '*'), recursive=True)):
+        if not file_path.endswith(config_data.PROFILE_EXTENSIONS):
+            continue
+        file_stat = os.stat(file_path)
+        cache_key = (file_stat.st_mtime_ns, file_stat.st_size)
+        cache_file = config_data.get_profile_cache_file(file_path)
+        config_data._write_profile_cache(cache_file, cache_key, config_data._parse_profile_file(file_path))
+        parsed = _measure(config_data._parse_profile_file, [file_path], repeat)
+        cached = _measure(lambda _: config_data._read_profile_cache(cache_file, cache_key), [None], repeat)
+        name = os.path.relpath(file_path, env_dir)
+        rows.append([f"{name}, parsed", f"{parsed:.2f} us"])
+        rows.append([f"{name}, from cache", f"{cached:.2f} us"])
+    return rows
+
+
+def _get_synthetic_report(features=10, scenarios=50, steps=20):
+    """
+    Return a talos report json data with the given number of features, scenarios per feature and steps per scenario.
+    The first step of every scenario has two sub steps.
+    :param features:
+    :param scenarios:
+    :param steps:
+    :return:
+    """
+    results = {key: 0 for key in ('total_features', 'features_passed', 'features_failed', 'total_scenarios',
+                                  'passed_scenarios', 'failed_scenarios', 'total_steps', 'steps_passed',
+                                  'steps_failed', 'steps_skipped', 'start_time', 'end_time')}
+    global_data = {'results': results, 'application': 'benchmark', 'business_area': '', 'entity': '',
+                   'user_code': '', 'environment': 'benchmark', 'version': ''}
+    step = {'keyword': 'Given', 'name': 'a step', 'start_time': 0, 'end_time': 1,
+            'result': {'status': 'passed', 'duration': 1}}
+    return {
+        'global_data': global_data,
+        'features': [{
+            'name': f"Feature {feature}", 'status': 'passed', 'total_scenarios': scenarios, 'passed_scenarios': 0,
+            'failed_scenarios': 0, 'total_steps': 0, 'steps_passed': 0, 'steps_failed': 0, 'steps_skipped': 0,
+            'start_time': 0, 'end_time': 1, 'duration': 1, 'operating_system': 'linux', 'driver': 'api',
+            'elements': [{'name': f"Scenario {scenario}", 'status': 'passed', 'type': 'scenario',
+                          'steps': [dict(step, sub_steps=[dict(step), dict(step)])] +
+                                   [dict(step) for _ in range(steps - 1)]} for scenario in range(scenarios)]
+        } for feature in range(features)]
+    }
+
+
+def benchmark_save_metrics(repeat=20):
+    """
+    Time to save the metrics of a synthetic report of 10000 steps and 1000 sub steps in a new SQLite database, with one
+    commit per row and with the bulk insert of the rows. Both modes must save the same steps. The repeat argument is not
+    used, every mode is run once.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from arc.core.behave import env_utils
+    from arc.web.models.models import ExecutionStep
+    from arc.web.extensions import db
+
+    json_data = _get_synthetic_report()
+
+    def save_by_row(session, json_data):
+        execution = env_utils.save_execution_data(session, json_data)
+        for feature_position, feature in enumerate(json_data['features'], 1):
+            execution_feature = env_utils.save_feature_data(session, feature, execution.id, feature_position)
+            for scenario_position, element in enumerate(feature['elements'], 1):
+                execution_scenario = env_utils.save_scenario_data(session, element, execution_feature.id,
+                                                                  scenario_position)
+                for step_position, step in enumerate(element['steps'], 1):
+                    env_utils.save_step_data(session, step, execution_scenario.id, step_position)
+
+    rows = []
+    saved_steps = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, function in (("One commit per row", save_by_row),
+                               ("Bulk insert, one commit", env_utils.save_metrics_bulk)):
+            engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}")
+            db.metadata.create_all(engine)
+            with Session(engine) as session:
+                start = time.perf_counter()
+                function(session, json_data)
+                rows.append([f"{name} (11000 steps)", f"{time.perf_counter() - start:.2f} s"])
+                saved_steps.append(session.execute(
+                    select(ExecutionStep.id, ExecutionStep.scenario_id, ExecutionStep.parent_step,
+                           ExecutionStep.position).order_by(ExecutionStep.id)).all())
+            db.metadata.drop_all(engine)
+            engine.dispose()
+    if saved_steps[0] != saved_steps[1]:
+        raise RuntimeError("The steps saved one by one and with the bulk insert are different")
+    return rows
+
+
+def _get_synthetic_element(index):
+    """
+    Return the data of a web element as saved by the scraper.
+    :param index:
+    :return:
+    """
+    from arc.contrib.tools.crypto.crypto import generate_md5
+    from arc.core.brain.scraping import DATA_FIELD
+
+    data = dict(DATA_FIELD, loc_by='xpath', loc=f"//div[@id='element-{index % 500}']", tag='div',
+                text=f"text {index}", id=f"element-{index % 500}", **{'class': f"class-{index % 7}"})
+    data['md5'] = generate_md5(data)
+    data['url'] = 'https://example.com/page'
+    return data
+
+
+def benchmark_element_store(repeat=20):
+    """
+    Time to save a web element found by a step with a history of 5000 elements, rewriting the elements csv and
+    inserting it in the element store, and time to read the history of a locator.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    import pandas as pd
+    from arc.core.brain import utils
+
+    history = [_get_synthetic_element(index) for index in range(5000)]
+    new_elements = [_get_synthetic_element(index) for index in range(5000, 5000 + repeat)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = os.path.join(temp_dir, 'elements.csv')
+        pd.DataFrame(history).to_csv(csv_path, index=False)
+        csv_insert = _measure(lambda data: utils.insert_element_data(data, csv_path), new_elements, 1)
+        csv_read = _measure(lambda data: pd.read_csv(csv_path).query('loc == @data["loc"]'), new_elements, 1)
+
+        store = utils.ElementStore(os.path.join(temp_dir, 'elements.db'))
+        for data in history:
+            store.insert(data)
+        store_insert = _measure(store.insert, new_elements, 1)
+        store_read = _measure(lambda data: store.get_elements(data['loc']), new_elements, 1)
+        store.connection.close()
+    return [
+        ["Elements csv, save element (5000 elements)", f"{csv_insert:.2f} us"],
+        ["Elements csv, read locator history", f"{csv_read:.2f} us"],
+        ["Element store, save element", f"{store_insert:.2f} us"],
+        ["Element store, read locator history", f"{store_read:.2f} us"],
+    ]
+
+
+class FakeDriver:
+    """
+    Minimal web driver with the page source and the scripts used to scrape a page.
+    """
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+        self.current_url = 'https://example.com/page'
+        self.timeouts = None
+
+    def execute_script(self, script, *args):
+        return [{'height': 10, 'width': 10, 'x': 0, 'y': 0} for _ in args[0]]
+
+
+def _get_synthetic_page(sections=100, rows=10):
+    """
+    Return the html of a page with nested sections, tables of rows with inputs and links.
+    :param sections:
+    :param rows:
+    :return:
+    """
+    body = []
+    for section in range(sections):
+        items = ''.join(f'<div class="row"><span class="label">Label {row}</span><input type="text" name="field">'
+                        f'<a href="#">Link</a></div>' for row in range(rows))
+        body.append(f'<div class="section"><h2>Section {section}</h2><div class="rows">{items}</div></div>')
+    return f"<html><body><div class='main'>{''.join(body)}</div></body></html>"
+
+
+def benchmark_page_snapshot(repeat=20):
+    """
+    Time to scrape a page of 3000 elements for the self-healing, saving every element in the csv and with the
+    page snapshot. The repeat argument is not used, every mode is run once.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    from copy import deepcopy as copy_data
+    from arc.core.brain import scraping, utils
+    from arc.core.brain.generator import XpathGenerator
+
+    driver = FakeDriver(_get_synthetic_page())
+    scraper = scraping.Scraper(driver)
+
+    def scraping_by_element(csv_path):
+        utils.generate_current_elements_csv_headers(csv_path, scraping.DATA_FIELD)
+        xpath_generator = XpathGenerator()
+        for element in scraper.get_elements_from_page_source():
+            data = copy_data(scraping.DATA_FIELD)
+            data['loc'] = xpath_generator.from_bs_element(element)
+            data['tag'] = element.name
+            data['text'] = element.text
+            data['url'] = driver.current_url
+            utils.insert_element_data(data, csv_path)
+
+    def page_snapshot(csv_path):
+        scraping.CURRENT_ELEMENTS = csv_path
+        scraper.scraping_current_page_elements()
+
+    elements = len(scraper.get_elements_from_page_source())
+    rows = []
+    current_elements = scraping.CURRENT_ELEMENTS
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, function in ((f"One csv write per element ({elements} elements)", scraping_by_element),
+                                   ("Page snapshot", page_snapshot)):
+                start = time.perf_counter()
+                function(os.path.join(temp_dir, 'current_elements.csv'))
+                rows.append([name, f"{time.perf_counter() - start:.2f} s"])
+    finally:
+        scraping.CURRENT_ELEMENTS = current_elements
+    return rows
+
+
+def benchmark_healing(repeat=20):
+    """
+    Self-healing latency per not found element on a page of 500 elements, encoding the page for every element,
+    reusing the model of the page and healing all the elements with one query. The page elements not found heal the
+    other locators not found before with their query.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    import pandas as pd
+    from arc.core.brain import healing, utils
+
+    history = [_get_synthetic_element(index) for index in range(500)]
+    page = [dict(data, loc=data['loc'].replace('element', 'new')) for data in history]
+    locators = [('xpath', data['loc']) for data in history[:repeat]]
+    paths = healing.ELEMENTS_DB, healing.ELEMENTS_CSV, healing.CURRENT_ELEMENTS
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            healing.ELEMENTS_DB = os.path.join(temp_dir, 'elements.db')
+            healing.ELEMENTS_CSV = os.path.join(temp_dir, 'elements.csv')
+            healing.CURRENT_ELEMENTS = os.path.join(temp_dir, 'current_elements.csv')
+            pd.DataFrame(page).to_csv(utils.get_process_file(healing.CURRENT_ELEMENTS), index=False)
+            for data in history:
+                utils.get_element_store(healing.ELEMENTS_DB).insert(data)
+
+            not_cached = _measure(lambda locator: healing.init_healing(locator), locators, 1)
+            model = healing.get_healing_model('benchmark')
+            cached = _measure(lambda locator: healing.heal_locators([locator], 'benchmark'), locators, 1)
+            model.healed_locators.clear()
+            batch = _measure(lambda _: healing.heal_locators(locators, 'benchmark'), [None], 1) / len(locators)
+            healed = _measure(lambda locator: healing.init_healing(locator, 'benchmark'), locators, 1)
+            utils.get_element_store(healing.ELEMENTS_DB).connection.close()
+            utils.ELEMENT_STORES.clear()
+            healing.HEALING_MODELS.clear()
+            healing.MISSING_LOCATORS.clear()
+    finally:
+        healing.ELEMENTS_DB, healing.ELEMENTS_CSV, healing.CURRENT_ELEMENTS = paths
+    return [
+        ["Page encoded for every element (500 page elements)", f"{not_cached:.2f} us"],
+        ["Model of the page reused", f"{cached:.2f} us"],
+        [f"Model of the page reused, {len(locators)} elements in one query", f"{batch:.2f} us"],
+        ["Element healed in the query of other element", f"{healed:.2f} us"],
+    ]
+
+
+def benchmark_visual_diff(repeat=20):
+    """
+    Time to exclude an element of 1000x1000 pixels and to count the different pixels of a 4K screenshot, pixel by pixel
+    and with the box filled at once and a numpy mask.
+    :param repeat:
+    :return:
+    """
+    import itertools
+    import numpy as np
+    from PIL import Image, ImageChops
+    from arc.core.test_method.visual_test import VisualTest
+
+    random_generator = np.random.default_rng(0)
+    pixels = random_generator.integers(0, 255, (2160, 3840, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+    changed_pixels = pixels.copy()
+    changed_pixels[100:400, 200:900] //= 2
+    baseline = Image.fromarray(changed_pixels)
+    element_box = (100, 100, 1100, 1100)
+
+    def exclude_by_pixel(img):
+        img = img.convert("RGBA")
+        pixel_data = img.load()
+        for x, y in itertools.product(range(element_box[0], element_box[2]), range(element_box[1], element_box[3])):
+            pixel_data[x, y] = (0, 0, 0, 255)
+        return img
+
+    class BoxVisualTest:
+        def get_element_box(self, web_element):
+            return element_box
+
+    def count_by_pixel(_):
+        mask = ImageChops.difference(image, baseline).convert('L').point(lambda x: 255 if x else 0)
+        return 1 - sum([1 for pixel in mask.getdata() if pixel == 0]) / (baseline.width * baseline.height)
+
+    def count_with_mask(_):
+        return np.count_nonzero(VisualTest.get_differences_mask(image, baseline)) / (baseline.width * baseline.height)
+
+    repeat = max(1, repeat // 10)
+    return [
+        ["Exclude element pixel by pixel (1000x1000 in 3840x2160)", f"{_measure(exclude_by_pixel, [image], repeat):.2f} us"],
+        ["Exclude element filling the box",
+         f"{_measure(lambda img: VisualTest.exclude_elements(BoxVisualTest(), img, [None]), [image], repeat):.2f} us"],
+        ["Count different pixels pixel by pixel", f"{_measure(count_by_pixel, [None], repeat):.2f} us"],
+        ["Count different pixels with numpy mask", f"{_measure(count_with_mask, [None], repeat):.2f} us"],
+    ]
+
+
+def benchmark_screenshots(repeat=20):
+    """
+    Time to compress 20 screenshots of 1920x1080 with 5 different screens: compressing every screenshot when the
+    report is rendered, and sending them to the background compression in the steps and reading the manifest when the
+    report is rendered.
+    :param repeat:
+    :return:
+    """
+    import io
+    import tempfile
+    from unittest import mock
+    import numpy as np
+    from PIL import Image
+    from arc.reports.html import screenshots
+
+    random_generator = np.random.default_rng(0)
+    screens = []
+    for _ in range(5):
+        pixels = np.full((1080, 1920, 3), 255, dtype=np.uint8)
+        pixels[100:600, 200:1200] = random_generator.integers(0, 255, (500, 1000, 3), dtype=np.uint8)
+        image_data = io.BytesIO()
+        Image.fromarray(pixels).save(image_data, format='PNG')
+        screens.append(image_data.getvalue())
+
+    repeat = max(1, repeat // 10)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        captures = []
+        for index in range(20):
+            capture_path = os.path.join(temp_dir, f"{index:02d}_step.png")
+            with open(capture_path, 'wb') as capture_file:
+                capture_file.write(screens[index % len(screens)])
+            captures.append((capture_path, screens[index % len(screens)]))
+
+        def compress_inline(capture):
+            Image.open(capture[0]).save(f"{capture[0]}.webp", quality=50)
+
+        inline_time = _measure(compress_inline, captures, repeat)
+        step_times, report_times = [], []
+        with mock.patch.object(screenshots, 'get_images_dir', return_value=os.path.join(temp_dir, 'imgs')), \
+                mock.patch.object(screenshots, 'is_compression_enabled', return_value=True):
+            for _ in range(repeat):
+                screenshots.COMPRESSED_SCREENSHOTS.clear()
+                screenshots.COMPRESSED_HASHES.clear()
+                for webp_path in glob.glob(os.path.join(temp_dir, 'imgs', '*.webp')):
+                    os.remove(webp_path)
+                step_times.append(_measure(lambda capture: screenshots.compress_screenshot(*capture), captures, 1))
+                screenshots.wait_compressed_screenshots()
+                report_times.append(_measure(screenshots.get_compressed_screenshot, [path for path, _ in captures], 1))
+            screenshots.COMPRESSED_SCREENSHOTS.clear()
+            screenshots.COMPRESSED_HASHES.clear()
+            screenshots.SCREENSHOTS_STATE['manifest'] = None
+    return [
+        ["Compress screenshot when rendering the report", f"{inline_time:.2f} us"],
+        ["Background compression, time in the step", f"{sum(step_times) / len(step_times):.2f} us"],
+        ["Background compression, time in the report", f"{sum(report_times) / len(report_times):.2f} us"],
+    ]
+
+
+class JiraStubHandler(BaseHTTPRequestHandler):
+    """
+    Local stub of the Jira attachments api that answers every request after a fixed latency.
+    """
+    latency = 0.02
+    attachments = {}
+    requests_count = 0
+
+    def _answer(self, status, data):
+        time.sleep(self.latency)
+        JiraStubHandler.requests_count += 1
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        issue = self.path.split('?')[0].rstrip('/').split('/')[-1]
+        self._answer(200, {'fields': {'attachment': self.attachments.get(issue, [])}})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        issue = self.path.rstrip('/').split('/')[-2]
+        attachment = {'id': str(self.requests_count), 'filename': f"evidence_{self.requests_count}.zip"}
+        self.attachments.setdefault(issue, []).append(attachment)
+        self._answer(200, [attachment])
+
+    def do_DELETE(self):
+        self._answer(204, {})
+
+    def log_message(self, *args):
+        pass
+
+
+def benchmark_evidence_upload(repeat=20):
+    """
+    Time to upload the evidences of 40 scenarios of 10 Jira issues to a local stub server with 20 ms of latency:
+    reading the attachments of all the issues and opening a connection for every file, and with the pooled
+    concurrent uploads of the Jira integration.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    import threading
+    import requests
+    from http.server import ThreadingHTTPServer
+    from arc.integrations.jira import Jira
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JiraStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scenarios_list = []
+            for index in range(40):
+                evidence = os.path.join(temp_dir, f"scenario_{index}.zip")
+                with open(evidence, 'wb') as evidence_file:
+                    evidence_file.write(os.urandom(50000))
+                scenarios_list.append({f"JIRA-TEST-{index % 10}": {'evidence': [evidence]}})
+            issues = sorted({key for scenario in scenarios_list for key in scenario})
+
+            def upload_one_by_one(_):
+                for scenario in scenarios_list:
+                    for key, data in scenario.items():
+                        for attach in data['evidence']:
+                            for issue in issues:
+                                requests.get(f"{base_url}/rest/api/2/issue/{issue.replace('JIRA-', '')}")
+                            with open(attach, 'rb') as attach_file:
+                                requests.post(f"{base_url}/rest/api/2/issue/{key.replace('JIRA-', '')}/attachments",
+                                              files=[('file', attach_file)])
+
+            def upload_pooled(_):
+                jira = Jira()
+                jira.base_url = base_url
+                jira.scenarios_list = scenarios_list
+                jira._add_issue_evidence()
+                jira.session.close()
+
+            repeat = max(1, repeat // 10)
+            JiraStubHandler.requests_count = 0
+            one_by_one_time = _measure(upload_one_by_one, [None], repeat)
+            one_by_one_requests = JiraStubHandler.requests_count // repeat
+            JiraStubHandler.requests_count = 0
+            pooled_time = _measure(upload_pooled, [None], repeat)
+            pooled_requests = JiraStubHandler.requests_count // repeat
+    finally:
+        server.shutdown()
+        server.server_close()
+    return [
+        [f"Upload one by one ({one_by_one_requests} requests)", f"{one_by_one_time:.2f} us"],
+        [f"Pooled concurrent upload ({pooled_requests} requests)", f"{pooled_time:.2f} us"],
+    ]
+
+
+def benchmark_excel_profile(repeat=20):
+    """
+    Time to load an Excel profile file with a sheet of 50000 rows as the profiles do: reading the file, setting the
+    header of the sheets and converting them to dicts.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    import openpyxl
+    from arc.contrib.tools.excel import ExcelWrapper
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet('data')
+        sheet.append(['name', 'value', 'amount', 'active', 'comment'])
+        for index in range(50000):
+            sheet.append([f"user_{index}", f"value_{index}", index * 1.5, index % 2 == 0, None if index % 3 else 'x'])
+        config = workbook.create_sheet('config')
+        config.append(['name', 'value'])
+        for index in range(100):
+            config.append([f"key_{index}", index])
+        file_path = os.path.join(temp_dir, 'profile.xlsx')
+        workbook.save(file_path)
+
+        def load_profile(_):
+            excel_wrapper = ExcelWrapper(file_path)
+            excel_wrapper.set_all_sheets_header(1)
+            return excel_wrapper.all_sheets_to_dict()
+
+        load_time = _measure(load_profile, [None], max(1, repeat // 10))
+    return [
+        ["Load Excel profile (50000 rows)", f"{load_time:.2f} us"],
+    ]
+
+
+def benchmark_profile_edits(repeat=20):
+    """
+    Time to update 50 keys of a json profile file of 2000 keys in 5 environments: loading and writing the files for
+    every key, and with a profile transaction that writes every file once.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    import warnings
+    from arc.contrib.tools import files
+
+    profile = {f"key_{index}": {'name': f"name_{index}", 'values': list(range(10))} for index in range(2000)}
+    keys = [f"key_{index}.name" for index in range(0, 2000, 40)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for environment in ('dev', 'pre', 'pro', 'cer', 'mock'):
+            path = os.path.join(temp_dir, f"{environment}.json")
+            with open(path, 'w', encoding='utf8') as profile_file:
+                json.dump(profile, profile_file)
+            paths.append(path)
+
+        def update_by_key(_):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for key in keys:
+                    for path in paths:
+                        files.set_value_json_path(path, key, 'updated')
+
+        def update_in_transaction(_):
+            with files.ProfileTransaction() as transaction:
+                for key in keys:
+                    for path in paths:
+                        transaction.set_value(path, key, 'updated')
+
+        repeat = max(1, repeat // 10)
+        by_key_time = _measure(update_by_key, [None], repeat)
+        transaction_time = _measure(update_in_transaction, [None], repeat)
+    return [
+        ["Update 50 keys writing the files for every key", f"{by_key_time:.2f} us"],
+        ["Update 50 keys in a profile transaction", f"{transaction_time:.2f} us"],
+    ]
+
+
+def benchmark_json_schema(repeat=20):
+    """
+    Time to validate a response of 50 items with a schema with $refs, checking the schema in every validation and
+    with the validators of the schema registry, and time per response validating 1000 responses at once.
+    :param repeat:
+    :return:
+    """
+    import jsonschema
+    from arc.contrib.api import schema_registry
+
+    schema = {
+        'type': 'object',
+        'required': ['items', 'total'],
+        'properties': {
+            'total': {'type': 'integer'},
+            'items': {'type': 'array', 'items': {'$ref': '#/definitions/item'}}
+        },
+        'definitions': {
+            'item': {
+                'type': 'object',
+                'required': ['id', 'name', 'tags'],
+                'properties': {
+                    'id': {'type': 'integer'},
+                    'name': {'type': 'string'},
+                    'price': {'type': 'number', 'minimum': 0},
+                    'tags': {'type': 'array', 'items': {'type': 'string'}}
+                }
+            }
+        }
+    }
+    response = {'total': 50, 'items': [{'id': index, 'name': f"item {index}", 'price': index * 1.5,
+                                        'tags': ['a', 'b']} for index in range(50)]}
+    responses = [response] * 1000
+
+    validate_time = _measure(lambda instance: jsonschema.validate(instance=instance, schema=schema), [response],
+                             repeat * 10)
+    registry_time = _measure(lambda instance: schema_registry.validate(schema, instance), [response], repeat * 10)
+    many_time = _measure(lambda _: schema_registry.validate_many(schema, responses), [None], 1) / len(responses)
+    return [
+        ["jsonschema.validate", f"{validate_time:.2f} us"],
+        ["Schema registry validate", f"{registry_time:.2f} us"],
+        ["Schema registry validate_many, per response", f"{many_time:.2f} us"],
+    ]
+
+
+def benchmark_talos_virtual(repeat=20):
+    """
+    Time to start the native engine of talos virtual with an imposter of 500 stubs, to find the stub of a request
+    checking all the stubs and with the route index, to serve a request and to replace all the stubs.
+    :param repeat:
+    :return:
+    """
+    import requests
+    from arc.talos_virtual.core.contrib.native import stub_server
+
+    stubs = [{'predicates': [{'equals': {'method': 'GET', 'path': f"/api/items/{index}", 'query': {'page': '1'}}}],
+              'responses': [{'is': {'statusCode': 200, 'body': {'id': index}}}]} for index in range(500)]
+    imposter = {'port': 18580, 'protocol': 'http', 'name': 'benchmark', 'stubs': stubs}
+    requests_data = [{'method': 'GET', 'path': f"/api/items/{index}", 'query': {'page': '1'}, 'headers': {},
+                      'body': ''} for index in range(0, 500, 25)]
+
+    start = time.perf_counter()
+    server = stub_server.start_stub_server([imposter])
+    start_time = (time.perf_counter() - start) * 1000
+    try:
+        running = server.imposters[imposter['port']]
+        linear_time = _measure(lambda request: next(stub for stub in running.stubs if stub.matches(request)),
+                               requests_data, repeat)
+        index_time = _measure(running.find_stub, requests_data, repeat)
+        with requests.Session() as session:
+            request_time = _measure(
+                lambda request: session.get(f"http://127.0.0.1:{imposter['port']}{request['path']}?page=1"),
+                requests_data, repeat)
+        swap_time = _measure(lambda _: server.replace_stubs(imposter['port'], stubs), [None], repeat) / 1000
+    finally:
+        stub_server.stop_stub_server()
+    return [
+        ["Start with 500 stubs", f"{start_time:.2f} ms"],
+        ["Find stub checking all the stubs", f"{linear_time:.2f} us"],
+        ["Find stub with the route index", f"{index_time:.2f} us"],
+        ["Request served", f"{request_time:.2f} us"],
+        ["Replace 500 stubs", f"{swap_time:.2f} ms"],
+    ]
+
+
+class ConsoleStubHandler(BaseHTTPRequestHandler):
+    """
+    Local stub of the portal console that answers every request after a fixed latency.
+    """
+    latency = 0.002
+    requests_count = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+        ConsoleStubHandler.requests_count += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def benchmark_portal_console(repeat=20):
+    """
+    Time per console line printed by the portal formatter, with a local stub of the portal with 2 ms of latency:
+    sending a request for every line and queueing the lines for the console thread, that sends them in batches.
+    :param repeat:
+    :return:
+    """
+    import threading
+    import requests
+    from http.server import ThreadingHTTPServer
+    from arc.web.app import utils
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ConsoleStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = Settings.PYTALOS_WEB.get('port')
+    Settings.PYTALOS_WEB.set('port', value=server.server_address[1])
+    lines = [f"    Given the step number {index} is executed\n" for index in range(200)]
+    try:
+        ConsoleStubHandler.requests_count = 0
+        request_time = _measure(
+            lambda line: requests.post(f"http://127.0.0.1:{server.server_address[1]}/view-executions", data=line),
+            lines, max(1, repeat // 10))
+        request_count = ConsoleStubHandler.requests_count // max(1, repeat // 10)
+
+        ConsoleStubHandler.requests_count = 0
+        queue_time = _measure(utils.print_portal_console, lines, repeat)
+        start = time.perf_counter()
+        utils.flush_portal_console()
+        flush_time = (time.perf_counter() - start) * 1000
+        batch_count = ConsoleStubHandler.requests_count
+    finally:
+        Settings.PYTALOS_WEB.set('port', value=port)
+        server.shutdown()
+        server.server_close()
+    return [
+        [f"Request per line ({request_count} requests for {len(lines)} lines)", f"{request_time:.2f} us"],
+        [f"Queued line ({batch_count} requests for {len(lines) * repeat} lines)", f"{queue_time:.2f} us"],
+        ["Flush of the queued lines", f"{flush_time:.2f} ms"],
+    ]
+
+
+def benchmark_executions_statistics(repeat=20):
+    """
+    Time to get the Executions Statistics chart of a year from a SQLite database with 20000 executions, with two
+    queries per day and with the grouped query of the statistics, and time to get the trends of 50 scenarios executed
+    2000 times. The repeat argument is not used, every query is run once.
+    :param repeat:
+    :return:
+    """
+    import datetime
+    import tempfile
+    from sqlalchemy import create_engine, insert, text
+    from sqlalchemy.orm import Session
+    from arc.web.app.executions import statistics
+    from arc.web.extensions import db
+    from arc.web.models.models import Execution, ExecutionFeature, ExecutionScenario, StatusType
+
+    to_date = datetime.datetime(2024, 12, 31)
+    from_date = to_date - datetime.timedelta(days=364)
+    executions = [{'id': index, 'features_failed': index % 3 == 0,
+                   'created_on': from_date + datetime.timedelta(minutes=index * 26)} for index in range(1, 20001)]
+    features = [{'id': index, 'execution_id': index, 'name': 'Feature', 'created_on': execution['created_on']}
+                for index, execution in enumerate(executions[:2000], 1)]
+    scenarios = [{'feature_id': feature['id'], 'name': f"Scenario {index}", 'created_on': feature['created_on'],
+                  'status': StatusType.FAILED if (feature['id'] + index) % 7 == 0 else StatusType.PASSED,
+                  'duration': (feature['id'] * index) % 100 / 10} for feature in features for index in range(50)]
+
+    def get_by_dates_per_day(session):
+        for day in range((to_date - from_date).days + 1):
+            final_date = (from_date + datetime.timedelta(days=day)).strftime("%Y-%m-%d")
+            next_date = (from_date + datetime.timedelta(days=day + 1)).strftime("%Y-%m-%d")
+            for condition in ('> 0', '== 0'):
+                session.execute(text(
+                    f"SELECT COUNT(id) FROM {Execution.__tablename__} WHERE {Execution.features_failed} {condition}"
+                    f" AND {Execution.created_on} BETWEEN '{final_date}' and '{next_date}'"
+                )).first()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}")
+        db.metadata.create_all(engine)
+        with Session(engine) as session:
+            for model, data in ((Execution, executions), (ExecutionFeature, features),
+                                (ExecutionScenario, scenarios)):
+                session.execute(insert(model), data)
+            session.commit()
+            # The executions of previous versions have no index of created_on
+            index = next(iter(Execution.__table__.indexes))
+            index.drop(engine)
+            start = time.perf_counter()
+            get_by_dates_per_day(session)
+            rows.append(["Chart of a year, two queries per day without index",
+                         f"{(time.perf_counter() - start) * 1000:.2f} ms"])
+            index.create(engine)
+            for name, function in (
+                    ("Chart of a year, two queries per day with index", get_by_dates_per_day),
+                    ("Chart of a year, grouped query with index",
+                     lambda session: statistics.get_executions_by_day(session, from_date, to_date)),
+                    ("Trends of 50 scenarios, 100000 rows",
+                     lambda session: statistics.get_status_trends(session, from_date, to_date))):
+                start = time.perf_counter()
+                function(session)
+                rows.append([name, f"{(time.perf_counter() - start) * 1000:.2f} ms"])
+        engine.dispose()
+    return rows
+
+
+def benchmark_feature_index(repeat=20):
+    """
+    Time to get the data of 500 feature files for the portal pages: parsing every feature file as every request did,
+    and reading the feature index when no file changed and when one file changed.
+    :param repeat:
+    :return:
+    """
+    import tempfile
+    from arc.web.app import feature_index
+
+    scenario = "\n".join([
+        "  @regression",
+        "  Scenario Outline: Scenario {index}",
+        "    Given the user opens the page <page>",
+        "    When the user fills the form with the values",
+        "      | field | value |",
+        "      | name  | test  |",
+        "    Then the page shows the message <message>",
+        "    Examples:",
+        "      | page | message |",
+        "      | home | welcome |",
+        "      | cart | empty   |",
+    ])
+    repeat = max(1, repeat // 10)
+    index_file = feature_index.FEATURE_INDEX_FILE
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_path = os.path.join(temp_dir, 'features')
+        for index in range(500):
+            folder = os.path.join(test_path, f"folder_{index % 10}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"feature_{index}.feature"), 'w', encoding='utf-8') as feature_file:
+                feature_file.write(f"@feature_{index}\nFeature: Feature {index}\n\n"
+                                   + "\n\n".join(scenario.format(index=number) for number in range(5)))
+        feature_files = feature_index.walk_feature_files(test_path)
+
+        def parse_all(_):
+            for filepath in feature_index.walk_feature_files(test_path):
+                feature_index.index_feature_file(filepath, os.stat(filepath))
+
+        def touch_one(_):
+            os.utime(feature_files[0], ns=(time.time_ns(), time.time_ns()))
+            feature_index.get_feature_index(test_path)
+
+        feature_index.FEATURE_INDEX_FILE = os.path.join(temp_dir, 'index.json')
+        feature_index.clear_feature_index()
+        try:
+            logging.disable(logging.INFO)
+            parse_time = _measure(parse_all, [None], repeat)
+            feature_index.get_feature_index(test_path)
+            cached_time = _measure(lambda _: feature_index.get_feature_index(test_path), [None], repeat)
+            changed_time = _measure(touch_one, [None], repeat)
+        finally:
+            logging.disable(logging.NOTSET)
+            feature_index.FEATURE_INDEX_FILE = index_file
+            feature_index.clear_feature_index()
+    return [
+        ["Parse 500 feature files", f"{parse_time / 1000:.2f} ms"],
+        ["Feature index, no file changed", f"{cached_time / 1000:.2f} ms"],
+        ["Feature index, one file changed", f"{changed_time / 1000:.2f} ms"],
+    ]
+
+
+def benchmark_db_results(repeat=20):
+    """
+    Time and peak memory to read the results of a query of 100000 rows of a SQLite database: with fetchall and the
+    nested index loops of the database wrappers, with the batches of fetch_dicts, as columns and streaming the rows,
+    and time to convert the dates of the results to string checking the name of the type of every value and with
+    isinstance. The repeat argument is not used, every measure is run once.
+    :param repeat:
+    :return:
+    """
+    import datetime
+    import sqlite3
+    import tracemalloc
+    from arc.contrib.db import utils as db_utils
+
+    connection = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    cursor = connection.cursor()
+    cursor.execute("CREATE TABLE accounts (id INTEGER, name TEXT, amount REAL, created TIMESTAMP)")
+    db_utils.execute_many(cursor, "INSERT INTO accounts VALUES (?, ?, ?, ?)",
+                          ((index, f"account_{index}", index * 1.5, datetime.datetime(2024, 1, 1))
+                           for index in range(100000)))
+
+    def parse_with_index_loops(cursor):
+        list_result = []
+        headers = [row[0] for row in cursor.description]
+        data_fetched = cursor.fetchall()
+        for j in range(len(data_fetched)):
+            name_columns_value = {}
+            for x in range(len(headers)):
+                name_columns_value[headers[x]] = data_fetched[j][x]
+            list_result.append(name_columns_value)
+        return list_result
+
+    def stream_rows(cursor):
+        return sum(1 for _ in db_utils.iter_dicts(cursor))
+
+    def parse_datetime_with_type_name(results):
+        for h in range(len(results)):
+            for x, y in results[h].items():
+                if str(type(results[h][x])).find("datetime") > -1:
+                    results[h][x] = str(results[h][x])
+        return results
+
+    rows = []
+    for name, function in (("fetchall and index loops", parse_with_index_loops),
+                           ("fetch_dicts in batches", db_utils.fetch_dicts),
+                           ("fetch_columns", db_utils.fetch_columns),
+                           ("iter_dicts streaming", stream_rows)):
+        cursor.execute("SELECT * FROM accounts")
+        start = time.perf_counter()
+        function(cursor)
+        elapsed = (time.perf_counter() - start) * 1000
+        cursor.execute("SELECT * FROM accounts")
+        tracemalloc.start()
+        function(cursor)
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        rows.append([f"Read 100000 rows, {name}", f"{elapsed:.2f} ms, peak {peak:.1f} MB"])
+    for name, function in (("type name", parse_datetime_with_type_name),
+                           ("isinstance", db_utils.parse_datetime_to_string)):
+        cursor.execute("SELECT * FROM accounts")
+        results = db_utils.fetch_dicts(cursor)
+        start = time.perf_counter()
+        function(results)
+        rows.append([f"Dates of 100000 rows to string, {name}", f"{(time.perf_counter() - start) * 1000:.2f} ms"])
+    connection.close()
+    return rows
+
+
+def benchmark_json_join(repeat=20):
+    """
+    Time and peak memory to unify 8 json reports of 5000 steps written by the json formatter, with the merge that loads
+    all the reports, finds the features and scenarios by name in lists and dumps the report with indent, and streaming
+    the features of the reports. The time and the peak memory are measured in different runs, because tracemalloc
+    slows down the code. The reports are written with the methods of the json formatter, and the benchmark fails if
+    their footer can not be read, because the features would not be streamed, or if both modes do not unify the same
+    features. The repeat argument is not used, every mode is run once.
+    :param repeat:
+    :return:
+    """
+    import datetime
+    import io
+    import tempfile
+    import tracemalloc
+    from arc.core.behave.parallel import FEATURES
+    from arc.reports import json_join
+    from arc.reports.custom_formatters import CustomJSONFormatter
+
+    def write_report(path, features):
+        formatter = CustomJSONFormatter.__new__(CustomJSONFormatter)
+        formatter.stream = io.StringIO()
+        formatter.features_storage = features
+        formatter.write_json_header()
+        for index, feature in enumerate(features):
+            if index:
+                formatter.write_json_feature_separator()
+            formatter.write_json_feature(feature)
+        formatter.write_json_footer()
+        with open(path, 'w', encoding='utf8') as report_file:
+            report_file.write(formatter.stream.getvalue())
+
+    def join_reports_loading_all():
+        # Merge of the parallel reports before the streaming: every report is loaded and the features and scenarios
+        # are found by name in lists
+        reports = []
+        for file_path in json_join.get_report_files():
+            with open(file_path, encoding='utf8') as json_file:
+                reports.append(json.load(json_file))
+        report_json = {'features': [], 'global_data': {'keyword': 'global_data',
+                                                       'date': datetime.datetime.now().strftime('%Y/%m/%d'),
+                                                       'results': json_join.match_global_results(reports)}}
+        features_names = []
+        for report in reports:
+            for feature in report['features']:
+                if feature['name'] not in features_names:
+                    features_names.append(feature['name'])
+                    report_json['features'].append(feature)
+                    continue
+                for scenario in feature['elements']:
+                    if scenario['keyword'] == 'Background':
+                        continue
+                    for json_feature in report_json['features']:
+                        if json_feature['name'] != feature['name']:
+                            continue
+                        if all(json_scenario['name'] != scenario['name'] for json_scenario in json_feature['elements']):
+                            json_feature['elements'].append(scenario)
+        json_join.match_results(report_json)
+        with open(json_join.JSONS_PATH + 'talos_report.json', 'w', encoding='utf8') as fp:
+            json.dump(report_json, fp, indent=4, ensure_ascii=False)
+
+    def read_unified_features():
+        report_path = json_join.JSONS_PATH + 'talos_report.json'
+        with open(report_path, encoding='utf8') as json_file:
+            features = json.load(json_file)['features']
+        os.remove(report_path)
+        return sorted((feature['name'], feature['total_scenarios'], feature['total_steps'],
+                       sorted(scenario['name'] for scenario in feature['elements'])) for feature in features)
+
+    rows = []
+    unified_features = []
+    jsons_path = json_join.JSONS_PATH
+    parallel_type = os.environ.get('PARALLEL_TYPE')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_join.JSONS_PATH = temp_dir + os.sep
+        os.environ['PARALLEL_TYPE'] = FEATURES
+        try:
+            for worker in range(8):
+                features = _get_synthetic_report(features=5, scenarios=50, steps=20)['features']
+                for feature in features:
+                    # Every feature is run by two workers, with half of the scenarios in common
+                    feature['name'] += f" {worker // 2}"
+                    feature['status'] = 'passed'
+                    for index, element in enumerate(feature['elements']):
+                        element['keyword'] = 'Scenario'
+                        element['name'] = f"Scenario {index + worker % 2 * 25}"
+                write_report(os.path.join(temp_dir, f"report_{worker}.json"), features)
+            for file_path in json_join.get_report_files():
+                if json_join.read_report_footer(file_path) is None:
+                    raise RuntimeError(f"The footer of the json report {file_path} can not be read, "
+                                       f"the features would not be streamed")
+            for name, function in (("Load all the reports and dump with indent", join_reports_loading_all),
+                                   ("Unify the reports streaming the features", json_join.join_json_reports)):
+                start = time.perf_counter()
+                function()
+                elapsed = time.perf_counter() - start
+                unified_features.append(read_unified_features())
+                tracemalloc.start()
+                function()
+                peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+                tracemalloc.stop()
+                read_unified_features()
+                rows.append([f"{name} (8 x 5000 steps)", f"{elapsed * 1000:.2f} ms, peak {peak:.1f} MB"])
+        finally:
+            json_join.JSONS_PATH = jsons_path
+            if parallel_type is None:
+                os.environ.pop('PARALLEL_TYPE', None)
+            else:
+                os.environ['PARALLEL_TYPE'] = parallel_type
+    if unified_features[0] != unified_features[1]:
+        raise RuntimeError("The reports unified loading all the reports and streaming the features are different")
+    return rows
+
+
+BENCHMARKS = {
+    'step_matching': benchmark_step_matching,
+    'settings_get': benchmark_settings_get,
+    'template_vars': benchmark_template_vars,
+    'profiles': benchmark_profiles,
+    'save_metrics': benchmark_save_metrics,
+    'element_store': benchmark_element_store,
+    'page_snapshot': benchmark_page_snapshot,
+    'healing': benchmark_healing,
+    'visual_diff': benchmark_visual_diff,
+    'screenshots': benchmark_screenshots,
+    'evidence_upload': benchmark_evidence_upload,
+    'excel_profile': benchmark_excel_profile,
+    'profile_edits': benchmark_profile_edits,
+    'json_schema': benchmark_json_schema,
+    'talos_virtual': benchmark_talos_virtual,
+    'portal_console': benchmark_portal_console,
+    'executions_statistics': benchmark_executions_statistics,
+    'feature_index': benchmark_feature_index,
+    'db_results': benchmark_db_results,
+    'json_join': benchmark_json_join,
+}
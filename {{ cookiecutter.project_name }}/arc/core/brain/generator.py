@@ -52,6 +52,48 @@ class XpathGenerator:
         logger.info(f"Element xpath '{xpath}' created")
         return xpath
 
+    def from_bs_elements(self, elements):
+        """
+        Generates the xpaths of a list of BeautifulSoup web elements of the same page with the same result as
+        from_bs_element. The path of every parent and the positions of the children of every parent are calculated
+        once, so the page is not walked again for every element.
+        :param elements:
+        :return:
+        """
+        paths = {}
+        positions = {}
+
+        def get_step(elem):
+            parent = elem.parent
+            if id(parent) not in positions:
+                children = {}
+                for child in parent.find_all(True, recursive=False):
+                    children.setdefault(child.name, []).append(child)
+                positions[id(parent)] = {id(child): (index, len(siblings)) for siblings in children.values()
+                                         for index, child in enumerate(siblings, 1)}
+            index, total = positions[id(parent)][id(elem)]
+            return f"/{elem.name}" if total == 1 else f"/{elem.name}[{index}]"
+
+        def get_path(elem):
+            if id(elem) in paths:
+                return paths[id(elem)]
+            parent = elem.parent
+            if parent is None:
+                path = ''
+            elif parent.get("id") is not None:
+                path = f'//*[@id="{parent.get("id")}"]{get_step(elem)}'
+            else:
+                path = get_path(parent) + get_step(elem)
+            paths[id(elem)] = path
+            return path
+
+        xpaths = []
+        for element in elements:
+            element_id = element.get("id")
+            xpaths.append(f'//*[@id="{element_id}"]' if element_id else get_path(element))
+        logger.info(f"{len(xpaths)} element xpaths created")
+        return xpaths
+
     def from_selenium_element(self, element):
         """
         Generates the xpath of a Selenium web element.
@@ -3,71 +3,204 @@
 File with functions for the self-healing process.
 """
 import os
+import sqlite3
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.neighbors import NearestNeighbors
 import pandas as pd
 from pandas.errors import EmptyDataError
 from colorama import Fore
 import logging
+from arc.core.brain.utils import get_element_store, get_process_file
 from arc.settings.settings_manager import Settings
 
 REPOSITORIES_PATH = Settings.REPOSITORIES.get()
 RESOURCES_PATH = Settings.USER_RESOURCES_PATH.get()
 CURRENT_ELEMENTS = os.path.join(RESOURCES_PATH, 'current_elements.csv')
 ELEMENTS_CSV = os.path.join(REPOSITORIES_PATH, 'elements.csv')
+ELEMENTS_DB = os.path.join(REPOSITORIES_PATH, 'elements.db')
 PYTALOS_IA = Settings.PYTALOS_IA.get('self-healing')
 SHOW_RESULT_CONSOLE = Settings.PYTALOS_IA.get('self-healing').get('show_result_console', False)
+# Models of the last scraped pages by page hash
+HEALING_MODELS = {}
+HEALING_MODELS_SIZE = 5
+# Locators not found in this process, healed again in one query when an element is not found in a new page
+MISSING_LOCATORS = {}
+MISSING_LOCATORS_SIZE = 50
 
 logger = logging.getLogger(__name__)
 
 
-def init_healing(old_locator):
+def init_healing(old_locator, page_hash=None):
     """
         Function that uses the Nearest Neighbors ML algorithm to find the most similar elements
-        to a not found element in a web page.
+        to a not found element in a web page. The other locators not found before in this process are healed in the
+        same query, so the next elements not found in the same page are already healed.
         :param old_locator:
+        :param page_hash: hash of the scraped page, the model of the page is reused while the page does not change
         :return:
     """
+    old_locator = tuple(old_locator)
+    logger.info(f'Element with locator "{old_locator[1]}" not found')
+    old_locators = [old_locator]
+    if page_hash is not None:
+        MISSING_LOCATORS.pop(old_locator, None)
+        old_locators += list(MISSING_LOCATORS)
+        MISSING_LOCATORS[old_locator] = None
+        if len(MISSING_LOCATORS) > MISSING_LOCATORS_SIZE:
+            MISSING_LOCATORS.pop(next(iter(MISSING_LOCATORS)))
+
+    healed_locator, similarity = heal_locators(old_locators, page_hash)[old_locator]
+    if healed_locator is not None:
+        logger.info(f'Similar element found with locator: {healed_locator}')
+        logger.info(f'Elements similarity: {similarity}')
+        show_console(old_locator, healed_locator, similarity)
+    return healed_locator
+
+
+def heal_locators(old_locators, page_hash=None):
+    """
+        Finds the most similar elements of the current page to several not found elements with one query
+        to the model of the page. The results are saved in the model, so the locators already healed in the page are
+        not queried again.
+        :param old_locators:
+        :param page_hash: hash of the scraped page, the model of the page is reused while the page does not change
+        :return: dict with the healed locator and the similarity of every old locator, (None, None) if no similar
+            element is found
+    """
     n_neighbors = PYTALOS_IA.get('n_neighbors', 3)
     algorithm = PYTALOS_IA.get('algorithm', 'ball_tree')
     tolerance = PYTALOS_IA.get('tolerance', 2.00)
-    healed_locator = None
-    logger.info(f'Element with locator "{old_locator[1]}" not found')
-    element = read_successful_element(old_locator)
+
+    model = HEALING_MODELS.get(page_hash) if page_hash is not None else None
+    healed_locators = {}
+    elements = []
+    for old_locator in map(tuple, old_locators):
+        if model is not None and old_locator in model.healed_locators:
+            logger.info(f'Element with locator {old_locator[1]} already healed in the current page')
+            healed_locators[old_locator] = model.healed_locators[old_locator]
+            continue
+        healed_locators[old_locator] = (None, None)
+        element = read_successful_element(old_locator)
+        if len(element.index) != 0:
+            elements.append((old_locator, element))
+        else:
+            logger.warning(f'Element with locator {old_locator[1]} has never been found before')
+    if not elements:
+        return healed_locators
+
+    model = get_healing_model(page_hash)
+    if model is None:
+        logger.warning('Current page is empty')
+        return healed_locators
+
+    similar_elements = model.find_similar_elements([element for _, element in elements],
+                                                   min(n_neighbors, model.size), algorithm)
+    for (old_locator, _), (page_locator, similarity) in zip(elements, similar_elements):
+        if page_locator is None:
+            continue
+        if tolerance and similarity > tolerance:
+            logger.info(f'Similar element with locator {page_locator} out of tolerance: {similarity}')
+            continue
+        healed_locators[old_locator] = (tuple((old_locator[0], page_locator)), similarity)
+    model.healed_locators.update({old_locator: healed_locators[old_locator] for old_locator, _ in elements})
+    return healed_locators
+
+
+class HealingModel:
+    """
+    Encoded elements of a scraped page with their Nearest Neighbors indexes, so several not found elements of the same
+    page are healed without reading and encoding the page again.
+    """
+
+    def __init__(self, page, page_locators):
+        self.columns = page.columns
+        self.page_locators = page_locators
+        self.size = len(page)
+        self.encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+        self.encoded_page = self.encoder.fit_transform(page.to_numpy())
+        self.neighbors = {}
+        # Healed locator and similarity of the locators already healed in the page
+        self.healed_locators = {}
+        logger.info(f'Page encoded')
+
+    def get_neighbors(self, n_neighbors, algorithm):
+        """
+        Returns the Nearest Neighbors index of the page, fitted once for every configuration.
+        :param n_neighbors:
+        :param algorithm:
+        :return:
+        """
+        if (n_neighbors, algorithm) not in self.neighbors:
+            self.neighbors[(n_neighbors, algorithm)] = NearestNeighbors(
+                n_neighbors=n_neighbors, algorithm=algorithm).fit(self.encoded_page)
+        return self.neighbors[(n_neighbors, algorithm)]
+
+    def find_similar_elements(self, elements, n_neighbors, algorithm):
+        """
+        Finds the most similar page element to every element with one transform and one kneighbors query.
+        The first saved data of every element is compared with the page elements.
+        :param elements: list of dataframes with the saved data of the elements
+        :param n_neighbors:
+        :param algorithm:
+        :return: list of tuples (page locator, distance), (None, None) if an element could not be compared
+        """
+        try:
+            rows = pd.concat([element.iloc[:1] for element in elements], ignore_index=True)
+            rows = rows.reindex(columns=self.columns).fillna('')
+            encoded_elements = self.encoder.transform(rows.to_numpy())
+            logger.info(f'Elements encoded')
+            distances, indexes = self.get_neighbors(n_neighbors, algorithm).kneighbors(encoded_elements)
+            logger.info(f'Similar elements indexes: {indexes}')
+            logger.info(f'Similar elements distances: {distances}')
+        except Exception as exception:
+            logger.error("Unable to execute the NearestNeighbors algorithm")
+            logger.error(exception)
+            return [(None, None)] * len(elements)
+        return [(self.page_locators.iloc[element_indexes[0]], element_distances[0])
+                for element_indexes, element_distances in zip(indexes.tolist(), distances.tolist())]
+
+
+def get_healing_model(page_hash=None):
+    """
+        Returns the model of the current page. The models are cached by the hash of the page,
+        the model is created again from the current elements csv when the page changes.
+        :param page_hash:
+        :return:
+    """
+    if page_hash is not None and page_hash in HEALING_MODELS:
+        logger.info('Reusing the model of the current page')
+        return HEALING_MODELS[page_hash]
+
     page, page_locators = read_current_page()
-    if len(element.index) != 0 and len(page.index) != 0 and len(page_locators.index) != 0:
-        max_elems = len(page)
-        if n_neighbors > max_elems:
-            n_neighbors = max_elems
-        element = pd.DataFrame(element, columns=page.columns)
-        element = element.to_numpy()
-        page = page.to_numpy()
-        encoded_page, encoded_elem = encode(page, element)
-        if encoded_page is not None and encoded_elem is not None:
-            healed_locator, similarity = get_healed_locator(old_locator, encoded_page, encoded_elem, n_neighbors, algorithm,
-                                                            tolerance, page_locators)
-            if healed_locator is not None and similarity is not None:
-                logger.info(f'Similar element found with locator: {healed_locator}')
-                logger.info(f'Elements similarity: {similarity}')
-                show_console(old_locator, healed_locator, similarity)
-    else:
-        logger.warning(f'Element with locator {old_locator[1]} has never been found before or current page is empty')
-    return healed_locator
+    if len(page.index) == 0 or len(page_locators.index) == 0:
+        return None
+    try:
+        model = HealingModel(page, page_locators)
+    except Exception as exception:
+        logger.error(f'Unable to encode web elements')
+        logger.error(exception)
+        return None
+    if page_hash is not None:
+        if len(HEALING_MODELS) >= HEALING_MODELS_SIZE:
+            HEALING_MODELS.pop(next(iter(HEALING_MODELS)))
+        HEALING_MODELS[page_hash] = model
+    return model
 
 
 def read_successful_element(locator):
     """
-        Reads the info of the last successful element found from the csv using the old locator
+        Reads the info of the last successful element found from the element store using the old locator
         :param locator:
         :return:
     """
     try:
-        element = pd.read_csv(ELEMENTS_CSV, encoding='utf-8-sig')
-        element = element.loc[element['loc'] == locator[1]]
-        element = element.drop(columns=['loc_by', 'loc', 'md5'])
-        logger.info(f'Last successful element read from csv')
-    except (FileNotFoundError, EmptyDataError) as exception:
-        logger.error(f'Unable to read file:{ELEMENTS_CSV}')
+        elements = get_element_store(ELEMENTS_DB, ELEMENTS_CSV).get_elements(locator[1])
+        element = pd.DataFrame([{key: '' if value is None else str(value) for key, value in data.items()}
+                                for data in elements])
+        element = element.drop(columns=['loc_by', 'loc', 'md5'], errors='ignore')
+        logger.info(f'Last successful element read from element store')
+    except sqlite3.Error as exception:
+        logger.error(f'Unable to read element store:{ELEMENTS_DB}')
         logger.error(exception)
         element = pd.DataFrame()
     return element
@@ -78,70 +211,20 @@ def read_current_page():
         Reads the info of the scraped web page rom the csv
         :return:
     """
+    current_elements = get_process_file(CURRENT_ELEMENTS)
     try:
-        page = pd.read_csv(CURRENT_ELEMENTS, encoding='utf-8-sig')
+        page = pd.read_csv(current_elements, encoding='utf-8-sig', dtype=str, keep_default_na=False)
         page_locators = page['loc']
         page = page.drop(columns=['loc_by', 'loc', 'md5'])
         logger.info(f'Page elements read from csv')
     except (FileNotFoundError, EmptyDataError) as exception:
-        logger.error(f'Unable to read file:{CURRENT_ELEMENTS}')
+        logger.error(f'Unable to read file:{current_elements}')
         logger.error(exception)
         page = pd.DataFrame()
         page_locators = pd.DataFrame()
     return page, page_locators
 
 
-def encode(page, element):
-    """
-        Converts all web elements from a list of strings to a list of binary integers
-        :param page:
-        :param element:
-        :return:
-    """
-    encoded_elem = None
-    encoded_page = None
-    try:
-        encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
-        encoded_page = encoder.fit_transform(page)
-        logger.info(f'Page encoded')
-        encoded_elem = encoder.transform(element)
-        logger.info(f'Element encoded')
-    except Exception as exception:
-        logger.error(f'Unable to encode web elements')
-        logger.error(exception)
-    return encoded_page, encoded_elem
-
-
-def get_healed_locator(old_locator, encoded_page, encoded_elem, n_neighbors, algorithm, tolerance, page_locators):
-    """
-        Uses the NearestNeigbors algorithm from the sklearn library to compare and find the most similar
-        web element to the las successful element in the current page
-        :param old_locator:
-        :param encoded_page:
-        :param encoded_elem:
-        :param n_neighbors:
-        :param algorithm:
-        :param tolerance:
-        :param page_locators:
-        :return:
-    """
-    healed_locator = None
-    first_elem_similarity = None
-    try:
-        neighbors = NearestNeighbors(n_neighbors=n_neighbors, algorithm=algorithm).fit(encoded_page)
-        distances, indexes = neighbors.kneighbors(encoded_elem)
-        logger.info(f'Similar elements indexes: {indexes}')
-        logger.info(f'Similar elements distances: {distances}')
-        first_elem_similarity = distances[0].tolist()[0]
-        healed_locator = tuple((old_locator[0], page_locators.iloc[indexes.tolist()[0][0]]))
-        if tolerance and first_elem_similarity > tolerance:
-            return None, first_elem_similarity
-    except Exception as exception:
-        logger.error("Unable to execute the NearestNeighbors algorithm")
-        logger.error(exception)
-    return healed_locator, first_elem_similarity
-
-
 def show_console(old_locator, healed_locator, similarity):
     """
         If activated in the settings prints the result of the self-healing in the console
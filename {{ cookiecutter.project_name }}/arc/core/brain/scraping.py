@@ -17,10 +17,25 @@ REPOSITORIES_PATH = Settings.REPOSITORIES.get()
 RESOURCES_PATH = Settings.USER_RESOURCES_PATH.get()
 CURRENT_ELEMENTS = os.path.join(RESOURCES_PATH, 'current_elements.csv')
 ELEMENTS_CSV = os.path.join(REPOSITORIES_PATH, 'elements.csv')
+ELEMENTS_DB = os.path.join(REPOSITORIES_PATH, 'elements.db')
 GET_ELEMENT_RECT = Settings.PYTALOS_IA.get('self-healing').get('elem_rect', False)
 
+# Hash of the url and page source of the last page scraped in the current elements csv, and the process that scraped it
+LAST_PAGE = {'hash': None, 'pid': None}
+
 logger = logging.getLogger(__name__)
 
+# Rect of the elements found by xpath, with the same values that Selenium returns for an element
+GET_ELEMENTS_RECT_SCRIPT = (
+    'return arguments[0].map(function (xpath) {'
+    ' var element = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)'
+    '.singleNodeValue;'
+    ' if (!element) { return null; }'
+    ' var rect = element.getBoundingClientRect();'
+    ' return {height: rect.height, width: rect.width, x: rect.x + window.pageXOffset, y: rect.y + window.pageYOffset};'
+    '});'
+)
+
 tags = [
     'a',
     'div',
@@ -74,14 +89,15 @@ class Scraper:
     def __init__(self, driver):
         self.driver = driver
 
-    def get_elements_from_page_source(self):
+    def get_elements_from_page_source(self, page_source=None):
         """
         Extracts all elements from the page_source using BeautifulSoup.
+        :param page_source: page source already got from the driver
         :return:
         """
         elements = []
         try:
-            page_source = self.driver.page_source
+            page_source = page_source if page_source is not None else self.driver.page_source
             soup = BeautifulSoup(page_source, 'html.parser')
             elements = soup.find_all(TAGS)
             logger.info("Web elements scraped from page source")
@@ -108,22 +124,50 @@ class Scraper:
 
         return elements_found
 
+    def get_elements_rect(self, xpaths):
+        """
+        Gets the rect of the elements of the current page with one script for all the xpaths.
+        The rect of the elements not found is None.
+        :param xpaths:
+        :return:
+        """
+        timeout = Timeouts()
+        timeout.implicit_wait = 1
+        self.driver.timeouts = timeout
+        rects = self.driver.execute_script(GET_ELEMENTS_RECT_SCRIPT, xpaths)
+        return [str(rect) if rect is not None else None for rect in rects]
+
     def scraping_current_page_elements(self):
         """
         Gets all the data from the elements of the current web page.
-        :return:
+        The page is scraped from one page source, the rects are got with one script and the data is written once.
+        If the url and the page source have not changed since the last scraping, the page is not scraped again.
+        :return: hash of the scraped page, used by the self-healing to reuse the model of the page
         """
         from arc.core.brain.generator import XpathGenerator
 
-        utils.generate_current_elements_csv_headers(CURRENT_ELEMENTS, DATA_FIELD)
+        try:
+            page_source = self.driver.page_source
+            current_url = self.driver.current_url
+        except(Exception,):
+            logger.warning("Unable to get the page source")
+            return None
+        page_hash = generate_md5([current_url, page_source])
+        current_elements = utils.get_process_file(CURRENT_ELEMENTS)
+        if (page_hash, os.getpid()) == (LAST_PAGE['hash'], LAST_PAGE['pid']) and os.path.exists(current_elements):
+            logger.info("Current web page has not changed since the last scraping")
+            return page_hash
 
         xpath_generator = XpathGenerator()
-        elements = self.get_elements_from_page_source()
+        elements = self.get_elements_from_page_source(page_source)
 
         try:
-            for element in elements:
+            xpaths = xpath_generator.from_bs_elements(elements)
+            rects = self.get_elements_rect(xpaths) if GET_ELEMENT_RECT else None
+            page_data = []
+            for index, element in enumerate(elements):
                 data = deepcopy(DATA_FIELD)
-                data['loc'] = xpath_generator.from_bs_element(element)
+                data['loc'] = xpaths[index]
                 data['tag'] = element.name
                 data['text'] = element.text
 
@@ -133,18 +177,19 @@ class Scraper:
                     else:
                         data[att] = element.attrs.get(att, None)
 
-                data['url'] = self.driver.current_url
+                data['url'] = current_url
                 data['md5'] = None
                 if GET_ELEMENT_RECT:
-                    timeout = Timeouts()
-                    timeout.implicit_wait = 1
-                    self.driver.timeouts = timeout
-                    element = self.driver.find_element(By.XPATH, data['loc'])
-                    data['rect'] = str(element.rect)
-                utils.insert_element_data(data, CURRENT_ELEMENTS)
+                    data['rect'] = rects[index]
+                page_data.append(data)
+            utils.save_page_elements_data(page_data, current_elements, DATA_FIELD)
+            LAST_PAGE.update(hash=page_hash, pid=os.getpid())
             logger.info("Current web elements info scraped")
         except(Exception,):
+            LAST_PAGE['hash'] = None
             logger.warning("Unable to get current web element info")
+            return None
+        return page_hash
 
     def save_web_element_scraping(self, web_element, locator):
         """
@@ -173,7 +218,7 @@ class Scraper:
             data['md5'] = md5
             if GET_ELEMENT_RECT:
                 data['rect'] = str(web_element.rect)
-            utils.insert_element_data(data, ELEMENTS_CSV)
+            utils.save_element_data(data, ELEMENTS_DB, ELEMENTS_CSV)
             logger.info(f"Web element with locator '{locator}' scraped")
         except (Exception,):
             logger.warning(f"Unable to get web element with locator {locator} info")
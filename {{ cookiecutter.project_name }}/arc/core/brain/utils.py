@@ -1,13 +1,55 @@
 # -*- coding: utf-8 -*-
 """
-Utils used for saving web elements info in a csv in the self-healing process.
+Utils used for saving web elements info in the self-healing process.
+The current page elements are saved in a csv of every process and the elements found in the executions in an element store.
+The elements csv of the repositories folder is still the history versioned with the project: the element store is
+exported to it at the end of the execution, and it is imported again when the csv is changed out of the executions.
 """
 import csv
+import glob
+import json
+import os
+import re
+import sqlite3
 import pandas as pd
 import logging
 
+from arc.contrib.tools.crypto.crypto import generate_md5
+
 logger = logging.getLogger(__name__)
 
+# Seconds that a writer waits for the lock of the element store held by other parallel workers
+ELEMENT_STORE_TIMEOUT = 30
+# Element stores opened by this process by path
+ELEMENT_STORES = {}
+
+
+def get_process_file(file_path):
+    """
+    Return the path of the file of this process, so the parallel workers do not read the files written by the others.
+    :param file_path: path shared by the processes, the process id is added to its name
+    :return:
+    """
+    root, extension = os.path.splitext(file_path)
+    return f"{root}_{os.getpid()}{extension}"
+
+
+def remove_process_files(file_path):
+    """
+    Remove the files of all the processes of a path.
+    :param file_path: path shared by the processes
+    :return:
+    """
+    root, extension = os.path.splitext(file_path)
+    process_file_name = re.compile(rf"{re.escape(root)}_\d+{re.escape(extension)}")
+    for process_file in glob.glob(f"{glob.escape(root)}_*{extension}"):
+        if not process_file_name.fullmatch(process_file):
+            continue
+        try:
+            os.remove(process_file)
+        except OSError as ex:
+            logger.warning(f"Unable to remove the file '{process_file}': {ex}")
+
 
 def generate_current_elements_csv_headers(csv_path, data_field):
     """
@@ -41,3 +83,231 @@ def insert_element_data(data, csv_path):
     union_data = union_data.drop_duplicates(subset=union_data.columns.difference(['url', 'rect']))
     union_data.to_csv(csv_path, index=False)
     logger.info("Web element data inserted in csv")
+
+
+def save_page_elements_data(page_data, csv_path, data_field):
+    """
+    Writes the data of all the web elements of a page into a csv, replacing the previous page.
+    The columns of data_field are the first ones and the duplicated elements are saved once.
+    :param page_data:
+    :param csv_path:
+    :param data_field:
+    :return:
+    """
+    page = pd.DataFrame(page_data)
+    page = page.reindex(columns=list(dict.fromkeys(list(data_field) + list(page.columns))))
+    page = page.drop_duplicates(subset=page.columns.difference(['url', 'rect']))
+    page.to_csv(csv_path, index=False)
+    logger.info(f"{len(page)} web elements data saved in csv")
+
+
+class ElementStore:
+    """
+    SQLite store of the data of the web elements found in the executions.
+    Every element is saved once by the md5 of its data and the elements are indexed by locator, so saving an element
+    and reading the history of a locator do not depend on the number of saved elements.
+    The parallel workers can write at the same time, SQLite locks the database for every insert.
+    The modification time and size of the elements csv last imported or exported are saved in the store, so the
+    elements are imported again only when the csv changes.
+    """
+
+    def __init__(self, db_path, csv_path=None):
+        self.db_path = db_path
+        self.saved_md5 = set()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path, timeout=ELEMENT_STORE_TIMEOUT, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS elements ('
+                                'id INTEGER PRIMARY KEY AUTOINCREMENT, md5 TEXT NOT NULL UNIQUE, loc TEXT, '
+                                'url TEXT, data TEXT NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS elements_loc ON elements (loc)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT)')
+        if csv_path:
+            self.sync_csv(csv_path)
+
+    def get_info(self, key):
+        """
+        Return a value saved in the info of the store, or None.
+        :param key:
+        :return:
+        """
+        row = self.connection.execute('SELECT value FROM store_info WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_info(self, key, value):
+        """
+        Save a value in the info of the store.
+        :param key:
+        :param value:
+        :return:
+        """
+        self.connection.execute('INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def sync_csv(self, csv_path):
+        """
+        Import the elements csv if it changed since it was imported or exported by the store. The elements of a csv
+        edited out of the executions replace the elements of the store. The stores created before the csv was
+        exported add the elements of the csv to their elements.
+        :param csv_path:
+        :return:
+        """
+        csv_stamp = get_file_stamp(csv_path)
+        if csv_stamp is None or csv_stamp == self.get_info('csv_stamp'):
+            return
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Other parallel worker could have imported the csv while this one was waiting for the lock
+            last_stamp = self.get_info('csv_stamp')
+            if csv_stamp != last_stamp:
+                self.import_csv(csv_path, replace=last_stamp is not None)
+                self.set_info('csv_stamp', csv_stamp)
+                self.set_info('exported_id', self.get_last_id())
+            self.connection.execute('COMMIT')
+        except (Exception,):
+            self.connection.execute('ROLLBACK')
+            raise
+
+    def get_last_id(self):
+        """
+        Return the id of the last element saved, 0 if the store is empty.
+        :return:
+        """
+        return self.connection.execute('SELECT COALESCE(MAX(id), 0) FROM elements').fetchone()[0]
+
+    def is_empty(self):
+        """
+        Return True if there are no elements in the store.
+        :return:
+        """
+        return self.connection.execute('SELECT 1 FROM elements LIMIT 1').fetchone() is None
+
+    def insert(self, data):
+        """
+        Save the data of a web element if there is not an element with the same md5.
+        The url and the rect of the element are not part of the md5.
+        :param data:
+        :return: True if the element is saved
+        """
+        md5 = data.get('md5') or generate_md5({key: value for key, value in data.items()
+                                                if key not in ('url', 'rect')})
+        if md5 in self.saved_md5:
+            return False
+        cursor = self.connection.execute(
+            'INSERT OR IGNORE INTO elements (md5, loc, url, data) VALUES (?, ?, ?, ?)',
+            (md5, data.get('loc'), data.get('url'), json.dumps(data, default=str))
+        )
+        self.saved_md5.add(md5)
+        return cursor.rowcount > 0
+
+    def get_elements(self, loc):
+        """
+        Return the data of the elements saved with a locator, in the order they were saved.
+        :param loc:
+        :return:
+        """
+        rows = self.connection.execute('SELECT data FROM elements WHERE loc = ? ORDER BY id', (loc,))
+        return [json.loads(data) for data, in rows]
+
+    def import_csv(self, csv_path, replace=False):
+        """
+        Import the elements of the elements csv. It must be called in a transaction.
+        :param csv_path:
+        :param replace: remove the elements of the store before importing the csv
+        :return:
+        """
+        try:
+            elements = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+        except (Exception,):
+            logger.warning(f"Unable to import the web elements of the csv '{csv_path}'")
+            return
+        if replace:
+            self.connection.execute('DELETE FROM elements')
+            self.saved_md5.clear()
+        for data in elements.to_dict('records'):
+            data = {key: value for key, value in data.items() if value != ''}
+            self.insert(data)
+        logger.info(f"{len(elements)} web elements imported from csv '{csv_path}'")
+
+    def export_csv(self, csv_path, data_field=None):
+        """
+        Write all the elements of the store in the elements csv, if there are elements saved since it was imported or
+        exported or the csv does not exist. The csv is replaced atomically.
+        :param csv_path:
+        :param data_field: columns written first in the csv
+        :return: True if the csv is written
+        """
+        last_id = self.get_last_id()
+        csv_stamp = get_file_stamp(csv_path)
+        if csv_stamp is None and not last_id:
+            return False
+        if csv_stamp is not None and csv_stamp == self.get_info('csv_stamp') \
+                and str(last_id) == self.get_info('exported_id'):
+            return False
+        rows = self.connection.execute('SELECT data FROM elements ORDER BY id')
+        elements = pd.DataFrame([json.loads(data) for data, in rows])
+        if data_field:
+            elements = elements.reindex(columns=list(dict.fromkeys(list(data_field) + list(elements.columns))))
+        os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+        temp_file = f"{csv_path}.{os.getpid()}.tmp"
+        elements.to_csv(temp_file, index=False)
+        os.replace(temp_file, csv_path)
+        self.set_info('csv_stamp', get_file_stamp(csv_path))
+        self.set_info('exported_id', last_id)
+        logger.info(f"{len(elements)} web elements exported to csv '{csv_path}'")
+        return True
+
+
+def get_file_stamp(file_path):
+    """
+    Return the modification time and size of a file, or None if it does not exist.
+    :param file_path:
+    :return:
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{file_stat.st_mtime_ns}:{file_stat.st_size}"
+
+
+def get_element_store(db_path, csv_path=None):
+    """
+    Return the element store of this process for a database path. The elements of the csv are imported if it changed
+    since the store imported or exported it.
+    :param db_path:
+    :param csv_path:
+    :return:
+    """
+    key = (os.getpid(), db_path)
+    if key not in ELEMENT_STORES:
+        ELEMENT_STORES[key] = ElementStore(db_path, csv_path)
+    return ELEMENT_STORES[key]
+
+
+def save_element_data(data, db_path, csv_path=None):
+    """
+    Saves the data of a web element in the element store.
+    :param data:
+    :param db_path:
+    :param csv_path: elements csv versioned with the project, imported when it changes
+    :return:
+    """
+    if get_element_store(db_path, csv_path).insert(data):
+        logger.info("Web element data inserted in element store")
+
+
+def export_element_store(db_path, csv_path, data_field=None):
+    """
+    Export the elements of the element store to the elements csv versioned with the project, if the store exists.
+    :param db_path:
+    :param csv_path:
+    :param data_field: columns written first in the csv
+    :return:
+    """
+    if not os.path.exists(db_path):
+        return
+    try:
+        get_element_store(db_path, csv_path).export_csv(csv_path, data_field)
+    except (Exception,) as ex:
+        logger.warning(f"Unable to export the web elements to the csv '{csv_path}': {ex}")
@@ -3,7 +3,6 @@
 Visual Testing engine configuration file.
 """
 
-import itertools
 import logging
 import os
 import json
@@ -13,6 +12,7 @@ from io import BytesIO
 from os import path
 from selenium.common.exceptions import NoSuchElementException
 
+import numpy as np
 from PIL import Image, ImageChops
 
 from arc.core import constants
@@ -266,16 +266,15 @@ class VisualTest(object):
         """
         if web_elements and len(web_elements) > 0:
             img = img.convert("RGBA")
-            pixel_data = img.load()
+            width, height = img.size
 
             for web_element in web_elements:
                 element_box = self.get_element_box(web_element)
-                for x, y in itertools.product(range(element_box[0], element_box[2]),
-                                              range(element_box[1], element_box[3])):
-                    try:
-                        pixel_data[x, y] = (0, 0, 0, 255)
-                    except IndexError:
-                        pass
+                # The whole box is filled at once, the parts of the element box out of the image are not painted
+                min_x, min_y = max(element_box[0], 0), max(element_box[1], 0)
+                max_x, max_y = min(element_box[2], width), min(element_box[3], height)
+                if min_x < max_x and min_y < max_y:
+                    img.paste((0, 0, 0, 255), (min_x, min_y, max_x, max_y))
 
         return img
 
@@ -298,9 +297,15 @@ class VisualTest(object):
                 baseline_max = Image.new('RGB', max_size)
                 baseline_max.paste(baseline.convert('RGB'))
 
-        # Generate and save diff image
+        # Generate and save diff image, only if there are differences, the report only links the saved diff image
         diff_path = image_path.replace('.png', '.diff.png')
-        diff_pixels_percentage = self.save_differences_image(image_max, baseline_max, diff_path)
+        mask = self.get_differences_mask(image_max, baseline_max, Settings.VISUAL_TESTING.get('pixel_tolerance',
+                                                                                              default=0))
+        if mask.any():
+            diff_pixels_percentage = self.save_differences_image(image_max, baseline_max, diff_path, mask)
+        else:
+            diff_path = None
+            diff_pixels_percentage = 0
 
         # Check differences and add to report
         if image_size != baseline_size:
@@ -349,16 +354,30 @@ class VisualTest(object):
         return result
 
     @staticmethod
-    def save_differences_image(image, baseline, diff_path):
+    def get_differences_mask(image, baseline, pixel_tolerance=0):
+        """Return a boolean array with the pixels that are different between both images
+
+        :param image: image object
+        :param baseline: reference baseline image object, with the same size and mode as the image
+        :param pixel_tolerance: maximum luminance difference (0-255) of two pixels considered equal
+        :returns: numpy array of booleans, True in the different pixels
+        """
+        if np.array_equal(np.asarray(image), np.asarray(baseline)):
+            return np.zeros((baseline.height, baseline.width), dtype=bool)
+        return np.asarray(ImageChops.difference(image, baseline).convert('L')) > pixel_tolerance
+
+    @staticmethod
+    def save_differences_image(image, baseline, diff_path, mask=None):
         """Create and save an image showing differences between both images
 
         :param image: image object
         :param baseline: reference baseline image object
         :param diff_path: file path where difference image will be saved
+        :param mask: array of the different pixels, calculated if it is not passed
         :returns: percentage of pixels that are different between both images
         """
-        # Create a mask with differences
-        mask = ImageChops.difference(image, baseline).convert('L').point(lambda x: 255 if x else 0)
+        if mask is None:
+            mask = VisualTest.get_differences_mask(image, baseline)
         # Create a White base
         white_image = Image.new('RGB', baseline.size, (255, 255, 255))
         # Add baseline with 50% opacity
@@ -366,13 +385,12 @@ class VisualTest(object):
         white_image.paste(baseline, (0, 0), baseline)
         # Add red points in different pixels
         red_image = Image.new('RGB', baseline.size, (255, 0, 0))
-        white_image.paste(red_image, (0, 0), mask)
-        # Save file
-        white_image.save(diff_path)
+        white_image.paste(red_image, (0, 0), Image.fromarray(mask.astype(np.uint8) * 255, 'L'))
+        # Save file, with a fast compression because the images can be full page screenshots
+        white_image.save(diff_path, compress_level=1)
 
-        # Count different pixels (black pixels in mask image are equal pixels)
-        equal_pixels = sum([1 for pixel in mask.getdata() if pixel == 0])
-        diff_pixels_percentage = 1 - equal_pixels / (baseline.width * baseline.height)
+        # Count different pixels
+        diff_pixels_percentage = np.count_nonzero(mask) / (baseline.width * baseline.height)
         return diff_pixels_percentage
 
     def _add_result_to_report(self, result, baseline_path, file_suffix, filename):
@@ -31,9 +31,11 @@ from arc.integrations.alm import run_alm_connect
 from arc.integrations.octane import run_octane_connect
 from arc.misc import title
 from arc.reports.evidence import Evidence
+from arc.reports.html.screenshots import reset_compressed_screenshots, wait_compressed_screenshots
 from arc.reports.html.utils import BASE_DIR
 from arc.reports.json_join import join_json_reports
 from arc.settings.settings_manager import Settings
+from arc.talos_virtual.core.contrib.native.stub_server import is_native_engine_enabled
 from arc.web.app.utils import send_info_portal
 from arc.contrib import func
 from arc.contrib.api import api_wrapper
@@ -41,6 +43,7 @@ from arc.contrib.db import sqlite
 from arc.contrib.tools import ftp
 from arc.core.behave import config_data, gherkin_format
 from arc.core.behave.context_utils import RuntimeDatas, TestData
+from arc.core.behave.incremental import is_incremental_enabled, reset_incremental_run, apply_incremental_results
 from arc.core.behave.env_utils import (
     post_jira,
     config_faker,
@@ -54,7 +57,8 @@ from arc.core.behave.env_utils import (
     utils_before_execution, utils_after_execution, set_accessibility_initial_data, run_accessibility_test,
     init_talos_virtual, init_auto_retry, wait_seconds_autoretry, prepare_json_data, generate_accessibility_html_reports,
     save_metrics, add_summary_portal, run_portal_hooks, print_errors_end, start_recording, stop_recording,
-    check_install_driver, generate_error_reports
+    check_install_driver, generate_error_reports, start_talos_virtual, stop_talos_virtual,
+    finish_self_healing
 )
 from arc.core.behave.environment import (
     before_all as core_before_all,
@@ -102,6 +106,15 @@ def before_execution():
     logger.info('Generating needed dir')
     generate_needed_dir()
 
+    if is_incremental_enabled():
+        logger.info('Incremental execution enabled')
+        reset_incremental_run()
+
+    reset_compressed_screenshots()
+
+    logger.info('Checking if the native engine of talos virtual is enabled')
+    start_talos_virtual()
+
     activate_environment_proxy()
 
     logger.info('Settings reports configuration')
@@ -291,7 +304,7 @@ def after_feature(context, feature):
     logger.info('Adding current feature data in reports')
     add_feature_data(feature)
 
-    if Settings.TALOS_VIRTUAL.get('mountebank').get("enabled"):
+    if Settings.TALOS_VIRTUAL.get('mountebank').get("enabled") and not is_native_engine_enabled():
         logger.info('Stopping talos virtual mountebank process')
         context.talosvirtual.mountebank.stop_process()
 
@@ -311,6 +324,7 @@ def after_all(context):
     core_after_all(context)
 
     # reporting actions
+    wait_compressed_screenshots()
     generate_simple_html_reports(Settings.PYTALOS_REPORTS.get('generate_simple_html'))
 
     if Settings.PYTALOS_REPORTS.get('generate_txt'):
@@ -421,10 +435,20 @@ def after_execution():
 
     logger.info('Running after execution environment')
 
+    logger.info('Stopping the native engine of talos virtual')
+    stop_talos_virtual()
+
+    logger.info('Exporting the self-healing web elements and removing the current elements files')
+    finish_self_healing()
+
     if os.environ['RUN_TYPE'] == 'parallel':
         logger.info('Unifying json reports from parallel execution')
         join_json_reports()
 
+    if is_incremental_enabled():
+        logger.info('Adding the results of the scenarios not run in the incremental execution')
+        apply_incremental_results(f"{BASE_DIR}/output/reports/talos_report.json")
+
     logger.debug('Checking generate report configurations')
     validate_generate_reports()
 
@@ -10,6 +10,7 @@ import shutil
 from subprocess import call
 
 from arc.core.test_method.exceptions import TalosRunError
+from arc.reports.html.screenshots import get_compressed_screenshot
 from arc.settings.settings_manager import Settings
 from zipfile import ZipFile
 
@@ -170,14 +171,16 @@ def compress_html_report(attach_files):
                 name,
                 arcname=name
             )
+            archived = set()
             for screenshot in value:
                 screenshot_path = f"output{screenshot.split('output')[1]}"
                 if Settings.PYTALOS_REPORTS.get('compress_screenshot'):
-                    screenshot_path = screenshot_path.replace('screenshots', 'reports\\html\\assets\\imgs')
-                    index = screenshot_path.rfind(os.sep)
-                    img_name = screenshot_path[index:]
-                    screenshot_path = f"{screenshot_path.split('imgs')[0]}imgs{img_name}"
-                    screenshot_path = screenshot_path.replace('.png', '.webp')
+                    # The screenshots with the same content share the same webp image
+                    webp_name = get_compressed_screenshot(screenshot)
+                    screenshot_path = os.path.join('output', 'reports', 'html', 'assets', 'imgs', webp_name)
+                if screenshot_path in archived:
+                    continue
+                archived.add(screenshot_path)
                 archive.write(
                     screenshot_path,
                     arcname=screenshot_path
@@ -5,11 +5,10 @@ Elastic Search integration class file.
 import json
 import logging
 
-import requests
-
 from arc.reports.html.utils import BASE_DIR
 from arc.core.constants import ELASTICSEARCH
 from arc.core.env_settings import disabled_environment_proxy, activate_environment_proxy
+from arc.integrations.uploader import get_upload_session
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +27,11 @@ class Elasticsearch:
     _url = f'{_host}:{_port}'
     _json_path = f'{BASE_DIR}/output/reports/talos_report.json'
 
+    def __init__(self):
+        # Only one retry, so an unreachable server does not delay the end of the execution
+        self.session = get_upload_session(retries=1)
+        self.session.headers.update(self._header)
+
     def run(self):
         """
         Run Elastic Search conección and send json execution data.
@@ -38,6 +42,7 @@ class Elasticsearch:
         if self._start_connection():
             logger.debug('The connection to Elastic Search was successful')
             self._send_json()
+        self.session.close()
         activate_environment_proxy()
 
     def _start_connection(self):
@@ -46,7 +51,7 @@ class Elasticsearch:
         :return:
         """
         logger.debug(f"Starting connection to: {self._url}")
-        response = requests.get(headers=self._header, url=self._url, verify=False)
+        response = self.session.get(self._url)
         if response.status_code not in (200, 201, 202):
             logger.warning(f"Warning: Impossible to start connection with elastic, {response.text}")
         return response.status_code in (200, 201, 202)
@@ -63,7 +68,7 @@ class Elasticsearch:
         if self._index_exist():
             del json_data['features']
             json_data['global_data']['features'] = json_data['global_data'].pop('results')
-            response = requests.post(headers=self._header, url=file_url, json=json_data, verify=False)
+            response = self.session.post(file_url, json=json_data)
             logger.debug("The execution data has been sent to Elastic Search")
             if response.status_code not in (200, 201, 202):
                 logger.warning(f"Warning: Impossible to send json data to elastic, {response.text}")
@@ -77,7 +82,7 @@ class Elasticsearch:
         """
         index_url = f'{self._url}/{self._index}'
         logger.debug(f"Check if index exists: {index_url}")
-        response = requests.get(headers=self._header, url=index_url, verify=False)
+        response = self.session.get(index_url)
         if response.status_code not in (200, 201, 202):
             logger.warning(f"Warning: Impossible find index {self._index}")
         return response.status_code in (200, 201, 202)
@@ -4,13 +4,14 @@ File containing Jira integration class and plugins.
 """
 import logging
 import os
-import requests
+import threading
 import urllib3  # noqa
 import datetime
 
 from colorama import Fore
 
 from arc.contrib.tools.formatters import replace_chars
+from arc.integrations.uploader import get_upload_session, run_uploads, UPLOAD_WORKERS
 from arc.settings.settings_manager import Settings
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,12 @@ class Jira:
             }
         else:
             self.proxy = None
+        self.upload_workers = Settings.PYTALOS_JIRA.get('upload_workers', default=UPLOAD_WORKERS) or 1
+        self.session = get_upload_session(auth=(self.username, self.password), proxies=self.proxy,
+                                          pool_size=self.upload_workers)
+        # Attachments of every issue by name, read once per issue
+        self.attachments = {}
+        self.attachments_lock = threading.Lock()
 
     def _set_scenario(self, feature, html_files, pdf_files, doc_files):
         """
@@ -150,62 +157,69 @@ class Jira:
     def _add_total_comment_in_issue(self):
         """
         This function add execution summary to Jira issue depending of its Jira tag.
+        The comments of the issues are sent concurrently.
         :return:
         """
         scenario_dict = self._join_scenarios()
-        for scenario_tag in scenario_dict:
-            comment = self._parse_total_comment(scenario_dict[scenario_tag])
-            api = f'{self.base_url}/rest/api/2/issue/{self._parse_tag(scenario_tag)}/comment'
-            headers = {'Content-Type': 'application/json'}
-            body = {'body': comment}
-            logger.debug(f'Adding comment to: {self._parse_tag(scenario_tag)}')
-            response = requests.post(
-                api, auth=(self.username, self.password), json=body,
-                headers=headers, verify=False, proxies=self.proxy
-            )
-            if response.status_code in [200, 201]:
-                msg = "Added comment to Jira issue\n"
-                logger.debug(msg)
-                print(msg)
-            else:
-                msg = (f"There was an error adding the comment to the Jira issue.\n"
-                       f"Response status code: {response.status_code}\n"
-                       f"Response result: {response.text}\n")
-                logger.error(msg)
-                print(Fore.RED + msg)
+        comments = [(scenario_tag, self._parse_total_comment(scenario_dict[scenario_tag]))
+                    for scenario_tag in scenario_dict]
+        run_uploads(self._add_comment_in_issue, comments, self.upload_workers)
+
+    def _add_comment_in_issue(self, comment_data):
+        """
+        Add a comment to a Jira issue.
+        :param comment_data: tuple (Jira tag, comment)
+        :return:
+        """
+        scenario_tag, comment = comment_data
+        api = f'{self.base_url}/rest/api/2/issue/{self._parse_tag(scenario_tag)}/comment'
+        headers = {'Content-Type': 'application/json'}
+        body = {'body': comment}
+        logger.debug(f'Adding comment to: {self._parse_tag(scenario_tag)}')
+        response = self.session.post(api, json=body, headers=headers)
+        if response.status_code in [200, 201]:
+            msg = "Added comment to Jira issue\n"
+            logger.debug(msg)
+            print(msg)
+        else:
+            msg = (f"There was an error adding the comment to the Jira issue.\n"
+                   f"Response status code: {response.status_code}\n"
+                   f"Response result: {response.text}\n")
+            logger.error(msg)
+            print(Fore.RED + msg)
 
     def _add_issue_evidence(self):
         """
         Add evidences reports to issue depending its Jira tag.
+        Every file is uploaded once to every issue, replacing the attachment with the same name, and the uploads are
+        sent concurrently.
         :return:
         """
-        api = None
-        headers = None
+        issue = None
+        uploads = []
         for scenario in self.scenarios_list:
             for key in scenario.keys():
-                api = f'{self.base_url}/rest/api/2/issue/{self._parse_tag(key)}/attachments'
-                headers = {"X-Atlassian-Token": "nocheck"}
+                issue = self._parse_tag(key)
                 for attach in scenario[key]['evidence']:
-                    self._delete_attachment(attach.split(os.sep)[-1])
-                    files = [('file', open(attach, 'rb'))]
-                    logger.debug(f"Adding evidence report to: {self._parse_tag(key)}")
-                    response = requests.post(api, auth=(self.username, self.password), files=files,
-                                  headers=headers, verify=False, proxies=self.proxy)
-
-                    if response.status_code in [200, 201]:
-                        msg = "Evidence reports added to Jira Issue\n"
-                        logger.debug(msg)
-                        print(msg)
-                    else:
-                        msg = (f"There was an error during the upload of the evidences reports to the Jira issue.\n"
-                               f"Response status code: {response.status_code}\n"
-                               f"Response result: {response.text}\n")
-                        logger.error(msg)
-                        print(Fore.RED + msg)
-        if api and Settings.PYTALOS_JIRA.get('report').get('upload_log_evidence') and self.attach_log is True:
-            files = [('file', open(LOG_PATH, 'rb'))]
-            response = requests.post(api, auth=(self.username, self.password), files=files,
-                          headers=headers, verify=False, proxies=self.proxy)
+                    if (issue, attach) not in uploads:
+                        uploads.append((issue, attach))
+
+        results = run_uploads(self._upload_attachment, uploads, self.upload_workers)
+        for result in results:
+            if result is None:
+                continue
+            if result.status_code in [200, 201]:
+                msg = "Evidence reports added to Jira Issue\n"
+                logger.debug(msg)
+                print(msg)
+            else:
+                msg = (f"There was an error during the upload of the evidences reports to the Jira issue.\n"
+                       f"Response status code: {result.status_code}\n"
+                       f"Response result: {result.text}\n")
+                logger.error(msg)
+                print(Fore.RED + msg)
+        if issue and Settings.PYTALOS_JIRA.get('report').get('upload_log_evidence') and self.attach_log is True:
+            response = self._upload_attachment((issue, LOG_PATH))
             if response.status_code in [200, 201]:
                 msg = "Log evidences uploaded\n"
                 logger.debug(msg)
@@ -218,6 +232,31 @@ class Jira:
                 print(Fore.RED + msg)
             self.attach_log = False
 
+    def _upload_attachment(self, upload):
+        """
+        Upload a file to a Jira issue, deleting before the attachment of the issue with the same name.
+        :param upload: tuple (issue, file path)
+        :return: response of the upload
+        """
+        issue, attach = upload
+        attach_name = os.path.basename(attach)
+        self._delete_attachment(issue, attach_name)
+        api = f'{self.base_url}/rest/api/2/issue/{issue}/attachments'
+        headers = {"X-Atlassian-Token": "nocheck"}
+        logger.debug(f"Adding evidence report to: {issue}")
+        with open(attach, 'rb') as attach_file:
+            response = self.session.post(api, files=[('file', (attach_name, attach_file))], headers=headers)
+        if response.status_code in [200, 201]:
+            try:
+                uploaded = response.json()
+            except ValueError:
+                uploaded = []
+            with self.attachments_lock:
+                issue_attachments = self.attachments.setdefault(issue, {})
+                for attachment in uploaded if isinstance(uploaded, list) else []:
+                    issue_attachments[attachment.get('filename')] = attachment.get('id')
+        return response
+
     @staticmethod
     def _format_feature_filename_to_html(feature_filename):
         """
@@ -230,23 +269,26 @@ class Jira:
         final_filename = f'TESTS-{feature_filename}'
         return final_filename
 
-    def _get_attachment_data(self):
+    def _get_attachment_data(self, issue):
         """
-        Get attachment data from Jira tag.
+        Get the attachments of a Jira issue by name. They are read once per issue.
+        :param issue:
         :return:
         """
+        with self.attachments_lock:
+            if issue in self.attachments:
+                return self.attachments[issue]
         headers = {"X-Atlassian-Token": "nocheck"}
-        scenario_dict = self._join_scenarios()
-        current_attachments = []
-        for scenario_tag in scenario_dict:
-            tag = self._parse_tag(scenario_tag)
-            api = f'{self.base_url}/rest/api/2/issue/{self._parse_tag(tag)}'
-            response = requests.get(api, auth=(self.username, self.password), headers=headers,
-                                    verify=False, proxies=self.proxy)
-            issues_attachments = self._get_issue_id_name_attachment(response)
-            current_attachments.append(issues_attachments)
-
-        return current_attachments
+        api = f'{self.base_url}/rest/api/2/issue/{issue}'
+        response = self.session.get(api, headers=headers, params={'fields': 'attachment'})
+        if response.status_code == 200:
+            issue_attachments = {attachment['name']: attachment['id']
+                                 for attachment in self._get_issue_id_name_attachment(response)}
+        else:
+            logger.warning(f"The attachments of the Jira issue {issue} could not be read: {response.status_code}")
+            issue_attachments = {}
+        with self.attachments_lock:
+            return self.attachments.setdefault(issue, issue_attachments)
 
     @staticmethod
     def _get_issue_id_name_attachment(response):
@@ -265,25 +307,22 @@ class Jira:
             })
         return current_attachment
 
-    def _delete_attachment(self, attachment_to_delete):
+    def _delete_attachment(self, issue, attachment_to_delete):
         """
-        Delete current attachments in issue
+        Delete current attachment in issue
+        :param issue:
         :param attachment_to_delete:
         :return:
         """
-        current_attachments = self._get_attachment_data()
-        attach_id = ""
-        for attachments in current_attachments:
-            for attachment in attachments:
-                if attachment['name'] == attachment_to_delete:
-                    attach_id = attachment['id']
+        issue_attachments = self._get_attachment_data(issue)
+        with self.attachments_lock:
+            attach_id = issue_attachments.pop(attachment_to_delete, None)
 
-        if attach_id != "":
+        if attach_id:
             headers = {"X-Atlassian-Token": "nocheck"}
             api = f'{self.base_url}/rest/api/2/attachment/{attach_id}'
             logger.debug(f'Remove Jira attachment in issue with id: {attach_id}')
-            requests.delete(api, auth=(self.username, self.password), headers=headers,
-                            verify=False, proxies=self.proxy)
+            self.session.delete(api, headers=headers)
 
     @staticmethod
     def _parse_tag(tag):
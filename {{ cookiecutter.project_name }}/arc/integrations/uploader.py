@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Upload engine shared by the integrations that send the evidences and the execution data to external servers.
+The requests are sent with a pooled session that retries the failed connections of every request and the server
+errors of the idempotent requests with backoff, and the uploads are run concurrently with a bounded number of threads.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_WORKERS = 4
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF_FACTOR = 0.5
+UPLOAD_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def get_upload_session(auth=None, proxies=None, verify=False, pool_size=UPLOAD_WORKERS, retries=UPLOAD_RETRIES,
+                       backoff_factor=UPLOAD_BACKOFF_FACTOR):
+    """
+    Return a session with a connection pool for every host that retries the requests with backoff.
+    The requests of every method are retried when the connection fails, before anything is sent to the server. The read
+    errors and the server error status are only retried for the idempotent methods (the urllib3 default), so a POST
+    that could have been processed by the server is not sent twice.
+    :param auth:
+    :param proxies:
+    :param verify:
+    :param pool_size: connections kept for every host, the number of concurrent uploads
+    :param retries:
+    :param backoff_factor:
+    :return:
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff_factor,
+                  status_forcelist=UPLOAD_RETRY_STATUS, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.auth = auth
+    session.verify = verify
+    if proxies:
+        session.proxies.update(proxies)
+    return session
+
+
+def run_uploads(function, items, workers=UPLOAD_WORKERS):
+    """
+    Call the function with every item in a thread pool and return the results in the order of the items.
+    The exceptions of an upload are logged and its result is None, so the rest of the uploads are sent.
+    :param function:
+    :param items:
+    :param workers:
+    :return:
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def upload(item):
+        try:
+            return function(item)
+        except (Exception,) as ex:
+            logger.exception(f"Error uploading {item}: {ex}")
+            return None
+
+    if workers <= 1 or len(items) == 1:
+        return [upload(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items)), thread_name_prefix='uploader') as executor:
+        return list(executor.map(upload, items))
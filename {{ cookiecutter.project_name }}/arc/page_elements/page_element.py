@@ -306,6 +306,6 @@ class PageElement(CommonObject):
         """
         from arc.core.brain.healing import init_healing
         scraper = Scraper(self.driver)
-        scraper.scraping_current_page_elements()
-        new_locator = init_healing(self.locator)
+        page_hash = scraper.scraping_current_page_elements()
+        new_locator = init_healing(self.locator, page_hash)
         return new_locator
@@ -23,7 +23,7 @@ from arc.contrib.tools.formatters import replace_chars
 from arc.reports.html.utils import get_short_name, get_doc_pdf_scenario_name, attach_html_files, attach_docx_files, \
     attach_pdf_files
 from arc.settings.settings_manager import Settings
-from arc.web.app.utils import print_portal_console
+from arc.web.app.utils import print_portal_console, flush_portal_console
 
 from arc.core.behave.template_var import replace_template_var, get_value_from_profiles, get_value_from_repositories
 from urllib3.packages import six  # noqa
@@ -37,6 +37,78 @@ from six.moves import range, zip
 logger = logging.getLogger(__name__)
 
 
+def calculate_global_results(features):
+    """
+    Calculate the following values for the global data section from the data of the features:
+    - Start time of the execution
+    - End time of the execution
+    - Features passed
+    - Features failed
+    - Total scenarios
+    - Scenarios passed
+    :param features:
+    :return:
+    """
+    global_result = {
+        "total_features": len(features),
+        "features_passed": 0,
+        "features_failed": 0,
+        "total_scenarios": 0,
+        "passed_scenarios": 0,
+        "failed_scenarios": 0,
+        "total_steps": 0,
+        "steps_passed": 0,
+        "steps_failed": 0,
+        "steps_skipped": 0,
+        "features_passed_percent": 0,
+        "features_failed_percent": 0,
+        "scenarios_passed_percent": 0,
+        "scenarios_failed_percent": 0,
+        "start_time": 0,
+        "end_time": 0
+    }
+    for idx, feature in enumerate(features):
+        if len(features) == 1:
+            global_result['start_time'] = feature.get('start_time')
+            global_result['end_time'] = feature.get('end_time')
+        elif idx == 0:
+            global_result['start_time'] = feature.get('start_time')
+        elif idx == len(features) - 1:
+            global_result['end_time'] = feature.get('end_time')
+
+        if feature.get('status') == "passed":
+            global_result['features_passed'] += 1
+        else:
+            global_result['features_failed'] += 1
+
+        global_result['total_scenarios'] += feature.get('total_scenarios')
+        global_result['passed_scenarios'] += feature.get('passed_scenarios')
+        global_result['failed_scenarios'] += feature.get('failed_scenarios')
+
+        global_result['total_steps'] += feature.get('total_steps')
+
+        global_result['steps_passed'] += feature.get('steps_passed')
+        global_result['steps_failed'] += feature.get('steps_failed')
+        global_result['steps_skipped'] += feature.get('steps_skipped')
+
+    global_result[  # noqa
+        'scenarios_passed_percent'
+    ] = "0" if global_result['passed_scenarios'] == 0 else format_decimal(
+        (global_result['passed_scenarios'] * 100) / global_result['total_scenarios'])
+
+    global_result['scenarios_failed_percent'] = "0" if global_result['failed_scenarios'] == 0 else format_decimal(
+        (global_result['failed_scenarios'] * 100) / global_result['total_scenarios'])
+
+    global_result['features_passed_percent'] = "0" if global_result['features_passed'] == 0 else format_decimal(
+        (global_result['features_passed'] * 100) / global_result['total_features']
+    )
+    global_result['features_failed_percent'] = "0" if global_result['features_failed'] == 0 else format_decimal(
+        (global_result['features_failed'] * 100) / global_result['total_features']
+    )
+
+    return global_result
+
+
 def get_json_report_args_for_parallel():
     """
     Return arguments needed in order to create the json report for parallel execution.
@@ -303,6 +375,9 @@ class CustomJSONFormatter(Formatter):
             for i in range(len(scenario.description)):
                 scenario.description[i] = replace_template_var(scenario.description[i])
             element["description"] = scenario.description
+        if getattr(scenario, 'talos_fingerprint', None):
+            # -- Incremental mode: the fingerprint is used to carry the result forward to the next executions
+            element["fingerprint"] = scenario.talos_fingerprint
 
         element['attachments'] = []
         if attach_html_files():
@@ -797,64 +872,7 @@ class CustomJSONFormatter(Formatter):
         :return:
         :rtype:
         """
-        global_result = {
-            "total_features": len(self.features_storage),
-            "features_passed": 0,
-            "features_failed": 0,
-            "total_scenarios": 0,
-            "passed_scenarios": 0,
-            "failed_scenarios": 0,
-            "total_steps": 0,
-            "steps_passed": 0,
-            "steps_failed": 0,
-            "steps_skipped": 0,
-            "features_passed_percent": 0,
-            "features_failed_percent": 0,
-            "scenarios_passed_percent": 0,
-            "scenarios_failed_percent": 0,
-            "start_time": 0,
-            "end_time": 0
-        }
-        for idx, feature in enumerate(self.features_storage):
-            if len(self.features_storage) == 1:
-                global_result['start_time'] = feature.get('start_time')
-                global_result['end_time'] = feature.get('end_time')
-            elif idx == 0:
-                global_result['start_time'] = feature.get('start_time')
-            elif idx == len(self.features_storage) - 1:
-                global_result['end_time'] = feature.get('end_time')
-
-            if feature.get('status') == "passed":
-                global_result['features_passed'] += 1
-            else:
-                global_result['features_failed'] += 1
-
-            global_result['total_scenarios'] += feature.get('total_scenarios')
-            global_result['passed_scenarios'] += feature.get('passed_scenarios')
-            global_result['failed_scenarios'] += feature.get('failed_scenarios')
-
-            global_result['total_steps'] += feature.get('total_steps')
-
-            global_result['steps_passed'] += feature.get('steps_passed')
-            global_result['steps_failed'] += feature.get('steps_failed')
-            global_result['steps_skipped'] += feature.get('steps_skipped')
-
-        global_result[  # noqa
-            'scenarios_passed_percent'
-        ] = "0" if global_result['passed_scenarios'] == 0 else format_decimal(
-            (global_result['passed_scenarios'] * 100) / global_result['total_scenarios'])
-
-        global_result['scenarios_failed_percent'] = "0" if global_result['failed_scenarios'] == 0 else format_decimal(
-            (global_result['failed_scenarios'] * 100) / global_result['total_scenarios'])
-
-        global_result['features_passed_percent'] = "0" if global_result['features_passed'] == 0 else format_decimal(
-            (global_result['features_passed'] * 100) / global_result['total_features']
-        )
-        global_result['features_failed_percent'] = "0" if global_result['features_failed'] == 0 else format_decimal(
-            (global_result['features_failed'] * 100) / global_result['total_features']
-        )
-
-        return global_result
+        return calculate_global_results(self.features_storage)
 
     def add_global_data(self):
         """
@@ -1014,6 +1032,11 @@ class CustomPortalFormatter(Formatter):
         self.reset()
         self._uri = uri
 
+    def close(self):
+        # The console lines are sent in background, the parallel workers may exit without running atexit
+        flush_portal_console()
+        super(CustomPortalFormatter, self).close()
+
     def feature(self, feature):
         self.print_tags(feature.tags, '')
         print_portal_console(u"%s: %s" % (feature.keyword, feature.name))
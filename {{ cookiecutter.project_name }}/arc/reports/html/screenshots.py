@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Background compression of the screenshots for the HTML reports.
+The screenshots are compressed to webp by a thread pool while the tests are running. Every image is saved once in the
+html/assets/imgs folder with the hash of its content as name, so the same screen captured in several steps is compressed
+only once. Every Behave process saves a manifest with the compressed image of every screenshot, and the report filters
+read the manifests instead of compressing the images again.
+"""
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PIL import Image
+
+from arc.settings.settings_manager import Settings
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOTS_WORKERS = 2
+WEBP_QUALITY = 50
+MANIFESTS_DIR = 'manifests'
+
+# Compressed image of every screenshot path and the compressed images by content hash
+COMPRESSED_SCREENSHOTS = {}
+COMPRESSED_HASHES = {}
+PENDING_SCREENSHOTS = []
+SCREENSHOTS_LOCK = threading.Lock()
+SCREENSHOTS_STATE = {'executor': None, 'manifest': None, 'manifests_loaded': False}
+
+
+def is_compression_enabled():
+    """
+    Return True if the screenshots are compressed for the HTML reports.
+    :return:
+    """
+    return bool(Settings.PYTALOS_REPORTS.get('compress_screenshot'))
+
+
+def get_images_dir():
+    """
+    Return the folder of the compressed images of the HTML reports.
+    :return:
+    """
+    return os.path.join(Settings.BASE_PATH.get(force=True), 'output', 'reports', 'html', 'assets', 'imgs')
+
+
+def get_manifests_dir():
+    """
+    Return the folder where every Behave process saves the manifest of its compressed screenshots.
+    :return:
+    """
+    return os.path.join(get_images_dir(), MANIFESTS_DIR)
+
+
+def reset_compressed_screenshots():
+    """
+    Remove the manifests of the compressed screenshots of the previous execution.
+    :return:
+    """
+    shutil.rmtree(get_manifests_dir(), ignore_errors=True)
+
+
+def _get_executor():
+    """
+    Return the thread pool of the process, created with the first screenshot.
+    :return:
+    """
+    if SCREENSHOTS_STATE['executor'] is None:
+        SCREENSHOTS_STATE['executor'] = ThreadPoolExecutor(max_workers=SCREENSHOTS_WORKERS,
+                                                           thread_name_prefix='screenshots')
+    return SCREENSHOTS_STATE['executor']
+
+
+def compress_screenshot(image_path, image_data=None):
+    """
+    Compress a screenshot in background. The content of the image can be passed to avoid reading the file again.
+    :param image_path:
+    :param image_data: bytes of the png image
+    :return:
+    """
+    if not is_compression_enabled():
+        return
+    future = _get_executor().submit(_compress_screenshot, os.path.abspath(image_path), image_data)
+    with SCREENSHOTS_LOCK:
+        PENDING_SCREENSHOTS.append(future)
+
+
+def _compress_screenshot(image_path, image_data=None):
+    """
+    Save the webp image of a screenshot if an image with the same content has not been saved yet.
+    :param image_path:
+    :param image_data:
+    :return: name of the webp image
+    """
+    if image_data is None:
+        with open(image_path, 'rb') as image_file:
+            image_data = image_file.read()
+    content_hash = hashlib.md5(image_data).hexdigest()
+    webp_name = f"{content_hash}.webp"
+
+    with SCREENSHOTS_LOCK:
+        event = COMPRESSED_HASHES.get(content_hash)
+        owner = event is None
+        if owner:
+            event = COMPRESSED_HASHES[content_hash] = threading.Event()
+
+    if owner:
+        try:
+            webp_path = os.path.join(get_images_dir(), webp_name)
+            if not os.path.exists(webp_path):
+                os.makedirs(os.path.dirname(webp_path), exist_ok=True)
+                temp_path = f"{webp_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with Image.open(io.BytesIO(image_data)) as image:
+                    image.save(temp_path, format='WEBP', quality=WEBP_QUALITY)
+                os.replace(temp_path, webp_path)
+                logger.debug(f"Screenshot compressed: {image_path} -> {webp_name}")
+        except (Exception,):
+            # The next screenshot with the same content tries to compress it again
+            with SCREENSHOTS_LOCK:
+                COMPRESSED_HASHES.pop(content_hash, None)
+            raise
+        finally:
+            event.set()
+    else:
+        event.wait()
+
+    with SCREENSHOTS_LOCK:
+        COMPRESSED_SCREENSHOTS[image_path] = webp_name
+    return webp_name
+
+
+def wait_compressed_screenshots():
+    """
+    Wait for the screenshots compressed in background and save the manifest of the process.
+    :return:
+    """
+    with SCREENSHOTS_LOCK:
+        pending = list(PENDING_SCREENSHOTS)
+        PENDING_SCREENSHOTS.clear()
+    if not pending:
+        return
+    wait(pending)
+    for future in pending:
+        if future.exception():
+            logger.warning(f"A screenshot could not be compressed: {future.exception()}")
+    save_manifest()
+
+
+def save_manifest():
+    """
+    Save the compressed image of every screenshot of the process. The file is replaced atomically.
+    :return:
+    """
+    if SCREENSHOTS_STATE['manifest'] is None:
+        SCREENSHOTS_STATE['manifest'] = os.path.join(get_manifests_dir(), f"{uuid.uuid4().hex}.json")
+    manifest_path = SCREENSHOTS_STATE['manifest']
+    with SCREENSHOTS_LOCK:
+        manifest = dict(COMPRESSED_SCREENSHOTS)
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    except OSError as ex:
+        logger.warning(f"The manifest of the compressed screenshots could not be saved: {ex}")
+
+
+def load_manifests():
+    """
+    Add the compressed screenshots of the manifests saved by all the Behave processes of the execution.
+    :return:
+    """
+    SCREENSHOTS_STATE['manifests_loaded'] = True
+    for manifest_path in glob.glob(os.path.join(get_manifests_dir(), '*.json')):
+        try:
+            with open(manifest_path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError) as ex:
+            logger.warning(f"The manifest of the compressed screenshots could not be read: {manifest_path}. {ex}")
+            continue
+        with SCREENSHOTS_LOCK:
+            for image_path, webp_name in manifest.items():
+                COMPRESSED_SCREENSHOTS.setdefault(image_path, webp_name)
+
+
+def get_compressed_screenshot(image_path):
+    """
+    Return the name of the webp image of a screenshot in the html/assets/imgs folder.
+    The screenshots not compressed in background, like the host screenshots, are compressed now.
+    :param image_path:
+    :return:
+    """
+    image_path = os.path.abspath(image_path)
+    wait_compressed_screenshots()
+    if image_path not in COMPRESSED_SCREENSHOTS and not SCREENSHOTS_STATE['manifests_loaded']:
+        load_manifests()
+    webp_name = COMPRESSED_SCREENSHOTS.get(image_path)
+    if webp_name is None or not os.path.exists(os.path.join(get_images_dir(), webp_name)):
+        webp_name = _compress_screenshot(image_path)
+    return webp_name
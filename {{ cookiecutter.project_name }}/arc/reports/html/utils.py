@@ -7,11 +7,11 @@ import datetime
 import logging
 import os
 import jinja2.runtime
-from PIL import Image
 import xml.dom.minidom
 import json
 
 from arc.contrib.tools.formatters import replace_chars
+from arc.reports.html.screenshots import get_compressed_screenshot
 from arc.settings.settings_manager import Settings
 
 logger = logging.getLogger(__name__)
@@ -107,17 +107,17 @@ def get_base64_image_by_path(image_path):
 
 def transform_image_to_webp(image_path):
     """
-    Transform any image to webp, saves it in the html/assets/img folder and return the path to the image.
+    Return the path to the webp image of a screenshot in the html/assets/img folder.
+    The screenshots are compressed in background while the tests are running.
     :param image_path:
     """
-    img = Image.open(image_path)
-    img_name = img.filename.split(os.sep)[-1].replace('.png', '')
-    logger.debug(f"Converting image to webp: {img_name}")
+    img_name = os.path.basename(image_path).replace('.png', '')
     if Settings.PYTALOS_REPORTS.get('compress_screenshot'):
-        img.save(f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/assets/imgs/{img_name}.webp", quality=50)
-        return f"./assets/imgs/{img_name}.webp"
+        webp_name = get_compressed_screenshot(image_path)
+        logger.debug(f"Webp image of {img_name}: {webp_name}")
+        return f"./assets/imgs/{webp_name}"
     else:
-        images_folder = img.filename.split(os.sep)[-2]
+        images_folder = os.path.basename(os.path.dirname(image_path))
         if images_folder == 'screenshots':
             return f"../../screenshots/{img_name}.png"
         else:
@@ -126,17 +126,17 @@ def transform_image_to_webp(image_path):
 
 def transform_accessibility_image_to_webp(image_path):
     """
-    Transform any image to webp, saves it in the html/assets/img folder and return the path to the image.
+    Return the path to the webp image of a screenshot in the html/assets/img folder.
+    The screenshots are compressed in background while the tests are running.
     :param image_path:
     """
-    img = Image.open(image_path)
-    img_name = img.filename.split(os.sep)[-1].replace('.png', '')
-    logger.debug(f"Converting image to webp: {img_name}")
+    img_name = os.path.basename(image_path).replace('.png', '')
     if Settings.PYTALOS_REPORTS.get('compress_screenshot'):
-        img.save(f"{Settings.BASE_PATH.get(force=True)}/output/reports/html/assets/imgs/{img_name}.webp", quality=50)
-        return f"../../html/assets/imgs/{img_name}.webp"
+        webp_name = get_compressed_screenshot(image_path)
+        logger.debug(f"Webp image of {img_name}: {webp_name}")
+        return f"../../html/assets/imgs/{webp_name}"
     else:
-        images_folder = img.filename.split(os.sep)[-2]
+        images_folder = os.path.basename(os.path.dirname(image_path))
         return f"../../../screenshots/{images_folder}/{img_name}.png"
 
 
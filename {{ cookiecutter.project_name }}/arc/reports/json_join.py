@@ -6,6 +6,8 @@ import datetime
 import json
 import logging
 import os
+import re
+import tempfile
 
 from arc.core.behave.env_utils import format_decimal
 from arc.core.behave.parallel import ENVIRONMENTS, BROWSERS, MULTI_BROWSERS_SCENARIOS
@@ -14,88 +16,192 @@ from arc import __VERSION__
 logger = logging.getLogger(__name__)
 
 JSONS_PATH = Settings.REPORTS_PATH.get(force=True) + os.sep
+READ_CHUNK_SIZE = 1024 * 1024
+# Key of the global data written by the json formatter after the list of features. The global data also contains
+# "keyword": "global_data", so the key is found by the end of the list of features before it
+GLOBAL_DATA_KEY = re.compile(r'\]\s*,\s*("global_data"\s*:)')
 
 
-def get_reports():
+def get_report_files():
     """
-    Gets and parses all generated json reports.
+    Return the paths of the json reports generated by the parallel workers.
     :return:
     """
-    jsons = []
-    for file_name in [file for file in os.listdir(JSONS_PATH) if file.endswith('.json')]:
-        logger.debug(f'Reading and retrieving data from the json report: {file_name}')
-        with open(JSONS_PATH + file_name, encoding='utf8') as json_file:
-            data = json.load(json_file)
-            jsons.append(data)
-
-    logger.debug(f"Unifying json reports for parallel executions: {os.environ['PARALLEL_TYPE']}")
-    if os.environ['PARALLEL_TYPE'] in [BROWSERS, MULTI_BROWSERS_SCENARIOS]:
-        for _json in jsons:
-            for feature in _json['features']:
-                feature['name'] += f" - {feature['config_environment'].upper()}"
-                for scenario in feature['elements']:
-                    scenario['name'] += f" - {feature['config_environment'].upper()}"
-    if os.environ['PARALLEL_TYPE'] == ENVIRONMENTS:
-        for _json in jsons:
-            for feature in _json['features']:
-                feature['name'] += f" - {_json['global_data']['environment'].upper()}"
-                for scenario in feature['elements']:
-                    scenario['name'] += f" - {_json['global_data']['environment'].upper()}"
-
-    return jsons
-
-
-def insert_scenarios(json_feature, scenario, scenario_name):
+    return [JSONS_PATH + file for file in sorted(os.listdir(JSONS_PATH)) if file.endswith('.json')]
+
+
+def read_report_footer(file_path):
     """
-    Insert scenarios from json reports.
-    :param json_feature:
-    :param scenario:
-    :param scenario_name:
+    Read the global data and octane data written at the end of a json report without reading the features.
+    Return None if the file does not end with the footer of the json formatter.
+    The footer starts with the last "global_data" key after the end of the list of features that can be decoded.
+    :param file_path:
+    :return:
+    """
+    with open(file_path, 'rb') as json_file:
+        file_size = json_file.seek(0, os.SEEK_END)
+        size = READ_CHUNK_SIZE
+        while True:
+            json_file.seek(max(0, file_size - size))
+            text = json_file.read().decode('utf8', errors='ignore')
+            for match in reversed(list(GLOBAL_DATA_KEY.finditer(text))):
+                try:
+                    return json.loads('{' + text[match.start(1):])
+                except json.JSONDecodeError:
+                    continue
+            if size >= file_size:
+                return None
+            size *= 2
+
+
+def iter_report_features(file_path):
+    """
+    Read the features of a json report one by one, so only one feature is in memory at a time.
+    :param file_path:
+    :return:
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, encoding='utf8') as json_file:
+        buffer = json_file.read(READ_CHUNK_SIZE)
+        eof = False
+        position = buffer.find('"features"')
+        if position != -1:
+            position = buffer.find('[', position)
+        if position == -1:
+            raise ValueError(f"The json report {file_path} does not contain features")
+        position += 1
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                if eof:
+                    return
+                buffer = json_file.read(READ_CHUNK_SIZE)
+                position = 0
+                eof = not buffer
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                feature, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The feature is not complete in the buffer, read at least as much as the buffer to read it again
+                more = json_file.read(max(READ_CHUNK_SIZE, len(buffer) - position))
+                eof = not more
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+            yield feature
+            buffer = buffer[end:]
+            position = 0
+
+
+def read_report(file_path):
+    """
+    Return the global data of a json report and an iterator of its features. The reports that are not written by
+    the json formatter are loaded completely.
+    :param file_path:
     :return:
     """
-    insert = True
-    for json_scenario in json_feature['elements']:
-        if json_scenario['name'] == scenario_name:
-            insert = False
-    if insert:
-        json_feature['elements'].append(scenario)
+    logger.debug(f'Reading and retrieving data from the json report: {file_path}')
+    footer = read_report_footer(file_path)
+    if footer is not None:
+        return footer, iter_report_features(file_path)
+    with open(file_path, encoding='utf8') as json_file:
+        data = json.load(json_file)
+    return data, iter(data['features'])
 
 
-def unify_scenarios(report_json, feature, feature_name):
+def rename_feature(feature, report_data):
     """
-    Unify scenarios between json reports.
-    :param report_json:
+    Add the browser or the environment to the feature and scenario names, so the executions are not unified.
     :param feature:
-    :param feature_name:
+    :param report_data:
     :return:
     """
-    for scenario in feature['elements']:
-        if scenario['keyword'] != 'Background':
-            scenario_name = scenario['name']
-            for json_feature in report_json['features']:
-                if json_feature['name'] == feature_name:
-                    insert_scenarios(json_feature, scenario, scenario_name)
+    suffix = None
+    if os.environ['PARALLEL_TYPE'] in [BROWSERS, MULTI_BROWSERS_SCENARIOS]:
+        suffix = f" - {feature['config_environment'].upper()}"
+    elif os.environ['PARALLEL_TYPE'] == ENVIRONMENTS:
+        suffix = f" - {report_data['global_data']['environment'].upper()}"
+    if suffix:
+        feature['name'] += suffix
+        for scenario in feature.get('elements', []):
+            scenario['name'] += suffix
 
 
-def unify_reports(json_data, report_json):
+class ReportMerger:
     """
-    Unify json reports.
-    :param json_data:
-    :param report_json:
-    :return:
+    Unify the features of the json reports. The features are indexed by name and the scenarios of every feature
+    by name, and the scenarios are appended to a temporary file, so only the data of the current feature is in memory.
+    The first feature with a name keeps all its scenarios, the next ones add the scenarios with new names.
     """
-    features_names = []
-    for data in json_data:
-        features = data['features']
-        for feature in features:
-            feature_name = feature['name']
-            if feature_name not in features_names:
-                features_names.append(feature_name)
-                report_json['features'].append(feature)
-            else:
-                unify_scenarios(report_json, feature, feature_name)
 
-    return report_json
+    def __init__(self, spool_file):
+        self.spool_file = spool_file
+        self.features = {}
+
+    def add_feature(self, feature):
+        """
+        Add a feature of a json report.
+        :param feature:
+        :return:
+        """
+        scenarios = feature.get('elements', [])
+        merged = self.features.get(feature['name'])
+        first = merged is None
+        if first:
+            feature['elements'] = None
+            merged = {'feature': feature, 'scenarios': [], 'scenario_names': set(),
+                      'results': new_feature_results()}
+            self.features[feature['name']] = merged
+
+        for scenario in scenarios:
+            if not first and (scenario['keyword'] == 'Background' or scenario['name'] in merged['scenario_names']):
+                continue
+            merged['scenario_names'].add(scenario['name'])
+            add_scenario_results(merged['results'], scenario)
+            data = json.dumps(scenario, ensure_ascii=False).encode('utf8')
+            merged['scenarios'].append((self.spool_file.tell(), len(data)))
+            self.spool_file.write(data)
+
+    def write_features(self, stream):
+        """
+        Write the unified features as the items of a json list.
+        :param stream:
+        :return:
+        """
+        for index, merged in enumerate(self.features.values()):
+            if index:
+                stream.write(', ')
+            feature = merged['feature']
+            set_feature_results(feature, merged['results'])
+            stream.write('{')
+            for key_index, (key, value) in enumerate(feature.items()):
+                stream.write(f"{', ' if key_index else ''}{json.dumps(key)}: ")
+                if key == 'elements':
+                    self.write_scenarios(stream, merged['scenarios'])
+                else:
+                    stream.write(json.dumps(value, ensure_ascii=False))
+            stream.write('}')
+
+    def write_scenarios(self, stream, scenarios):
+        """
+        Copy the scenarios of a feature from the temporary file as a json list.
+        :param stream:
+        :param scenarios: list of positions and sizes of the scenarios in the temporary file
+        :return:
+        """
+        stream.write('[')
+        for index, (position, size) in enumerate(scenarios):
+            if index:
+                stream.write(', ')
+            self.spool_file.seek(position)
+            stream.write(self.spool_file.read(size).decode('utf8'))
+        stream.write(']')
+        self.spool_file.seek(0, os.SEEK_END)
 
 
 def match_steps_data(scenario, steps_passed, steps_failed, steps_skipped, duration):
@@ -144,68 +250,83 @@ def match_scenario_data(scenario, passed_scenarios, failed_scenarios, total_step
     return passed_scenarios, failed_scenarios, total_steps
 
 
-def match_results(report_json):
+def new_feature_results():
     """
-    Match result data.
-    :param report_json:
+    Return the counters of the results of a feature.
     :return:
     """
-    for feature in report_json['features']:
-        total_scenarios = len(feature['elements'])
-        feature['total_scenarios'] = total_scenarios
+    return {'total_scenarios': 0, 'passed_scenarios': 0, 'failed_scenarios': 0, 'total_steps': 0,
+            'steps_passed': 0, 'steps_failed': 0, 'steps_skipped': 0, 'duration': 0}
 
-        passed_scenarios = 0
-        failed_scenarios = 0
-        total_steps = 0
-        steps_passed = 0
-        steps_failed = 0
-        steps_skipped = 0
-        duration = 0
 
-        for scenario in feature['elements']:
-            passed_scenarios, failed_scenarios, total_steps = match_scenario_data(
-                scenario, passed_scenarios, failed_scenarios, total_steps
-            )
+def add_scenario_results(results, scenario):
+    """
+    Add the results of a scenario to the counters of its feature.
+    :param results:
+    :param scenario:
+    :return:
+    """
+    results['total_scenarios'] += 1
+    results['passed_scenarios'], results['failed_scenarios'], results['total_steps'] = match_scenario_data(
+        scenario, results['passed_scenarios'], results['failed_scenarios'], results['total_steps']
+    )
+    results['steps_passed'], results['steps_failed'], results['steps_skipped'], results['duration'] = \
+        match_steps_data(scenario, results['steps_passed'], results['steps_failed'], results['steps_skipped'],
+                         results['duration'])
 
-            steps_passed, steps_failed, steps_skipped, duration = match_steps_data(
-                scenario, steps_passed, steps_failed, steps_skipped, duration
-            )
 
-        feature['passed_scenarios'] = passed_scenarios
-        feature['failed_scenarios'] = failed_scenarios
+def set_feature_results(feature, results):
+    """
+    Set the result data of a feature from the counters of its scenarios.
+    :param feature:
+    :param results:
+    :return:
+    """
+    total_scenarios = results['total_scenarios']
+    passed_scenarios = results['passed_scenarios']
+    failed_scenarios = results['failed_scenarios']
+    total_steps = results['total_steps']
+    steps_passed = results['steps_passed']
+    steps_failed = results['steps_failed']
+    steps_skipped = results['steps_skipped']
+    duration = results['duration']
 
-        feature['total_steps'] = total_steps
-        feature['steps_passed'] = steps_passed
-        feature['steps_failed'] = steps_failed
-        feature['steps_skipped'] = steps_skipped
+    feature['total_scenarios'] = total_scenarios
+    feature['passed_scenarios'] = passed_scenarios
+    feature['failed_scenarios'] = failed_scenarios
 
-        scenarios_passed_percent = f"{0 if passed_scenarios == 0 else (passed_scenarios * 100) / total_scenarios:.2f}"
-        scenarios_failed_percent = f"{0 if failed_scenarios == 0 else (failed_scenarios * 100) / total_scenarios:.2f}"
+    feature['total_steps'] = total_steps
+    feature['steps_passed'] = steps_passed
+    feature['steps_failed'] = steps_failed
+    feature['steps_skipped'] = steps_skipped
 
-        feature['scenarios_passed_percent'] = scenarios_passed_percent
-        feature['scenarios_failed_percent'] = scenarios_failed_percent
+    scenarios_passed_percent = f"{0 if passed_scenarios == 0 else (passed_scenarios * 100) / total_scenarios:.2f}"
+    scenarios_failed_percent = f"{0 if failed_scenarios == 0 else (failed_scenarios * 100) / total_scenarios:.2f}"
 
-        feature['steps_passed_percent'] = f"{0 if steps_passed == 0 else (steps_passed * 100) / total_steps:.2f}"
-        feature['steps_failed_percent'] = f"{0 if steps_failed == 0 else (steps_failed * 100) / total_steps:.2f}"
-        feature['steps_skipped_percent'] = f"{0 if steps_skipped == 0 else (steps_skipped * 100) / total_steps:.2f}"
+    feature['scenarios_passed_percent'] = scenarios_passed_percent
+    feature['scenarios_failed_percent'] = scenarios_failed_percent
 
-        feature['end_time'] = feature['start_time'] + duration
-        feature['duration'] = duration
-        feature['total_scenarios'] = total_scenarios
+    feature['steps_passed_percent'] = f"{0 if steps_passed == 0 else (steps_passed * 100) / total_steps:.2f}"
+    feature['steps_failed_percent'] = f"{0 if steps_failed == 0 else (steps_failed * 100) / total_steps:.2f}"
+    feature['steps_skipped_percent'] = f"{0 if steps_skipped == 0 else (steps_skipped * 100) / total_steps:.2f}"
 
-    return report_json
+    feature['end_time'] = feature['start_time'] + duration
+    feature['duration'] = duration
 
 
-def dump_json(report_json):
+def match_results(report_json):
     """
-    Generate final json report
+    Match result data.
     :param report_json:
     :return:
     """
-    path = JSONS_PATH + 'talos_report.json'
-    with open(path, 'w', encoding='utf8') as fp:
-        json.dump(report_json, fp, indent=4, ensure_ascii=False)
-        logger.debug(f"Talos json report unified in: {path}")
+    for feature in report_json['features']:
+        results = new_feature_results()
+        for scenario in feature['elements']:
+            add_scenario_results(results, scenario)
+        set_feature_results(feature, results)
+
+    return report_json
 
 
 def match_global_results(json_list):
@@ -285,14 +406,26 @@ def match_global_results(json_list):
 def join_json_reports():
     """
     Join json data reports.
+    The reports are read feature by feature and the final report is written incrementally.
     :return:
     """
     try:
-        json_list = get_reports()
-        final_results = match_global_results(json_list)
-        _json = {
-            'features': [],
-            "global_data": {
+        report_files = get_report_files()
+        logger.debug(f"Unifying json reports for parallel executions: {os.environ['PARALLEL_TYPE']}")
+        path = JSONS_PATH + 'talos_report.json'
+        with tempfile.TemporaryFile(dir=JSONS_PATH) as spool_file:
+            merger = ReportMerger(spool_file)
+            reports_data = []
+            for file_path in report_files:
+                report_data, features = read_report(file_path)
+                # Only the results of the global data are needed to match the global results
+                reports_data.append({'global_data': {'results': report_data['global_data']['results']}})
+                for feature in features:
+                    rename_feature(feature, report_data)
+                    merger.add_feature(feature)
+
+            final_results = match_global_results(reports_data)
+            global_data = {
                 "keyword": "global_data",
                 "date": datetime.datetime.now().strftime('%Y/%m/%d'),
                 'application': Settings.PROJECT_INFO.get('application'),
@@ -302,8 +435,8 @@ def join_json_reports():
                 'user_code': Settings.PROJECT_INFO.get('user_code'),
                 'version': __VERSION__,
                 'results': final_results
-            },
-            'octane': {
+            }
+            octane = {
                 'server': Settings.PYTALOS_OCTANE.get('server'),
                 'username': Settings.PROJECT_INFO.get('user_code'),
                 'clientid': Settings.PYTALOS_OCTANE.get('client_id'),
@@ -311,10 +444,15 @@ def join_json_reports():
                 'sharedspace': Settings.PYTALOS_OCTANE.get('shared_space'),
                 'workspace': Settings.PYTALOS_OCTANE.get('workspace')
             }
-        }
-        _json = unify_reports(json_list, _json)
-        _json = match_results(_json)
-        dump_json(_json)
+
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf8') as fp:
+                fp.write('{"features": [')
+                merger.write_features(fp)
+                fp.write(f'], "global_data": {json.dumps(global_data, ensure_ascii=False)}, '
+                         f'"octane": {json.dumps(octane, ensure_ascii=False)}}}\n')
+            os.replace(temp_path, path)
+            logger.debug(f"Talos json report unified in: {path}")
     except FileNotFoundError as ex:
         logger.warning('The json report files have not been generated in order to generate the general report json.')
         logger.warning(ex)
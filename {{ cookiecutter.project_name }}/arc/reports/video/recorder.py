@@ -1,8 +1,10 @@
 """
 Module for generating video reports of the executed scenarios
 """
+import hashlib
 import logging
 import os
+import queue
 import threading
 from datetime import timedelta
 from io import BytesIO
@@ -28,6 +30,12 @@ except ModuleNotFoundError:
         raise TalosNotThirdPartyAppInstalled(msg)
 
 
+# Maximum number of captured frames waiting to be encoded, the capture waits for the encoder when it is full
+FRAMES_QUEUE_SIZE = 10
+# Seconds waiting for a free place in the queue before checking if the encoder is still running
+FRAMES_PUT_TIMEOUT = 1
+
+
 class Recorder:
 
     def __init__(self, **kwargs):
@@ -36,48 +44,65 @@ class Recorder:
         self.video_format = kwargs.get("video_format", "mp4")
         self.fps = int(kwargs.get("fps", 5))
         self.record = False
-        self.frames = []
+        self.frames_queue = None
         self.recorder_thread = None
+        self.encoder_thread = None
+        self.stop_event = threading.Event()
 
     def stop_recording(self):
         """
-            Stops the recorder and creates the video
+            Stops the recorder and waits until the video is created
         """
         if self.record:
             self.record = False
+            self.stop_event.set()
             self.recorder_thread.join()
-            output_file = f"{self.file_name}.{self.video_format}"
-            if hasattr(self, "frames"):
-                self.write_frame_list_to_video_file(self.frames, output_file=output_file)
-                self.validate_video_creation(output_file)
-                delattr(self, "frames")
+            self.__put_frame(self.frames_queue, None)
+            self.encoder_thread.join()
+            self.validate_video_creation(f"{self.file_name}.{self.video_format}")
 
     def record_screen(self):
         """
             Begins screen recording utilizing attributes set on initialisation.
+            The screenshots are captured at the fps rate in a thread and encoded in the video in another one.
         """
         if self.driver is not None:
             logger.debug("Starting recording process...")
             self.record = True
+            self.stop_event.clear()
+            self.frames_queue = queue.Queue(maxsize=FRAMES_QUEUE_SIZE)
+            self.encoder_thread = threading.Thread(
+                target=self.__encode_function,
+                name="Screen Recorder Encoder",
+                args=[self.frames_queue, f"{self.file_name}.{self.video_format}"]
+            )
+            self.encoder_thread.start()
             self.recorder_thread = threading.Thread(
                 target=self.__record_function,
                 name="Screen Recorder",
-                args=[self.frames]
+                args=[self.frames_queue]
             )
             self.recorder_thread.start()
 
         else:
             logger.warning("Driver needs to be used as parameter")
 
-    def __record_function(self, frames):
+    def __record_function(self, frames_queue):
         """
-            Private method triggered within an individual thread to handle screen recording separately
-        :param frames: List acting as a container for byte strings representing screenshots
-        :return: List of generated frames
+            Private method triggered within an individual thread to handle screen recording separately.
+            A screenshot is captured for every frame of the video. The screenshots equal to the previous one are
+            not sent to the encoder, only the number of frames it must be repeated.
+        :param frames_queue: Queue of tuples (screenshot bytes or None to repeat the previous one, number of frames)
+        :return: Number of frames captured
         """
+        frame_interval = 1 / self.fps
         # ignore blank frames on startup before window is loaded
-        while not self.driver.current_url or self.driver.current_url == "data:,":
-            pass
+        while self.record and self.__is_blank_page():
+            self.stop_event.wait(frame_interval)
+
+        start = default_timer()
+        frames = 0
+        last_hash = None
         while self.record:
             img = None
             try:
@@ -86,13 +111,118 @@ class Recorder:
                 logger.debug(ex)
                 message = f'Driver session ended: {ex}'
                 logger.debug(message)
+            if img is None:
+                self.stop_event.wait(frame_interval)
+                continue
 
-            if img is not None:
-                frames.append(img)
+            # The screenshot fills the frames of the time elapsed since the previous one
+            current_frame = int((default_timer() - start) * self.fps) + 1
+            img_hash = hashlib.md5(img).digest()
+            if img_hash != last_hash:
+                item = (img, current_frame - frames)
+                last_hash = img_hash
+            else:
+                item = (None, current_frame - frames)
+            if not self.__put_frame(frames_queue, item):
+                logger.debug("The video encoder is not running, the recording is stopped")
+                break
+            frames = current_frame
+            self.stop_event.wait(max(0.0, start + frames * frame_interval - default_timer()))
 
         logger.debug("Recording finished...")
         return frames
 
+    def __put_frame(self, frames_queue, item):
+        """
+            Sends an item to the encoder, waiting while the queue is full and the encoder is running
+        :param frames_queue: Queue of the frames of the encoder
+        :param item: Tuple of the frame or None when the recording ends
+        :return: False if the encoder is not running
+        """
+        while self.encoder_thread.is_alive():
+            try:
+                frames_queue.put(item, timeout=FRAMES_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __is_blank_page(self):
+        """
+            Returns True if the browser window has not loaded a page yet
+        :return:
+        """
+        try:
+            current_url = self.driver.current_url
+        except (InvalidSessionIdException, NewConnectionError, MaxRetryError) as ex:
+            logger.debug(ex)
+            return False
+        return not current_url or current_url == "data:,"
+
+    def __encode_function(self, frames_queue, output_file):
+        """
+            Private method triggered within an individual thread to encode the frames as they are captured
+        :param frames_queue: Queue of tuples (screenshot bytes or None to repeat the previous one, number of frames),
+            None when the recording ends
+        :param output_file: String representing filename of output - mp4/avi
+        :return: None
+        """
+        out = None
+        video_size = None
+        img_obj = None
+        start = default_timer()
+        try:
+            while True:
+                item = frames_queue.get()
+                if item is None:
+                    break
+                frame, repeat = item
+                if frame is not None:
+                    try:
+                        img_obj = cv2.cvtColor(np.array(Image.open(BytesIO(frame)).convert('RGB')),  # noqa
+                                               cv2.COLOR_RGB2BGR)  # noqa
+                    except (Exception,) as ex:
+                        logger.error(f"Unable to create Image from bytes: {ex}")
+                        continue
+                    if out is None:
+                        video_size = (img_obj.shape[1], img_obj.shape[0])
+                        out = self.get_video_writer(output_file, *video_size)
+                    elif (img_obj.shape[1], img_obj.shape[0]) != video_size:
+                        img_obj = cv2.resize(img_obj, video_size)  # noqa
+                if img_obj is not None:
+                    for _ in range(repeat):
+                        out.write(img_obj)
+        except (Exception,) as ex:
+            # The thread ends, the recorder stops capturing when it sees the encoder is not running
+            logger.error(f"The video could not be encoded: {ex}")
+        finally:
+            if out is not None:
+                out.release()
+                cv2.destroyAllWindows()  # noqa
+                end = default_timer()
+                logger.debug(f"Video compilation complete - Duration: {str(timedelta(seconds=end - start))}")
+            else:
+                logger.warning("Could not determine video resolution, the video has not been created")
+
+    def get_video_writer(self, output_file, width, height):
+        """
+            Returns the video writer of the output file for the video format
+        :param output_file: String representing filename of output - mp4/avi
+        :param width: Int representing width of video
+        :param height: Int representing height of video
+        :return:
+        """
+        video_format = self.video_format
+        if video_format.lower() == "mp4":
+            video_format += "v"
+        elif video_format.lower() == "avi":
+            video_format = "divx"
+
+        if os.path.exists(output_file):
+            logger.debug(f"File '{output_file}' already exists, and will be overwritten.")
+        return cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*video_format.lower()), self.fps,  # noqa
+                               (width, height))
+
     def write_frame_list_to_video_file(self, frames, height=None, width=None, output_file=None, overwrite=True):
         """
             Writes a list of image data in Bytes to video file
@@ -112,22 +242,12 @@ class Recorder:
                 logger.warning("Could not determine video resolution, exiting function...")
                 return None
 
-        video_format = self.video_format
-        if video_format.lower() == "mp4":
-            video_format += "v"
-        elif video_format.lower() == "avi":
-            video_format = "divx"
-
-        if os.path.exists(output_file):
-            if overwrite:
-                logger.debug(f"File '{output_file}' already exists, and will be overwritten.")
-            else:
-                logger.debug(f"File '{output_file}' already exists, and will NOT be overwritten, exiting function.")
-                return None
+        if os.path.exists(output_file) and not overwrite:
+            logger.debug(f"File '{output_file}' already exists, and will NOT be overwritten, exiting function.")
+            return None
 
         start = default_timer()
-        out = cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*video_format.lower()), self.fps, # noqa
-                              (width, height))
+        out = self.get_video_writer(output_file, width, height)
         for frame in frames:
             try:
                 img_obj = cv2.cvtColor(np.array(Image.open(BytesIO(frame))), cv2.COLOR_RGB2BGR)  # noqa
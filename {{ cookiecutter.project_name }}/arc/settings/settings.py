@@ -97,6 +97,16 @@ PYTALOS_RUN = {
         'enabled': False,
         'proxy': PROXY
     },
+    'parallel': {  # parallel execution options
+        'scheduler': 'static',  # static or dynamic (workers pull the scenarios one by one, the longest first)
+        'warm_workers': False,  # worker processes load the hooks and steps once and reuse them for all their jobs
+    },
+    'incremental': {  # incremental execution options
+        'enabled': False,  # not to run the scenarios that passed in a previous execution and have not changed
+        # A scenario changes with its gherkin text, the python files of its steps, the python files of arc and
+        # test/helpers, the files of the repositories folder, the profiles and the userdata. Not covered: the steps
+        # of other files run with execute_steps, the settings, the resources of test/helpers and the external systems
+    },
 
 }
 
@@ -117,6 +127,7 @@ PYTALOS_REPORTS = {
     'include_sub_steps_in_results': False,
     'reports_language': 'en_US',  # language of the reports, allowed en_US and es_ES
     'generate_html': True,  # generates html report
+    'html_report_processes': 0,  # processes used to render the html report pages, 0 uses the number of CPUs
     'generate_docx': False,  # generates docx file report
     'generate_pdf': False,  # Warning: PDF generation can be slow, including them in pipelines is not recommended
     'generate_simple_html': False,  # generates simple html report
@@ -145,7 +156,9 @@ PYTALOS_PROFILES = {
     'master_file': 'master',  # choose master file
     'locale_fake_data': 'en_US',  # set the language of the faker wrapper
     'language': 'en',  # repository files language
-    'repositories': False  # activation of data repositories
+    'repositories': False,  # activation of data repositories
+    'lazy_load': True,  # load every profile file the first time its data is used
+    'files_cache': True,  # save the parsed profile files in .cache/profiles, they are parsed again only if changed
 }
 
 # Step catalog configurations
@@ -231,6 +244,7 @@ PYTALOS_JIRA = {
         'upload_pdf_evidence': False,
         'upload_log_evidence': False
     },
+    'upload_workers': 4,  # number of evidences uploaded at the same time
     'connection_proxy': {  # proxy configuration
         'enabled': False,
         'proxy': PROXY
@@ -254,7 +268,8 @@ PYTALOS_WEB = {
     'debug': False,  # true for activate portal debug
     'port': 5000,  # portal port
     "create_database": False,  # true to create the portal database.
-    'save_metrics': False  # true to store run metrics in database
+    'save_metrics': False,  # true to store run metrics in database
+    'bulk_save_metrics': True  # store the run metrics with one insert per table and one commit
 }
 
 """ Behave configurations """
@@ -317,10 +332,18 @@ ORACLE = {
     'client_path': ''  # Oracle client path
 }
 
+# Connections and results of the database control classes
+DATABASES = {
+    'pool_connections': True,  # reuse the connection of the same database and user in every scenario
+    'fetch_size': 1000,  # rows fetched from the database in every round trip
+    'batch_size': 1000  # rows sent to the database in every executemany
+}
+
 TALOS_VIRTUAL = {
     "general": {
         'url': "localhost",
-        'input_path': ''
+        'input_path': '',
+        'engine': "mountebank"  # mountebank or native, the native engine runs the imposters once per execution
     },
     "mountebank": {
         "enabled": False,
@@ -343,7 +366,8 @@ VISUAL_TESTING = {
     'include_passed_tests': False,  # True if you want to include the passed tests in the json and html report.
     'baseline_name': '{Driver_type}',
     'baseline_dir': os.path.join(HELPERS_PATH, 'resources/baseline'),
-    'clean_baseline_dir': False
+    'clean_baseline_dir': False,
+    'pixel_tolerance': 0,  # maximum luminance difference (0-255) of two pixels considered equal in the comparisons
 }
 
 PYTALOS_IA = {
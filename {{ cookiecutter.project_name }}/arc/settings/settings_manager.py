@@ -1,3 +1,39 @@
+from copy import deepcopy
+
+# Types returned without copy by the get method, the other values are copied to avoid changes in the settings
+IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+# Settings modules imported once, the user settings module is None until it can be imported
+SETTINGS_MODULES = {'pytalos': None, 'user': None}
+
+# Values already resolved by the get method. It is cleared every time a setting is set
+SETTINGS_CACHE = {}
+
+
+def get_settings_modules():
+    """
+    Return the arc settings module and the user settings module, or None if the user settings can not be imported.
+    :return:
+    """
+    if SETTINGS_MODULES['pytalos'] is None:
+        from arc.settings import settings as pytalos_settings
+        SETTINGS_MODULES['pytalos'] = pytalos_settings
+    if SETTINGS_MODULES['user'] is None:
+        try:
+            from settings import settings as user_settings
+            SETTINGS_MODULES['user'] = user_settings
+        except (ModuleNotFoundError, ImportError):
+            pass
+    return SETTINGS_MODULES['pytalos'], SETTINGS_MODULES['user']
+
+
+def clear_settings_cache():
+    """
+    Remove the resolved values of the settings. Use it if the settings modules are modified without the set method.
+    :return:
+    """
+    SETTINGS_CACHE.clear()
+
 
 class ManagerSettings(object):
     """
@@ -18,7 +54,19 @@ class ManagerSettings(object):
         :param default:
         :return:
         """
-        return self._get_setting_value_or_default(self.name, options, force, default)
+        key = (self.name, options, force, default)
+        try:
+            value = SETTINGS_CACHE[key]
+        except KeyError:
+            value = self._get_setting_value_or_default(self.name, options, force, default)
+            SETTINGS_CACHE[key] = value
+        except TypeError:
+            # Not hashable default value
+            value = self._get_setting_value_or_default(self.name, options, force, default)
+
+        if isinstance(value, IMMUTABLE_TYPES):
+            return value
+        return deepcopy(value)
 
     def set(self, options, value, force=False):
         """
@@ -29,6 +77,7 @@ class ManagerSettings(object):
         :param force:
         :return:
         """
+        clear_settings_cache()
         variable = self._get_setting_variable_or_default(self.name, force=force)
         self._set_setting_value(variable, options, value)
 
@@ -57,10 +106,9 @@ class ManagerSettings(object):
         :param value:
         :return:
         """
-        from arc.settings import settings as pytalos_settings
-        try:
-            from settings import settings as user_settings
-        except (ModuleNotFoundError, ImportError):
+        clear_settings_cache()
+        pytalos_settings, user_settings = get_settings_modules()
+        if user_settings is None:
             return getattr(pytalos_settings, variable)
 
         if force:
@@ -78,14 +126,9 @@ class ManagerSettings(object):
         :param force:
         :return:
         """
-        from arc.settings import settings as pytalos_settings
-
-        if force:
-            return getattr(pytalos_settings, variable)
+        pytalos_settings, user_settings = get_settings_modules()
 
-        try:
-            from settings import settings as user_settings
-        except (ModuleNotFoundError, ImportError):
+        if force or user_settings is None:
             return getattr(pytalos_settings, variable)
 
         if hasattr(user_settings, variable):
@@ -97,6 +140,7 @@ class ManagerSettings(object):
     def _get_setting_value_or_default(self, variable, option, force=False, default=False):
         """
         Get the value of a configuration by passing the variable name and the path to the option separated by dots.
+        The value is not copied, the get method copies it if needed.
         :param variable:
         :param option:
         :param force:
@@ -104,8 +148,7 @@ class ManagerSettings(object):
         :return:
         """
         variable = self._get_setting_variable_or_default(variable, force)
-        from copy import deepcopy
-        variable_axu = deepcopy(variable)
+        variable_axu = variable
         if variable and option:
             options = option.split('.')
             for op in options:
@@ -198,6 +241,7 @@ class Settings(object):
     BEHAVE = ManagerSettings("BEHAVE")
     SQLITE = ManagerSettings("SQLITE")
     ORACLE = ManagerSettings("ORACLE")
+    DATABASES = ManagerSettings("DATABASES")
     TALOS_VIRTUAL = ManagerSettings("TALOS_VIRTUAL")
     VISUAL_TESTING = ManagerSettings("VISUAL_TESTING")
     PYTALOS_IA = ManagerSettings("PYTALOS_IA")
\ No newline at end of file
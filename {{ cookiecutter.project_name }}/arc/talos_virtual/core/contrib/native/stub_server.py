@@ -0,0 +1,869 @@
+# -*- coding: utf-8 -*-
+"""
+Native service virtualization engine compatible with the mountebank imposters.
+The imposters are served by an asyncio server running in a thread of the main process, so they are loaded once per
+execution and stay up across the features and the parallel workers. The stubs of every imposter are indexed by the
+method and the path of their equals predicates, and the mountebank REST API is served in the manager port, so the
+MountebankWrapper of every process can change the stubs without restarting the server.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import threading
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+
+from arc.settings.settings_manager import Settings
+from arc.talos_virtual.core.exception.exceptions import VerificationException
+
+logger = logging.getLogger(__name__)
+
+STUB_SERVER_HOST = '127.0.0.1'
+STUB_SERVER_TIMEOUT = 10
+MATCH_OPERATORS = ('equals', 'deepEquals', 'contains', 'startsWith', 'endsWith', 'matches', 'exists')
+PREDICATE_OPTIONS = ('caseSensitive', 'except')
+ROUTE_OPERATORS = ('equals', 'deepEquals')
+
+# Stub server of the execution, running in the process that started it
+STUB_SERVER_STATE = {'server': None, 'pid': None}
+
+
+def is_native_engine_enabled():
+    """
+    Return True if talos virtual is enabled and the imposters are served by the native engine instead of mountebank.
+    :return:
+    """
+    return bool(Settings.TALOS_VIRTUAL.get('mountebank.enabled', default=False)) and \
+        Settings.TALOS_VIRTUAL.get('general.engine', default='mountebank') == 'native'
+
+
+def _to_text(value):
+    """
+    Return the text of a value of a predicate or a request, with the json format for the non string values.
+    :param value:
+    :return:
+    """
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ''
+    return json.dumps(value)
+
+
+def _parse_json(value):
+    """
+    Return the json data of a text, or None if it is not a json object or array.
+    :param value:
+    :return:
+    """
+    if isinstance(value, (dict, list)):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_key(data, key, case_sensitive):
+    """
+    Return the value of a key of a dict, comparing the keys without case if the predicate is not case sensitive.
+    :param data:
+    :param key:
+    :param case_sensitive:
+    :return:
+    """
+    if key in data or case_sensitive:
+        return data.get(key)
+    key = key.lower()
+    for data_key, value in data.items():
+        if str(data_key).lower() == key:
+            return value
+    return None
+
+
+def _normalize(value, options):
+    """
+    Return the text of a value with the except pattern removed and without case if the predicate is not case sensitive.
+    :param value:
+    :param options:
+    :return:
+    """
+    value = _to_text(value)
+    if options.get('except'):
+        value = re.sub(options['except'], '', value, flags=0 if options.get('caseSensitive') else re.IGNORECASE)
+    return value if options.get('caseSensitive') else value.lower()
+
+
+def _value_matches(operator, expected, actual, options):
+    """
+    Return True if a value of a request matches the expected value of a predicate operator.
+    The objects are matched by their keys, so the request can have more keys than the predicate, and a list of the
+    request matches if any of its values matches.
+    :param operator:
+    :param expected:
+    :param actual:
+    :param options:
+    :return:
+    """
+    if isinstance(expected, dict):
+        actual = _parse_json(actual)
+        if not isinstance(actual, dict):
+            return operator == 'exists' and not any(expected.values())
+        case_sensitive = options.get('caseSensitive', False)
+        return all(_value_matches(operator, value, _get_key(actual, key, case_sensitive), options)
+                   for key, value in expected.items())
+    if operator == 'exists':
+        return (actual not in (None, '', [], {})) == bool(expected)
+    if isinstance(expected, list):
+        actual = actual if isinstance(actual, list) else [actual]
+        return all(any(_value_matches(operator, value, item, options) for item in actual) for value in expected)
+    if isinstance(actual, list):
+        return any(_value_matches(operator, expected, item, options) for item in actual)
+    if actual is None:
+        return False
+    if operator == 'matches':
+        text = _to_text(actual)
+        if options.get('except'):
+            text = re.sub(options['except'], '', text)
+        return re.search(_to_text(expected), text, flags=0 if options.get('caseSensitive') else re.IGNORECASE) \
+            is not None
+    expected, actual = _normalize(expected, options), _normalize(actual, options)
+    if operator == 'equals':
+        return actual == expected
+    if operator == 'contains':
+        return expected in actual
+    if operator == 'startsWith':
+        return actual.startswith(expected)
+    return actual.endswith(expected)
+
+
+def _deep_equals(expected, actual, options):
+    """
+    Return True if a value of a request is equal to the expected value, with the same keys in the objects.
+    :param expected:
+    :param actual:
+    :param options:
+    :return:
+    """
+    if isinstance(expected, dict):
+        actual = _parse_json(actual) if actual not in (None, '') else {}
+        if not isinstance(actual, dict) or len(actual) != len(expected):
+            return False
+        case_sensitive = options.get('caseSensitive', False)
+        return all(_deep_equals(value, _get_key(actual, key, case_sensitive), options)
+                   for key, value in expected.items())
+    if isinstance(expected, list):
+        actual = actual if isinstance(actual, list) else [actual]
+        return len(actual) == len(expected) and \
+            all(any(_deep_equals(value, item, options) for item in actual) for value in expected)
+    return actual is not None and not isinstance(actual, list) and \
+        _normalize(expected, options) == _normalize(actual, options)
+
+
+def predicate_matches(predicate, request):
+    """
+    Return True if a request matches a mountebank predicate.
+    :param predicate:
+    :param request: dict with the method, path, query, headers and body of the request
+    :return:
+    """
+    options = {key: predicate[key] for key in PREDICATE_OPTIONS if key in predicate}
+    for operator, expected in predicate.items():
+        if operator in PREDICATE_OPTIONS:
+            continue
+        if operator == 'not':
+            matches = not predicate_matches(expected, request)
+        elif operator == 'or':
+            matches = any(predicate_matches(item, request) for item in expected)
+        elif operator == 'and':
+            matches = all(predicate_matches(item, request) for item in expected)
+        elif operator == 'deepEquals':
+            matches = all(_deep_equals(value, request.get(field), options) for field, value in expected.items())
+        else:
+            matches = all(_value_matches(operator, value, request.get(field), options)
+                          for field, value in expected.items())
+        if not matches:
+            return False
+    return True
+
+
+def check_predicate(predicate):
+    """
+    Raise a VerificationException if a predicate uses an operator not supported by the native engine.
+    :param predicate:
+    :return:
+    """
+    for operator, expected in predicate.items():
+        if operator in PREDICATE_OPTIONS:
+            continue
+        if operator == 'not':
+            check_predicate(expected)
+        elif operator in ('or', 'and'):
+            for item in expected:
+                check_predicate(item)
+        elif operator not in MATCH_OPERATORS or not isinstance(expected, dict):
+            raise VerificationException(
+                error_msg=f"The predicate '{operator}' is not supported by the native engine of talos virtual, "
+                          f"use the mountebank engine instead"
+            )
+
+
+def get_stub_route(stub):
+    """
+    Return the method and the path of the stub used to index it, or None if the stub can match any request.
+    The path is indexed without case, the predicate of the stub is checked for every request anyway.
+    :param stub:
+    :return:
+    """
+    for predicate in stub.get('predicates', []):
+        if predicate.get('except'):
+            continue
+        for operator in ROUTE_OPERATORS:
+            fields = predicate.get(operator)
+            if isinstance(fields, dict) and isinstance(fields.get('method'), str) and \
+                    isinstance(fields.get('path'), str):
+                return fields['method'].upper(), fields['path'].lower()
+    return None
+
+
+class Stub:
+    """
+    Stub of an imposter with its predicates and the responses it returns in order.
+    """
+
+    def __init__(self, definition):
+        if isinstance(definition, str):
+            definition = json.loads(definition)
+        self.definition = definition
+        self.predicates = definition.get('predicates', [])
+        for predicate in self.predicates:
+            check_predicate(predicate)
+        self.responses = []
+        for response in definition.get('responses', []):
+            if 'is' not in response:
+                raise VerificationException(
+                    error_msg=f"The responses {[key for key in response if not key.startswith('_')]} are not "
+                              f"supported by the native engine of talos virtual, use the mountebank engine instead"
+                )
+            self.responses += [response] * self._get_repeat(response)
+        self.route = get_stub_route(definition)
+        self._position = 0
+
+    @staticmethod
+    def _get_behaviors(response):
+        """
+        Return the behaviors of a response, given as a dict or as a list of dicts.
+        :param response:
+        :return:
+        """
+        behaviors = response.get('behaviors', response.get('_behaviors')) or []
+        return [behaviors] if isinstance(behaviors, dict) else behaviors
+
+    def _get_repeat(self, response):
+        """
+        Return the number of times that a response is returned before the next one.
+        :param response:
+        :return:
+        """
+        repeat = response.get('repeat', 1)
+        for behavior in self._get_behaviors(response):
+            repeat = behavior.get('repeat', repeat)
+        return max(int(repeat), 1)
+
+    def matches(self, request):
+        """
+        Return True if the request matches all the predicates of the stub.
+        :param request:
+        :return:
+        """
+        return all(predicate_matches(predicate, request) for predicate in self.predicates)
+
+    def next_response(self):
+        """
+        Return the next response of the stub and its wait time in seconds. The responses are returned in a cycle.
+        :return:
+        """
+        if not self.responses:
+            return {}, 0
+        response = self.responses[self._position % len(self.responses)]
+        self._position += 1
+        wait = 0
+        for behavior in self._get_behaviors(response):
+            if isinstance(behavior.get('wait'), (int, float)):
+                wait = behavior['wait'] / 1000
+        return response['is'], wait
+
+
+class Imposter:
+    """
+    Imposter with its stubs indexed by route. The index is replaced at once when the stubs change, so the requests
+    being served always see a complete set of stubs.
+    """
+
+    def __init__(self, definition):
+        if isinstance(definition, str):
+            definition = json.loads(definition)
+        self.port = int(definition['port'])
+        self.protocol = definition.get('protocol', 'http')
+        if self.protocol != 'http':
+            raise VerificationException(
+                error_msg=f"The protocol '{self.protocol}' is not supported by the native engine of talos virtual, "
+                          f"use the mountebank engine instead"
+            )
+        self.name = definition.get('name')
+        self.definition = definition
+        self.default_response = definition.get('defaultResponse') or {}
+        self.record_requests = bool(definition.get('recordRequests'))
+        self.number_of_requests = 0
+        self.requests = []
+        self.stubs = []
+        self._index = ({}, [])
+        self.set_stubs(definition.get('stubs', []))
+
+    def set_stubs(self, stubs):
+        """
+        Replace all the stubs of the imposter and index them by the route of their predicates.
+        Every route keeps the stubs without route in their order, so the first stub that matches is the same one
+        found by checking all the stubs.
+        :param stubs:
+        :return:
+        """
+        stubs = [stub if isinstance(stub, Stub) else Stub(stub) for stub in stubs]
+        routes, any_route = {}, []
+        for stub in stubs:
+            if stub.route is None:
+                any_route.append(stub)
+                for route_stubs in routes.values():
+                    route_stubs.append(stub)
+            else:
+                routes.setdefault(stub.route, list(any_route)).append(stub)
+        self.stubs = stubs
+        self._index = (routes, any_route)
+
+    def find_stub(self, request):
+        """
+        Return the first stub that matches the request, checking only the stubs of its route.
+        :param request:
+        :return:
+        """
+        routes, any_route = self._index
+        stubs = routes.get((request['method'].upper(), request['path'].lower()), any_route)
+        return next((stub for stub in stubs if stub.matches(request)), None)
+
+    async def respond(self, request):
+        """
+        Return the status, the headers and the body of the response of the first stub that matches the request.
+        :param request:
+        :return:
+        """
+        self.number_of_requests += 1
+        if self.record_requests:
+            self.requests.append(request)
+        stub = self.find_stub(request)
+        response, wait = stub.next_response() if stub else ({}, 0)
+        if wait:
+            await asyncio.sleep(wait)
+        response = {**self.default_response, **response}
+        headers = dict(response.get('headers') or {})
+        body = response.get('body', '')
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            if not any(header.lower() == 'content-type' for header in headers):
+                headers['Content-Type'] = 'application/json'
+        body = base64.b64decode(body) if response.get('_mode') == 'binary' else _to_text(body).encode('utf-8')
+        return int(response.get('statusCode', 200)), headers, body
+
+    def to_dict(self):
+        """
+        Return the imposter in the format of the mountebank API.
+        :return:
+        """
+        imposter = {'port': self.port, 'protocol': self.protocol, 'name': self.name,
+                    'numberOfRequests': self.number_of_requests,
+                    'stubs': [stub.definition for stub in self.stubs]}
+        if self.default_response:
+            imposter['defaultResponse'] = self.default_response
+        if self.record_requests:
+            imposter['recordRequests'] = True
+            imposter['requests'] = self.requests
+        return imposter
+
+
+async def _read_request(reader):
+    """
+    Read a HTTP request of a connection.
+    :param reader:
+    :return: dict with the request in the format of the mountebank predicates, or None if the connection is closed
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as ex:
+        if ex.partial.strip():
+            raise
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip()] = f"{headers[name.strip()]}, {value.strip()}" if name.strip() in headers \
+                else value.strip()
+    lower_headers = {name.lower(): value for name, value in headers.items()}
+
+    if lower_headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                while chunk != b'\r\n':
+                    chunk = await reader.readuntil(b'\r\n')
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.readexactly(int(lower_headers.get('content-length', 0)))
+
+    url = urlsplit(target)
+    query = {}
+    for key, value in parse_qsl(url.query, keep_blank_values=True):
+        query[key] = query[key] + [value] if isinstance(query.get(key), list) else \
+            [query[key], value] if key in query else value
+    connection = lower_headers.get('connection', '').lower()
+    return {
+        'method': method.upper(),
+        'path': url.path or '/',
+        'query': query,
+        'headers': headers,
+        'body': body.decode('utf-8', errors='replace'),
+        'keep_alive': connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    }
+
+
+def _write_response(writer, status, headers, body, keep_alive):
+    """
+    Write a HTTP response in a connection.
+    :param writer:
+    :param status:
+    :param headers:
+    :param body: bytes
+    :param keep_alive:
+    :return:
+    """
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    for name, values in headers.items():
+        if name.lower() in ('content-length', 'transfer-encoding', 'connection'):
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            lines.append(f"{name}: {value}")
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+
+
+class StubServer:
+    """
+    Asyncio server of the imposters and of the mountebank API, running in its own thread.
+    The methods can be called from any thread, the imposters are changed in the thread of the server.
+    """
+
+    def __init__(self, manager_port=None, host=STUB_SERVER_HOST):
+        self.host = host
+        self.manager_port = manager_port
+        self.imposters = {}
+        self.modified = False
+        self._initial_imposters = []
+        self._listeners = {}
+        self._connections = {}
+        self._loop = None
+        self._thread = None
+
+    def start(self, imposters=()):
+        """
+        Start the thread of the server, the mountebank API and the given imposters.
+        :param imposters: list of imposter dicts
+        :return:
+        """
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(ready.set)
+            self._loop.run_forever()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=run_loop, name='talos-virtual', daemon=True)
+        self._thread.start()
+        ready.wait(STUB_SERVER_TIMEOUT)
+        if self.manager_port:
+            self._call(self._listen(self.manager_port, self._handle_api_request))
+        self._initial_imposters = [imposter if isinstance(imposter, dict) else json.loads(imposter)
+                                   for imposter in imposters]
+        self.replace_imposters(self._initial_imposters)
+        self.modified = False
+        logger.info(f"Talos virtual native engine running with the imposters in ports {list(self.imposters)}")
+
+    def stop(self):
+        """
+        Close all the listeners and stop the thread of the server.
+        :return:
+        """
+        if self._loop is None:
+            return
+        self._call(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(STUB_SERVER_TIMEOUT)
+        self._loop.close()
+        self._loop = None
+        logger.info("Talos virtual native engine stopped")
+
+    def _call(self, coroutine):
+        """
+        Run a coroutine in the thread of the server and return its result.
+        :param coroutine:
+        :return:
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(STUB_SERVER_TIMEOUT)
+
+    async def _listen(self, port, handler):
+        """
+        Start listening in a port, serving the requests with the handler.
+        :param port:
+        :param handler: coroutine function that returns the status, the headers and the body of a request
+        :return:
+        """
+        async def handle_connection(reader, writer):
+            self._connections.setdefault(port, set()).add(writer)
+            try:
+                while True:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.pop('keep_alive')
+                    try:
+                        status, headers, body = await handler(request)
+                    except (Exception,) as ex:
+                        logger.exception(f"Error serving a request of talos virtual in port {port}: {ex}")
+                        status, headers, body = 500, {}, b''
+                    _write_response(writer, status, headers, body, keep_alive)
+                    await writer.drain()
+                    if not keep_alive:
+                        break
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError) as ex:
+                logger.debug(f"Talos virtual connection closed in port {port}: {ex}")
+            finally:
+                self._connections.get(port, set()).discard(writer)
+                writer.close()
+
+        self._listeners[port] = await asyncio.start_server(handle_connection, self.host, port, reuse_address=True)
+
+    async def _close_listeners(self, ports):
+        """
+        Stop listening in the ports and close their open connections.
+        :param ports:
+        :return:
+        """
+        for port in ports:
+            listener = self._listeners.pop(port, None)
+            for writer in self._connections.pop(port, set()):
+                writer.close()
+            if listener:
+                listener.close()
+                await listener.wait_closed()
+
+    async def _shutdown(self):
+        """
+        Close all the listeners and cancel the requests being served.
+        :return:
+        """
+        await self._close_listeners(list(self._listeners))
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _serve_imposter(self, port, request):
+        """
+        Return the response of the imposter running in a port.
+        :param port:
+        :param request:
+        :return:
+        """
+        imposter = self.imposters.get(port)
+        if imposter is None:
+            return 404, {}, b''
+        return await imposter.respond(request)
+
+    async def _create_imposter(self, definition):
+        """
+        Create an imposter. If there is an imposter in its port, it is replaced without closing the port.
+        :param definition: imposter dict, json text or Imposter
+        :return:
+        """
+        imposter = definition if isinstance(definition, Imposter) else Imposter(definition)
+        self.imposters[imposter.port] = imposter
+        if imposter.port not in self._listeners:
+            await self._listen(imposter.port, lambda request: self._serve_imposter(imposter.port, request))
+        self.modified = True
+        return imposter
+
+    async def _delete_imposters(self, ports):
+        """
+        Delete the imposters of the ports.
+        :param ports:
+        :return: list with the deleted imposters
+        """
+        deleted = [self.imposters.pop(port) for port in ports if port in self.imposters]
+        await self._close_listeners([imposter.port for imposter in deleted])
+        self.modified = True
+        return deleted
+
+    async def _replace_imposters(self, definitions):
+        """
+        Replace all the imposters. The ports used by the old and the new imposters are not closed.
+        :param definitions:
+        :return:
+        """
+        imposters = [Imposter(definition) for definition in definitions]
+        ports = [imposter.port for imposter in imposters]
+        await self._delete_imposters([port for port in self.imposters if port not in ports])
+        for imposter in imposters:
+            await self._create_imposter(imposter)
+
+    async def _change_stubs(self, port, function):
+        """
+        Replace the stubs of an imposter with the result of the function applied to its current stubs.
+        :param port:
+        :param function:
+        :return:
+        """
+        imposter = self.imposters.get(int(port))
+        if imposter is None:
+            raise VerificationException(error_msg=f"There is no imposter in port {port}")
+        imposter.set_stubs(function(list(imposter.stubs)))
+        self.modified = True
+        return imposter
+
+    def create_imposter(self, definition):
+        """
+        Create an imposter, replacing the imposter of its port if there is one.
+        :param definition: imposter dict or json text
+        :return:
+        """
+        return self._call(self._create_imposter(definition))
+
+    def delete_imposter(self, port):
+        """
+        Delete the imposter of a port.
+        :param port:
+        :return:
+        """
+        self._call(self._delete_imposters([int(port)]))
+
+    def delete_all_imposters(self):
+        """
+        Delete all the imposters.
+        :return:
+        """
+        self._call(self._delete_imposters(list(self.imposters)))
+
+    def replace_imposters(self, definitions):
+        """
+        Replace all the imposters with the given ones.
+        :param definitions: list of imposter dicts
+        :return:
+        """
+        self._call(self._replace_imposters(definitions))
+
+    def replace_stubs(self, port, stubs):
+        """
+        Replace all the stubs of an imposter without restarting it.
+        :param port:
+        :param stubs: list of stub dicts
+        :return:
+        """
+        self._call(self._change_stubs(port, lambda _: stubs))
+
+    def add_stub(self, port, stub, index=None):
+        """
+        Add a stub to an imposter in the index position, at the end by default.
+        :param port:
+        :param stub:
+        :param index:
+        :return:
+        """
+        def add(stubs):
+            stubs.insert(len(stubs) if index is None else int(index), stub)
+            return stubs
+        self._call(self._change_stubs(port, add))
+
+    def overwrite_stub(self, port, index, stub):
+        """
+        Replace the stub in the index position of an imposter.
+        :param port:
+        :param index:
+        :param stub:
+        :return:
+        """
+        def overwrite(stubs):
+            stubs[int(index)] = stub
+            return stubs
+        self._call(self._change_stubs(port, overwrite))
+
+    def delete_stub(self, port, index):
+        """
+        Delete the stub in the index position of an imposter.
+        :param port:
+        :param index:
+        :return:
+        """
+        def delete(stubs):
+            del stubs[int(index)]
+            return stubs
+        self._call(self._change_stubs(port, delete))
+
+    def get_imposter(self, port):
+        """
+        Return the imposter of a port in the format of the mountebank API, or None if there is no imposter.
+        :param port:
+        :return:
+        """
+        imposter = self.imposters.get(int(port))
+        return imposter.to_dict() if imposter else None
+
+    def reset_imposters(self):
+        """
+        Restore the imposters loaded at the start if they have been changed.
+        :return:
+        """
+        if self.modified:
+            logger.info("Restoring the initial imposters of talos virtual")
+            self.replace_imposters(self._initial_imposters)
+            self.modified = False
+
+    async def _handle_api_request(self, request):
+        """
+        Serve the requests of the mountebank API used by the MountebankWrapper.
+        :param request:
+        :return:
+        """
+        segments = [segment for segment in request['path'].split('/') if segment]
+        method = request['method']
+        data = _parse_json(request['body']) if request['body'] else None
+        # The mountebank steps send the json texts of the imposters and the stubs as json strings
+        if isinstance(data, str):
+            data = _parse_json(data)
+        try:
+            if segments in ([], ['imposters']):
+                if method == 'GET':
+                    return self._api_response(200, {'imposters': [imposter.to_dict()
+                                                                  for imposter in self.imposters.values()]})
+                if method == 'POST':
+                    return self._api_response(201, (await self._create_imposter(data)).to_dict())
+                if method == 'PUT':
+                    await self._replace_imposters(data.get('imposters', []) if isinstance(data, dict) else data)
+                    return self._api_response(200, {'imposters': [imposter.to_dict()
+                                                                  for imposter in self.imposters.values()]})
+                if method == 'DELETE':
+                    deleted = await self._delete_imposters(list(self.imposters))
+                    return self._api_response(200, {'imposters': [imposter.to_dict() for imposter in deleted]})
+            elif segments[0] == 'imposters' and len(segments) == 2:
+                port = int(segments[1])
+                if method == 'GET':
+                    imposter = self.get_imposter(port)
+                    return self._api_response(200, imposter) if imposter else self._api_error(404, 'no such resource')
+                if method == 'DELETE':
+                    deleted = await self._delete_imposters([port])
+                    return self._api_response(200, deleted[0].to_dict() if deleted else {})
+            elif segments[0] == 'imposters' and segments[2:3] == ['stubs']:
+                port = int(segments[1])
+                if len(segments) == 3 and method == 'PUT':
+                    stubs = data.get('stubs', []) if isinstance(data, dict) else data
+                    return self._api_response(200, (await self._change_stubs(port, lambda _: stubs)).to_dict())
+                if len(segments) == 3 and method == 'POST':
+                    stub, index = (data['stub'], data.get('index')) if 'stub' in data else (data, None)
+
+                    def add(stubs):
+                        stubs.insert(len(stubs) if index is None else int(index), stub)
+                        return stubs
+                    return self._api_response(200, (await self._change_stubs(port, add)).to_dict())
+                if len(segments) == 4:
+                    index = int(segments[3])
+
+                    def change(stubs):
+                        if method == 'PUT':
+                            stubs[index] = data
+                        else:
+                            del stubs[index]
+                        return stubs
+                    if method in ('PUT', 'DELETE'):
+                        return self._api_response(200, (await self._change_stubs(port, change)).to_dict())
+        except (VerificationException, KeyError, IndexError, TypeError, ValueError, AttributeError) as ex:
+            return self._api_error(400, str(ex))
+        except OSError as ex:
+            return self._api_error(400, f"The imposter port could not be opened: {ex}")
+        return self._api_error(404, 'no such resource')
+
+    @staticmethod
+    def _api_response(status, data):
+        """
+        Return a json response of the mountebank API.
+        :param status:
+        :param data:
+        :return:
+        """
+        return status, {'Content-Type': 'application/json'}, json.dumps(data).encode('utf-8')
+
+    def _api_error(self, status, message):
+        """
+        Return an error response of the mountebank API.
+        :param status:
+        :param message:
+        :return:
+        """
+        return self._api_response(status, {'errors': [{'code': 'bad data' if status == 400 else 'no such resource',
+                                                       'message': message}]})
+
+
+def get_stub_server():
+    """
+    Return the stub server of the execution if it runs in this process. The parallel workers use the mountebank API.
+    :return:
+    """
+    if STUB_SERVER_STATE['pid'] != os.getpid():
+        return None
+    return STUB_SERVER_STATE['server']
+
+
+def start_stub_server(imposters, manager_port=None):
+    """
+    Start the stub server of the execution with the given imposters.
+    :param imposters: list of imposter dicts
+    :param manager_port: port of the mountebank API
+    :return:
+    """
+    stop_stub_server()
+    server = StubServer(manager_port=manager_port)
+    server.start(imposters)
+    STUB_SERVER_STATE['server'] = server
+    STUB_SERVER_STATE['pid'] = os.getpid()
+    return server
+
+
+def stop_stub_server():
+    """
+    Stop the stub server of the execution if it runs in this process.
+    :return:
+    """
+    server = get_stub_server()
+    if server:
+        server.stop()
+    STUB_SERVER_STATE['server'] = None
+    STUB_SERVER_STATE['pid'] = None
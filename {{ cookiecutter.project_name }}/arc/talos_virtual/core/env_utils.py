@@ -11,17 +11,26 @@ def unify_json(context):
     :param context:
     :return:
     """
-    input_path = context.talosvirtual.mountebank.input_path
-    mb_path = os.path.join(Settings.BASE_PATH.get(force=True), input_path)
-    json_imposter = {"port": context.talosvirtual.mountebank.imposter_port,
-                     "protocol": context.talosvirtual.mountebank.imposter_protocol,
-                     "name": context.talosvirtual.mountebank.imposter_name,
+    return get_unified_imposter(context.talosvirtual.mountebank)
+
+
+def get_unified_imposter(mountebank):
+    """
+        This function create an imposter with the stubs of all the imposter files of the input path of a mountebank
+        wrapper.
+    :param mountebank: MountebankWrapper with the input path, port, protocol and name of the imposter
+    :return:
+    """
+    mb_path = os.path.join(Settings.BASE_PATH.get(force=True), mountebank.input_path)
+    json_imposter = {"port": mountebank.imposter_port,
+                     "protocol": mountebank.imposter_protocol,
+                     "name": mountebank.imposter_name,
                      "stubs": []}
     for path, dirs, filenames in walk(mb_path):
         for current_file in filenames:
             if os.path.isfile(os.path.join(path + os.sep + current_file)) and current_file.endswith('.json'):
-                f = open(path + os.sep + current_file)
-                temp_json = json.load(f)
+                with open(path + os.sep + current_file) as f:
+                    temp_json = json.load(f)
                 for stub in temp_json['stubs']:
                     json_imposter['stubs'].append(stub)
     return json_imposter
@@ -1,12 +1,12 @@
 import datetime
 import json
 
-from sqlalchemy import text
 from flask import render_template, request
 
 from arc.web.app.executions.forms import FilterExecutionsForm
 from arc.web.extensions import db
 from arc.web.app.executions import bp as executions_bp
+from arc.web.app.executions.statistics import get_executions_by_day, get_status_trends
 from arc.web.models.models import Execution
 
 
@@ -77,57 +77,44 @@ def get_execution(execution_id):
     )
 
 
+def _get_request_date(name):
+    """
+        Return the date of an url param with the format YYYY-MM-DD, or today if it is null.
+    :param name:
+    :return:
+    """
+    if not request.args.get(name, False):
+        return datetime.datetime.today()
+    return datetime.datetime.strptime(request.args.get(name), '%Y-%m-%d')
+
+
 @executions_bp.route('/api/v1/executions/')
 def get_executions_by_dates():
     """
         Given the url params from_date and to_date return the values needed to draw the Executions Statistics chart.
-        If from_date is null, then use today - 5 days.
+        If from_date is null, then use today.
         If to_date is null, then use today.
+        The lists looks like [0,1,2,4,6], where each value is the number of passed or failed executions of the day
+        of the same position in the labels, from the first day of the range.
     :return:
     """
-    today = datetime.datetime.today()
-    from_date = today if not request.args.get('from_date', False) else datetime.datetime.strptime(
-        request.args.get('from_date'), '%Y-%m-%d')
-    to_date = today if not request.args.get('to_date', False) else datetime.datetime.strptime(
-        request.args.get('to_date'), '%Y-%m-%d')
-
-    labels = []
-    failed = []
-    passed = []
-    if from_date < to_date:
-        _days = to_date - from_date
-        start_date = from_date
-    else:
-        _days = from_date - to_date
-        start_date = to_date
-    for day in range(_days.days + 1):
-        """
-           We need the lists to looks like:
-           [0,1,2,4,6]
-           Where each value is the number of passed or failed values in that day.
-           So given the from_date 18/07/2023 the first value will be associated to that date.
-           The second value will be associated to the next day, 19/07/2023. 
-        """
-        final_date = (start_date + datetime.timedelta(days=day)).strftime("%Y-%m-%d")
-        next_date = (start_date + datetime.timedelta(days=day + 1)).strftime("%Y-%m-%d")
-        labels.append(final_date)
-        _failed = db.session.execute(
-            text(
-                f"SELECT COUNT(id) as total_failed FROM {Execution.__tablename__}"
-                f" WHERE {Execution.features_failed} > 0 AND {Execution.created_on} BETWEEN '{final_date}' and '{next_date}'"
-            )
-        ).first()[0]
-        failed.append(_failed)
-        _passed = db.session.execute(
-            text(
-                f"SELECT COUNT(id) as total_passed FROM {Execution.__tablename__}"
-                f" WHERE {Execution.features_failed} == 0 AND {Execution.created_on} BETWEEN '{final_date}' and '{next_date}'"
-            )
-        ).first()[0]
-        passed.append(_passed)
-
-    return json.dumps({
-        "failed": failed,
-        "passed": passed,
-        "labels": labels
-    }, indent=4)
+    return json.dumps(
+        get_executions_by_day(db.session, _get_request_date('from_date'), _get_request_date('to_date')), indent=4
+    )
+
+
+@executions_bp.route('/api/v1/executions/trends/')
+def get_executions_trends():
+    """
+        Given the url params from_date and to_date return the trends of the features or scenarios executed in the
+        range: executions, results, pass rate, flakiness and duration percentiles, the flakiest ones first.
+        The url param level is feature or scenario (default), feature filters the scenarios of a feature and limit is
+        the maximum number of trends.
+    :return:
+    """
+    trends = get_status_trends(
+        db.session, _get_request_date('from_date'), _get_request_date('to_date'),
+        level=request.args.get('level', 'scenario'), feature=request.args.get('feature'),
+        limit=request.args.get('limit', type=int)
+    )
+    return json.dumps({"trends": trends}, indent=4)
@@ -0,0 +1,146 @@
+"""
+Statistics of the executions saved in the portal database.
+Every statistic is answered with one grouped or ordered query over the created_on indexes of the execution tables,
+instead of one query for every day of the range.
+"""
+import datetime
+import itertools
+import math
+
+from sqlalchemy import case, func, select
+
+from arc.web.models.models import Execution, ExecutionFeature, ExecutionScenario, StatusType
+
+DURATION_PERCENTILES = (50, 90, 95)
+
+
+def get_date_range(from_date, to_date):
+    """
+    Return the first and the last day of a range, whatever the order of the dates.
+    :param from_date:
+    :param to_date:
+    :return:
+    """
+    return (from_date, to_date) if from_date < to_date else (to_date, from_date)
+
+
+def _where_created_on(query, model, start_date, end_date):
+    """
+    Filter a query by the days of the created_on column of a model, from the start of start_date to the end of
+    end_date, with a range that can use the index of the column.
+    :param query:
+    :param model:
+    :param start_date:
+    :param end_date:
+    :return:
+    """
+    start = datetime.datetime.combine(start_date, datetime.time.min)
+    end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min)
+    return query.where(model.created_on >= start, model.created_on < end)
+
+
+def get_executions_by_day(session, from_date, to_date):
+    """
+    Return the passed and failed executions of every day of a range, with the values needed to draw the Executions
+    Statistics chart. The executions with features failed are failed, the rest are passed.
+    :param session:
+    :param from_date:
+    :param to_date:
+    :return: dict with the labels of the days and the lists of failed and passed executions of every day
+    """
+    start_date, end_date = get_date_range(from_date.date(), to_date.date())
+    day = func.date(Execution.created_on)
+    query = select(
+        day,
+        func.sum(case((Execution.features_failed > 0, 1), else_=0)),
+        func.sum(case((Execution.features_failed == 0, 1), else_=0))
+    ).group_by(day)
+    query = _where_created_on(query, Execution, start_date, end_date)
+    totals = {str(row[0]): (row[1], row[2]) for row in session.execute(query)}
+    labels = [(start_date + datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+              for days in range((end_date - start_date).days + 1)]
+    return {
+        "failed": [totals.get(label, (0, 0))[0] for label in labels],
+        "passed": [totals.get(label, (0, 0))[1] for label in labels],
+        "labels": labels
+    }
+
+
+def get_percentile(values, percentile):
+    """
+    Return the percentile of a sorted list of values with the nearest rank method.
+    :param values:
+    :param percentile:
+    :return:
+    """
+    if not values:
+        return None
+    return values[max(math.ceil(percentile / 100 * len(values)), 1) - 1]
+
+
+def get_status_trend(name, statuses, durations):
+    """
+    Return the trend of a feature or a scenario from its statuses and durations in order of execution.
+    The flakiness is the ratio of executions whose status is different from the status of the previous one.
+    :param name:
+    :param statuses:
+    :param durations:
+    :return:
+    """
+    executions = len(statuses)
+    changes = sum(1 for previous, current in zip(statuses, statuses[1:]) if previous != current)
+    passed = statuses.count(StatusType.PASSED)
+    failed = statuses.count(StatusType.FAILED)
+    durations = sorted(duration for duration in durations if duration is not None)
+    trend = {
+        "name": name,
+        "executions": executions,
+        "passed": passed,
+        "failed": failed,
+        "skipped": executions - passed - failed,
+        "pass_rate": round(passed / executions, 4) if executions else 0,
+        "flakiness": round(changes / (executions - 1), 4) if executions > 1 else 0,
+        "last_status": statuses[-1].name.lower() if statuses else None,
+    }
+    for percentile in DURATION_PERCENTILES:
+        trend[f"duration_p{percentile}"] = get_percentile(durations, percentile)
+    return trend
+
+
+def get_status_trends(session, from_date, to_date, level='scenario', feature=None, limit=None):
+    """
+    Return the trends of the features or the scenarios executed in a range of days, the flakiest ones first.
+    The rows are read in one query ordered by name and execution, and the trends are calculated while reading them.
+    :param session:
+    :param from_date:
+    :param to_date:
+    :param level: feature or scenario
+    :param feature: name of the feature to filter the trends
+    :param limit: maximum number of trends returned
+    :return: list of dicts with the executions, results, pass rate, flakiness and duration percentiles
+    """
+    start_date, end_date = get_date_range(from_date.date(), to_date.date())
+    if level == 'feature':
+        model = ExecutionFeature
+        names = (ExecutionFeature.name,)
+        query = select(ExecutionFeature.name, ExecutionFeature.status, ExecutionFeature.duration)
+    else:
+        model = ExecutionScenario
+        names = (ExecutionFeature.name, ExecutionScenario.name)
+        query = select(ExecutionFeature.name, ExecutionScenario.name, ExecutionScenario.status,
+                       ExecutionScenario.duration).join(ExecutionFeature,
+                                                        ExecutionScenario.feature_id == ExecutionFeature.id)
+    if feature:
+        query = query.where(ExecutionFeature.name == feature)
+    query = _where_created_on(query, model, start_date, end_date).order_by(*names, model.created_on, model.id)
+
+    trends = []
+    rows = session.execute(query)
+    for name, group in itertools.groupby(rows, key=lambda row: tuple(row[:len(names)])):
+        group = list(group)
+        trend = get_status_trend(name[-1], [row[-2] for row in group], [row[-1] for row in group])
+        if level != 'feature':
+            trend["feature"] = name[0]
+        trends.append(trend)
+    trends.sort(key=lambda trend: (-trend["flakiness"], -trend["failed"], trend["name"]))
+    return trends[:limit] if limit else trends
@@ -0,0 +1,232 @@
+"""
+Index of the feature files of the project for the portal pages.
+Every feature file is parsed once and its data is saved with its modification time and size. The index is kept in
+memory and in the cache folder, so the portal only parses again the feature files changed since the last request, even
+after a restart.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from behave.parser import parse_file, ParserError
+
+from arc.settings.settings_manager import Settings
+
+logger = logging.getLogger(__name__)
+
+FEATURE_INDEX_FILE = os.path.join('.cache', 'features', 'index.json')
+FEATURE_INDEX_VERSION = 1
+
+# Indexed data of every feature file by absolute path
+FEATURE_INDEX = {'entries': None}
+FEATURE_INDEX_LOCK = threading.Lock()
+
+
+def get_feature_index_file():
+    """
+    Return the path of the file where the feature index is saved.
+    :return:
+    """
+    return os.path.join(Settings.BASE_PATH.get(force=True), FEATURE_INDEX_FILE)
+
+
+def load_feature_index():
+    """
+    Return the entries of the feature index saved by a previous portal, or an empty index.
+    :return:
+    """
+    try:
+        with open(get_feature_index_file(), encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+    if index.get('version') != FEATURE_INDEX_VERSION:
+        return {}
+    return index.get('entries', {})
+
+
+def save_feature_index(entries):
+    """
+    Save the entries of the feature index. The file is replaced atomically.
+    :param entries:
+    :return:
+    """
+    index_path = get_feature_index_file()
+    temp_file = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(temp_file, 'w', encoding='utf-8') as index_file:
+            # dumps uses the C encoder of json, dump encodes the entries in python chunk by chunk
+            index_file.write(json.dumps({'version': FEATURE_INDEX_VERSION, 'entries': entries}, ensure_ascii=False))
+        os.replace(temp_file, index_path)
+    except (OSError, TypeError, ValueError) as ex:
+        logger.warning(f"The feature index could not be saved: {index_path}. {ex}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def walk_feature_files(test_path=None):
+    """
+    Return the absolute paths of the feature files of the test path, in the order of the folders walked.
+    :param test_path: folder of the feature files, the test path of the settings by default
+    :return:
+    """
+    feature_files = []
+    for path_name, _, file_names in os.walk(f"{test_path or Settings.TEST_PATH.get(force=True)}"):
+        if "__pycache__" in path_name:
+            continue
+        feature_files += [os.path.abspath(f"{path_name}/{file_name}") for file_name in file_names
+                          if file_name.endswith(".feature")]
+    return feature_files
+
+
+def extract_scenario_steps(steps):
+    """
+    This function extract the scenario steps data.
+
+    :param steps:
+    :return:
+    """
+    _scenario_steps = []
+    for steps in steps:
+        step_data = [steps.keyword, steps.name]
+        table = []
+        if steps.table is not None:
+            table.append(steps.table.headings)
+            for row in steps.table.rows:
+                row_data = []
+                for data in row:
+                    row_data.append(data)
+                table.append(row_data)
+        step_data.append(table)
+        _scenario_steps.append(step_data)
+    return _scenario_steps
+
+
+def extract_scenario_examples(scenario):
+    """
+    This function extract the scenario example values
+
+    :param scenario:
+    :return:
+    """
+    if not hasattr(scenario, 'examples'):
+        return {}
+    _examples = {}
+    for idx, example_data in enumerate(scenario.examples):
+        table = [example_data.table.headings]
+        for row in example_data.table.rows:
+            row_data = []
+            for data in row:
+                row_data.append(data)
+            table.append(row_data)
+        _examples.update({
+            "example_" + str(idx): {
+                "name": example_data.name,
+                "tags": example_data.tags,
+                "table": table
+            }
+        })
+    return _examples
+
+
+def get_feature_data(feature_data, filepath, modification_time):
+    """
+    Return the feature and scenario data of a parsed feature file used by the portal pages.
+    :param feature_data: feature parsed by behave
+    :param filepath:
+    :param modification_time:
+    :return:
+    """
+    # Set feature background data.
+    background_steps = []
+    if feature_data.background is not None:
+        for step in feature_data.background.steps:
+            background_steps.append([step.keyword, step.name])
+
+    scenarios = {}
+    for index, scenario in enumerate(feature_data.scenarios):
+        scenarios.update({
+            "scenario_" + str(index): {
+                "scenario_type": scenario.keyword,
+                "scenario_name": scenario.name,
+                "scenario_description": scenario.description,
+                "scenario_tags": scenario.tags,
+                "scenario_steps": extract_scenario_steps(scenario.steps),
+                "scenario_examples": extract_scenario_examples(scenario)
+            }
+        })
+    return {
+        "filename": os.path.basename(filepath).replace(".feature", ""),
+        "filepath": filepath,
+        "modification_date": time.strftime("%d/%m/%Y", time.gmtime(modification_time)),
+        "feature_background": background_steps,
+        "feature_tags": feature_data.tags,
+        "feature_description": feature_data.description,
+        "scenarios": scenarios
+    }
+
+
+def index_feature_file(filepath, file_stat):
+    """
+    Parse a feature file and return its entry of the index, with the parse error if it could not be parsed.
+    The data is converted to json types, so the entries are the same when they are read from the index file.
+    :param filepath:
+    :param file_stat:
+    :return:
+    """
+    logger.info(f"Parsing feature {filepath}")
+    entry = {'mtime': file_stat.st_mtime_ns, 'size': file_stat.st_size, 'feature': None, 'error': None,
+             'total_scenarios': 0, 'total_steps': 0}
+    try:
+        feature_data = parse_file(filepath)
+    except (ParserError,) as e:
+        entry['error'] = str(e)
+        logger.error(f"It was impossible to parse '{os.path.basename(filepath)}', Exception error: {e}")
+        return entry
+    if feature_data:
+        entry['feature'] = json.loads(json.dumps(get_feature_data(feature_data, filepath, file_stat.st_mtime)))
+        entry['total_scenarios'] = len(feature_data.scenarios)
+        entry['total_steps'] = sum(len(scenario.steps) for scenario in feature_data.scenarios)
+    return entry
+
+
+def get_feature_index(test_path=None):
+    """
+    Return the entries of the feature files of the test path, in the order of the folders walked.
+    Only the new feature files and the ones whose modification time or size changed are parsed.
+    :param test_path: folder of the feature files, the test path of the settings by default
+    :return: list of tuples with the absolute path and the entry of every feature file
+    """
+    with FEATURE_INDEX_LOCK:
+        if FEATURE_INDEX['entries'] is None:
+            FEATURE_INDEX['entries'] = load_feature_index()
+        entries = FEATURE_INDEX['entries']
+        feature_files = walk_feature_files(test_path)
+        changed = False
+        for filepath in feature_files:
+            try:
+                file_stat = os.stat(filepath)
+            except OSError:
+                continue
+            entry = entries.get(filepath)
+            if entry is None or entry['mtime'] != file_stat.st_mtime_ns or entry['size'] != file_stat.st_size:
+                entries[filepath] = index_feature_file(filepath, file_stat)
+                changed = True
+        removed = set(entries) - set(feature_files)
+        for filepath in removed:
+            del entries[filepath]
+        if changed or removed:
+            save_feature_index(entries)
+        return [(filepath, entries[filepath]) for filepath in feature_files if filepath in entries]
+
+
+def clear_feature_index():
+    """
+    Remove the feature index from memory, it is loaded again from the index file in the next request.
+    :return:
+    """
+    with FEATURE_INDEX_LOCK:
+        FEATURE_INDEX['entries'] = None
@@ -4,7 +4,7 @@ from flask import render_template, jsonify, request, Response, redirect, url_for
 from arc.web.app.run.executions import bp
 from arc.web.app.runners import execute_feature, execute_by_tags, execute_features, execute_by_scenario_names
 from arc.web.app.utils import get_message, update_messages, clean_messages, send_request_portal, kill, get_alert, \
-    update_alert, clean_alerts, get_info, update_info
+    update_alert, clean_alerts, get_info, update_info, get_new_messages
 from multiprocessing import Process
 from arc.web.app.run.form_feature_run import StopExecutionForm
 
@@ -14,23 +14,27 @@ messages = []
 @bp.route('/get_messages')
 def get_messages():
     """
-    Return a json with the messages stored in the messages global variable.
+    Return a json with the messages stored in the messages global variable after the offset and run arguments,
+    so the console only reads the new messages.
     :return:
     """
     status = os.environ.get('RUNNING', 'False')
-    return jsonify({'messages': get_message(), 'status': status})
+    run = request.args.get('run', type=int)
+    new_messages, offset, run, reset = get_new_messages(request.args.get('offset', 0, type=int), run)
+    return jsonify({'messages': new_messages, 'offset': offset, 'run': run, 'reset': reset, 'status': status})
 
 
 @bp.route('/view-executions', methods=['GET', 'POST'])
 def view_executions():
     """
-    Show View Executions interface
+    Show View Executions interface. The runner posts the batches of console lines, they are stored without rendering
+    the interface.
     :return:
     """
     if request.method == 'POST':
-        log = update_messages(request.data.decode('utf-8'))
-    else:
-        log = get_message()
+        update_messages(request.data.decode('utf-8'))
+        return Response(status=200)
+    log = get_message()
     data = {}
     pid = os.environ.get('pid', '0')
     form = StopExecutionForm(pid=pid)
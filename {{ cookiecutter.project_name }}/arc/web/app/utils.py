@@ -1,20 +1,22 @@
+import atexit
 import logging
 import os
+import queue
 import re
+import threading
 import time
 from copy import deepcopy
 from os.path import isfile, isdir
 
 import requests
 
-from behave.parser import parse_file
 from flask import flash
 
 from arc.core.paths.directories import get_default_steps_path
 from arc.settings.settings_manager import Settings
+from arc.web.app.feature_index import get_feature_index
 from arc.web.extensions import db
 from arc.web.models.models import TalosSettings, SettingsValue, DataType
-from behave.parser import ParserError
 
 logger = logging.getLogger(__name__)
 global messages
@@ -23,6 +25,18 @@ global alerts
 alerts = []
 global info
 info = []
+# Run of the messages, changed when they are cleaned so the consoles of the browser read them again from the start
+MESSAGES_STATE = {'run': 0}
+
+CONSOLE_PATH = '/view-executions'
+CONSOLE_QUEUE_SIZE = 10000
+CONSOLE_BATCH_LINES = 500
+CONSOLE_BATCH_INTERVAL = 0.2
+CONSOLE_PUT_TIMEOUT = 5
+CONSOLE_FLUSH_TIMEOUT = 10
+# Lines of the real time console waiting to be sent to the portal by the console thread of the process
+CONSOLE_QUEUE = queue.Queue(maxsize=CONSOLE_QUEUE_SIZE)
+CONSOLE_STATE = {'thread': None, 'pid': None, 'lock': threading.Lock(), 'dropped': 0}
 
 
 def get_total_features_and_scenarios():
@@ -31,160 +45,39 @@ def get_total_features_and_scenarios():
     :return:
     """
     logger.info("Getting total features, scenarios and steps.")
-
-    path_files = os.walk(f"{Settings.TEST_PATH.get(force=True)}")
-    file_paths = []
+    total_features = 0
     total_scenarios = 0
     total_steps = 0
     failed_features = []
-    for path in path_files:
-        # "walk" every folder looking for files.
-        path_name = path[0]
-        if len(path[2]) > 0 and "__pycache__" not in path_name:
-            # If folder have files, then create the key in the files_by_path dictionary.
-            for file_name in path[2]:
-                # If any file match the extension and file_mode then, add the file to the dictionary.
-                logger.info(f"Processing file {file_name} in path {path_name}")
-                if file_name.endswith(".feature"):
-                    feature_data = None
-                    logger.info(f"Parsing feature {os.path.abspath(f'{path_name}/{file_name}')}")
-                    try:
-                        feature_data = parse_file(os.path.abspath(f"{path_name}/{file_name}"))
-                    except(ParserError,) as e:
-                        failed_features.append(str(e))
-                        logger.error(f"It was impossible to parse '{file_name}', Exception error: {e}")
-                    if feature_data:
-                        file_paths.append(f"{path_name}/{file_name}")
-                        total_scenarios += len(feature_data.scenarios)
-                        for scenario in feature_data.scenarios:
-                            total_steps += len(scenario.steps)
-    logger.info(f"Total features: {len(file_paths)}, total scenarios: {total_scenarios}, total steps: {total_steps}")
-    return len(file_paths), total_scenarios, total_steps, failed_features
+    for filepath, entry in get_feature_index():
+        if entry['error']:
+            failed_features.append(entry['error'])
+        elif entry['feature']:
+            total_features += 1
+            total_scenarios += entry['total_scenarios']
+            total_steps += entry['total_steps']
+    logger.info(f"Total features: {total_features}, total scenarios: {total_scenarios}, total steps: {total_steps}")
+    return total_features, total_scenarios, total_steps, failed_features
 
 
 def get_feature_files():
     """
     This function return a dict with the feature files as key with all the feature and scenario data.
+    The data is read from the feature index, only the feature files changed are parsed again.
     :return:
     """
     logger.info("Processing feature files to get scenarios and tags info for run page.")
-    path_files = os.walk(f"{Settings.TEST_PATH.get(force=True)}")
     files = {}
     failed_features = []
-    for path in path_files:
-        # "walk" every folder looking for files.
-        path_name = path[0]
-        if len(path[2]) > 0 and "__pycache__" not in path_name:
-            # If folder have files, then create the key in the files_by_path dictionary.
-            for file_name in path[2]:
-                logger.info(f"Processing file {file_name} in path {path_name}")
-                # If any file match the extension and file_mode then, add the file to the dictionary.
-                if file_name.endswith(".feature"):
-                    logger.info(f"Parsing feature {os.path.abspath(f'{path_name}/{file_name}')}")
-                    # Parse the feature file and return a feature objects with all the information about it, the
-                    # scenarios and the steps.
-                    feature_data = None
-                    try:
-                        feature_data = parse_file(os.path.abspath(f"{path_name}/{file_name}"))
-                    except(ParserError,) as e:
-                        failed_features.append(str(e))
-                        logger.error(f"It was impossible to parse '{file_name}', Exception error: {e}")
-                    if feature_data is None:
-                        continue
-                    filename = str(file_name).replace(".feature", "")
-                    filepath = os.path.abspath(f"{path_name}/{file_name}")
-                    last_mod_date = time.strftime("%d/%m/%Y", time.gmtime(os.path.getmtime(filepath)))
-
-                    # Set feature tags and description
-                    feature_tags = feature_data.tags
-                    feature_description = feature_data.description
-
-                    # Set feature background data.
-                    background = feature_data.background
-                    background_steps = []
-                    if background is not None:
-                        for step in background.steps:
-                            background_steps.append([step.keyword, step.name])
-
-                    scenarios = {}
-
-                    for index, scenario in enumerate(feature_data.scenarios):
-                        scenarios.update({
-                            "scenario_" + str(index): {
-                                "scenario_type": scenario.keyword,
-                                "scenario_name": scenario.name,
-                                "scenario_description": scenario.description,
-                                "scenario_tags": scenario.tags,
-                                "scenario_steps": extract_scenario_steps(scenario.steps),
-                                "scenario_examples": extract_scenario_examples(scenario)
-                            }
-                        })
-                    files.update({
-                        file_name:
-                            {
-                                "filename": filename,
-                                "filepath": filepath,
-                                "modification_date": last_mod_date,
-                                "feature_background": background_steps,
-                                "feature_tags": feature_tags,
-                                "feature_description": feature_description,
-                                "scenarios": scenarios
-                            }
-                    })
+    for filepath, entry in get_feature_index():
+        if entry['error']:
+            failed_features.append(entry['error'])
+        elif entry['feature']:
+            files[os.path.basename(filepath)] = entry['feature']
     logger.info("Feature files processed")
     return files, failed_features
 
 
-def extract_scenario_steps(steps):
-    """
-    This function extract the scenario steps data.
-
-    :param steps:
-    :return:
-    """
-    _scenario_steps = []
-    for steps in steps:
-        step_data = [steps.keyword, steps.name]
-        table = []
-        if steps.table is not None:
-            table.append(steps.table.headings)
-            for row in steps.table.rows:
-                row_data = []
-                for data in row:
-                    row_data.append(data)
-                table.append(row_data)
-        step_data.append(table)
-        _scenario_steps.append(step_data)
-    return _scenario_steps
-
-
-def extract_scenario_examples(scenario):
-    """
-    This function extract the scenario example values
-
-    :param scenario:
-    :return:
-    """
-    if not hasattr(scenario, 'examples'):
-        return {}
-    _examples = {}
-    for idx, example_data in enumerate(scenario.examples):
-        table = [example_data.table.headings]
-        for row in example_data.table.rows:
-            row_data = []
-            for data in row:
-                row_data.append(data)
-            table.append(row_data)
-        _examples.update({
-            "example_" + str(idx): {
-                "name": example_data.name,
-                "tags": example_data.tags,
-                "table": table
-            }
-        })
-    return _examples
-
-
 def get_cfg_files():
     """
     This function return all the cfg files available.
@@ -530,6 +423,7 @@ def clean_messages():
     :return:
     """
     messages.clear()
+    MESSAGES_STATE['run'] += 1
 
 
 def get_message():
@@ -540,6 +434,20 @@ def get_message():
     return messages
 
 
+def get_new_messages(offset=0, run=None):
+    """
+    This function return the messages stored after an offset of the messages of a run.
+    If the messages have been cleaned since that run, all the messages are returned.
+    :param offset: number of messages already read
+    :param run: run of the messages already read
+    :return: tuple with the new messages, the new offset, the current run and True if the messages were cleaned
+    """
+    reset = run is not None and run != MESSAGES_STATE['run']
+    offset = 0 if reset or offset < 0 or offset > len(messages) else offset
+    new_messages = messages[offset:]
+    return new_messages, offset + len(new_messages), MESSAGES_STATE['run'], reset
+
+
 def update_alert(alert):
     """
     This function update the alert message.
@@ -595,11 +503,92 @@ def get_info():
 def print_portal_console(line):
     """
     This function send a line of text from the CustomPortalFormatter to the real time console in the web.
+    The lines are queued and sent in batches by the console thread, so the tests do not wait for the portal.
     """
+    _start_console_thread()
     try:
-        send_request_portal('post', 'data', line, path='/view-executions')
-    except (Exception,) as ex:
-        logging.error(ex)
+        CONSOLE_QUEUE.put(line, timeout=CONSOLE_PUT_TIMEOUT)
+    except queue.Full:
+        CONSOLE_STATE['dropped'] += 1
+        if CONSOLE_STATE['dropped'] == 1:
+            logger.warning("The portal console is not receiving the lines, the next lines will be lost")
+
+
+def flush_portal_console(timeout=CONSOLE_FLUSH_TIMEOUT):
+    """
+    This function wait until the queued lines of the real time console have been sent to the portal.
+    :param timeout:
+    :return:
+    """
+    if CONSOLE_STATE['pid'] != os.getpid():
+        return
+    sent = threading.Event()
+    try:
+        CONSOLE_QUEUE.put(sent, timeout=timeout)
+    except queue.Full:
+        return
+    sent.wait(timeout)
+
+
+def _start_console_thread():
+    """
+    This function start the console thread of the process with the first line.
+    The forked processes start their own thread, they do not inherit the thread of the parent process.
+    :return:
+    """
+    if CONSOLE_STATE['pid'] == os.getpid():
+        return
+    with CONSOLE_STATE['lock']:
+        if CONSOLE_STATE['pid'] != os.getpid():
+            CONSOLE_STATE['thread'] = threading.Thread(target=_send_console_lines, name='portal-console', daemon=True)
+            CONSOLE_STATE['thread'].start()
+            CONSOLE_STATE['pid'] = os.getpid()
+
+
+def _get_console_batch():
+    """
+    This function wait for the next line of the real time console and return it with the lines queued after it,
+    waiting a little to join the lines printed together. A flush request finishes the batch.
+    :return: tuple with the lines and the flush requests
+    """
+    lines, flush_requests = [], []
+    item = CONSOLE_QUEUE.get()
+    deadline = time.monotonic() + CONSOLE_BATCH_INTERVAL
+    while True:
+        if isinstance(item, threading.Event):
+            flush_requests.append(item)
+            break
+        lines.append(item)
+        timeout = deadline - time.monotonic()
+        if len(lines) >= CONSOLE_BATCH_LINES or timeout <= 0:
+            break
+        try:
+            item = CONSOLE_QUEUE.get(timeout=timeout)
+        except queue.Empty:
+            break
+    return lines, flush_requests
+
+
+def _send_console_lines():
+    """
+    Target of the console thread: send the lines of the real time console in batches with a single connection.
+    :return:
+    """
+    session = requests.Session()
+    while True:
+        lines, flush_requests = _get_console_batch()
+        if lines:
+            url = f"http://127.0.0.1:{Settings.PYTALOS_WEB.get('port')}{CONSOLE_PATH}"
+            try:
+                session.post(url=url, data=''.join(str(line) for line in lines).encode('utf-8'),
+                             headers={'Content-Type': 'text/plain; charset=utf-8'})
+            except (Exception,) as ex:
+                logging.error(ex)
+        for flush_request in flush_requests:
+            flush_request.set()
+
+
+atexit.register(flush_portal_console)
 
 
 def send_alert_portal(line):
@@ -631,6 +620,8 @@ def send_request_portal(method, data_type='', data='', path=''):
     :param path:
     :return:
     """
+    # The console lines printed before the request must arrive first
+    flush_portal_console()
     port = Settings.PYTALOS_WEB.get('port')
     url = f'http://127.0.0.1:{port}'
     url = f'{url}{path}'
@@ -25,6 +25,7 @@ def create_app(config_class=Config, set_environ=True):
     from flask import Flask
     # Models not used here but needed to create the tables in the database.
     from arc.web.models.models import Execution, ExecutionFeature, ExecutionScenario, ExecutionStep
+    from arc.web.models.models import create_missing_indexes
     from arc.web.extensions import db
     from flask_migrate import Migrate
     from arc.web.app.home import bp as home_bp
@@ -62,6 +63,7 @@ def create_app(config_class=Config, set_environ=True):
     flask_app.app_context().push()
     logger.info("Creating db and columns if not created")
     db.create_all()
+    create_missing_indexes(db.engine)
     Migrate(flask_app, db)
     check_settings_exists()
     logger.info("DB Ready.")
@@ -82,6 +82,7 @@ class Execution(BaseModel):
         Execution class with the global result of the features and scenarios and also project information.
     """
     __tablename__ = "execution"
+    __table_args__ = (db.Index('ix_execution_created_on', 'created_on'),)
     id = db.Column(db.Integer, primary_key=True)
     total_features = db.Column(db.Integer)
     features_passed = db.Column(db.Integer)
@@ -109,6 +110,7 @@ class ExecutionFeature(BaseModel):
         This class represents a Feature with all the data generated.
     """
     __tablename__ = "execution_feature"
+    __table_args__ = (db.Index('ix_execution_feature_created_on', 'created_on'),)
     id = db.Column(db.Integer, primary_key=True)
     execution_id = db.Column(db.ForeignKey(Execution.id))
     name = db.Column(db.Text())
@@ -137,6 +139,7 @@ class ExecutionScenario(BaseModel):
         This class represents a Scenario with all the data generated.
     """
     __tablename__ = "execution_scenario"
+    __table_args__ = (db.Index('ix_execution_scenario_created_on', 'created_on'),)
     id = db.Column(db.Integer, primary_key=True)
     feature_id = db.Column(db.ForeignKey(ExecutionFeature.id))
     name = db.Column(db.Text())
@@ -177,6 +180,18 @@ class ExecutionStep(BaseModel):
     duration = db.Column(db.Float)
 
 
+def create_missing_indexes(engine):
+    """
+        Create the indexes of the models that are not in the database yet. The tables created by previous versions
+        are not changed by create_all, so their new indexes are created here.
+    :param engine:
+    :return:
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 class TalosSettings(BaseModel):
     """
         This class represents a settings configuration
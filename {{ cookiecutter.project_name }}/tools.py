@@ -337,6 +337,18 @@ def generate_html_reports(json_data):
             traceback.print_exc()
 
 
+@app.command()
+def benchmark(target: str = typer.Option(...), repeat: int = typer.Option(20)):
+    from arc.core.benchmark import BENCHMARKS
+    if target not in BENCHMARKS:
+        print(f"[bold red]Error![/bold red] Invalid benchmark target: {', '.join(BENCHMARKS)}")
+        return
+    table = Table("[bold green]Measure[/bold green]", "[bold green]Time per operation[/bold green]")
+    for measure, result in BENCHMARKS[target](repeat=repeat):
+        table.add_row(f"[bold blue]{measure}", f"[bold blue]{result}[/bold blue]")
+    print(table)
+
+
 @app.callback()
 def callback():
     title()